@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Measure process wakeups per minute of a standalone status bar with and
+without ``Status(align=True)``.
+
+The bar runs a typical mix of interval modules whose start times are spread
+over a second, the way they drift apart after a while. Output goes to
+/dev/null. Wakeups are read from the context switch counters in /proc and
+therefore Linux only.
+
+Usage: python benchmarks/align.py [duration]
+"""
+
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import context_switches  # noqa: E402
+
+INTERVALS = (1, 1, 1, 2, 5, 5, 10, 30, 60, 60)
+
+
+def measure(mode, duration):
+    from i3pystatus import IntervalModule, Status
+
+    class Module(IntervalModule):
+        def run(self):
+            self.output = {"full_text": time.strftime("%X")}
+
+    status = Status(click_events=False, align=mode == "aligned")
+    for interval in INTERVALS:
+        status.register(Module, interval=interval)
+        time.sleep(random.uniform(0, 1 / len(INTERVALS)))
+    thread = threading.Thread(target=status.run)
+    thread.daemon = True
+    thread.start()
+    time.sleep(2)
+    before = context_switches()
+    time.sleep(duration)
+    wakeups = (context_switches() - before) / duration * 60
+    print("{:10} {:>16.0f}".format(mode, wakeups), file=sys.stderr)
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+    print("{:10} {:>16}".format("mode", "wakeups/minute"))
+    sys.stdout.flush()
+    for mode in ("drifting", "aligned"):
+        subprocess.check_call([sys.executable, __file__, "--run", mode, str(duration)],
+                              stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        measure(sys.argv[2], float(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Frames per second and CPU time per frame of every installed JSON codec
+(see :py:mod:`i3pystatus.core.codec`) in i3status wrapper mode: every frame
+parses a line of i3status blocks, re-serializes the changed output of all
+modules and writes the status line. Parsing click events is measured
+separately.
+
+Usage: python benchmarks/codec.py [frames]
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from i3pystatus.core import codec  # noqa: E402
+from i3pystatus.core.imputil import ClassFinder  # noqa: E402
+from i3pystatus.core.io import IOHandler, JSONIO  # noqa: E402
+from i3pystatus.core.modules import Module  # noqa: E402
+from i3pystatus.core.util import ModuleList  # noqa: E402
+
+I3STATUS = codec.Codec().dumps([
+    {"name": "disk_info", "instance": "/", "full_text": "/: 42.1 GiB", "color": "#00FF00"},
+    {"name": "wireless", "instance": "wlan0", "full_text": "W: (64% at eduroam) 10.0.0.2", "color": "#00FF00"},
+    {"name": "ethernet", "instance": "eth0", "full_text": "E: down", "color": "#FF0000"},
+    {"name": "battery", "instance": "/sys/class/power_supply/BAT0/uevent", "full_text": "BAT 81.23% 02:13:07"},
+    {"name": "cpu_temperature", "instance": "/sys/class/thermal/thermal_zone0/temp", "full_text": "48 °C"},
+    {"name": "load", "full_text": "0.42"},
+    {"name": "tztime", "instance": "local", "full_text": "2026-10-17 12:00:00"},
+] * 2)
+CLICK = b',{"name":"clock","instance":"140241759286544","button":1,"x":1800,"y":12,"relative_x":20,"relative_y":12}'
+MODULES = 20
+
+
+class Block(Module):
+    def update(self, frame):
+        self.output = {"full_text": "module {} – frame {}".format(id(self) % 1000, frame), "color": "#FFFF00"}
+
+
+class Lines(IOHandler):
+    def __init__(self, lines):
+        super().__init__(None, io.BytesIO())
+        self.lines = lines
+
+    def read(self):
+        yield from self.lines
+
+    def write_line(self, message, droppable=False):
+        pass
+
+
+def measure_frames(frames):
+    modules = ModuleList(None, ClassFinder(Module))
+    for _ in range(MODULES):
+        modules.append(Block)
+
+    def serialize(items):
+        # Let every module produce new output, as a busy bar would
+        for module in modules:
+            module.update(serialize.frame)
+        serialize.frame += 1
+        return modules.serialize(items)
+
+    serialize.frame = 0
+    jsonio = JSONIO(Lines([b"," + I3STATUS] * frames), skiplines=0, version=modules.output_version)
+    return run(lambda: jsonio.assemble(serialize), frames)
+
+
+def measure_clicks(clicks):
+    jsonio = JSONIO(Lines([CLICK] * clicks), skiplines=0)
+    return run(lambda: sum(1 for _ in jsonio.read()), clicks)
+
+
+def run(function, count):
+    cpu, tp1 = time.process_time(), time.perf_counter()
+    function()
+    return count / (time.perf_counter() - tp1), (time.process_time() - cpu) / count
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print("{:8} {:>12} {:>16} {:>12} {:>16}".format("codec", "frames/s", "cpu/frame [µs]", "clicks/s", "cpu/click [µs]"))
+    for name in codec.BACKENDS:
+        try:
+            codec.Codec.instance = codec.select(name)
+        except ImportError:
+            print("{:8} not installed".format(name))
+            continue
+        fps, frame_cpu = measure_frames(frames)
+        cps, click_cpu = measure_clicks(frames)
+        print("{:8} {:>12.0f} {:>16.1f} {:>12.0f} {:>16.1f}".format(name, fps, frame_cpu * 1e6, cps, click_cpu * 1e6))
+
+
+if __name__ == "__main__":
+    main()
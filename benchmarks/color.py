@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Time to set up the color ranges of a bar with several color range modules
+(CpuUsage, Network, MemBar, ...): with the `colour` module as before,
+with the interpolation of :py:mod:`i3pystatus.core.color` and with the
+process-wide cache of the latter. Each is measured in a fresh interpreter,
+including the import of `colour`.
+
+Requires the PyPI package `colour`.
+
+Usage: python benchmarks/color.py [modules]
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RANGES = (("#00FF00", "#FF0000", 100), ("#00FF00", "#FF0000", 100), ("#FFFFFF", "#FF0000", 100),
+          ("#00FF00", "#FF0000", 100), ("#AAAAAA", "#FF0000", 100))
+
+SETUP = {
+    "colour": """
+from colour import Color
+from i3pystatus.core.color import long_hex
+
+def color_range(start, end, quantity):
+    return [long_hex(c.hex) for c in Color(start).range_to(Color(end), quantity)]
+""",
+    "uncached": """
+from i3pystatus.core import color
+color_range = color.hex_color_range.__wrapped__
+""",
+    "cached": """
+from i3pystatus.core.color import ColorRangeModule
+color_range = ColorRangeModule.get_hex_color_range
+""",
+}
+
+
+def measure(mode, modules):
+    code = """
+import time
+import i3pystatus.core
+tp1 = time.perf_counter()
+{}
+for i in range({}):
+    start, end, quantity = {!r}[i % {}]
+    color_range(start, end, quantity)
+print(time.perf_counter() - tp1)
+""".format(SETUP[mode], modules, RANGES, len(RANGES))
+    path = os.pathsep.join(filter(None, (ROOT, os.environ.get("PYTHONPATH"))))
+    output = subprocess.check_output([sys.executable, "-c", code], env=dict(os.environ, PYTHONPATH=path))
+    return float(output) * 1000
+
+
+def main():
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print("{:10} {:>8} {:>10}".format("mode", "modules", "time [ms]"))
+    for mode in SETUP:
+        print("{:10} {:>8} {:>10.2f}".format(mode, modules, min(measure(mode, modules) for _ in range(5))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Calls per second of :py:func:`~i3pystatus.core.util.formatp` with compiled,
+cached templates and of the engine it replaced (kept in
+tests/test_core_formatp.py), for format strings as used by modules.
+
+Usage: python benchmarks/formatp.py [calls]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from i3pystatus.core.util import TimeWrapper, formatp  # noqa: E402
+from test_core_formatp import legacy_formatp  # noqa: E402
+
+TEMPLATES = {
+    "battery": ("{status} {remaining}", dict(status="BAT", remaining=TimeWrapper(7380))),
+    "weather": ("{current_temp}{temp_unit}[ {update_error}]", dict(current_temp=21, temp_unit="°C", update_error="")),
+    "mpd": ("[[{artist} - ]{album} - ]{title}[ {song_elapsed}/{song_length}]",
+            dict(artist="SOAD", album="Toxicity", title="Science", song_elapsed="1:41", song_length="2:43")),
+    "nested": ("{status} [{artist} / [{album} / ]]{title}[ {song_elapsed}/{song_length}] [\\[{volume}%\\]]" * 3,
+               dict(status="▷", artist="", album="Foo", title="Crucified", song_elapsed="2:52", song_length="",
+                    volume=80)),
+}
+
+
+def measure(function, template, kwargs, calls):
+    tp1 = time.perf_counter()
+    for _ in range(calls):
+        function(template, **kwargs)
+    return calls / (time.perf_counter() - tp1)
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print("{:10} {:>14} {:>14} {:>8}".format("template", "legacy/s", "compiled/s", "speedup"))
+    for name, (template, kwargs) in TEMPLATES.items():
+        assert formatp(template, **kwargs) == legacy_formatp(template, **kwargs)
+        legacy = measure(legacy_formatp, template, kwargs, calls)
+        compiled = measure(formatp, template, kwargs, calls)
+        print("{:10} {:>14.0f} {:>14.0f} {:>7.1f}x".format(name, legacy, compiled, compiled / legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Compare the cost of building a status line by injecting all module outputs
+into a list and serializing it (the historic way) with concatenating the
+cached fragments of :py:meth:`~i3pystatus.core.util.ModuleList.serialize`.
+
+Each bar is measured with no module changed since the last frame and with
+a single changed module. Memory is the peak allocated while building one
+frame, i.e. mostly the status line itself for cached fragments.
+
+Usage: python benchmarks/frames.py [frames]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from i3pystatus.core.imputil import ClassFinder  # noqa: E402
+from i3pystatus.core.modules import Module  # noqa: E402
+from i3pystatus.core.util import ModuleList  # noqa: E402
+
+SIZES = (50, 500)
+
+
+class Block(Module):
+    def init(self):
+        self.update()
+
+    def update(self):
+        self.output = {"full_text": "block {}".format(time.time()), "color": "#00FF00"}
+
+
+def inject(modules):
+    items = []
+    for module in modules:
+        module.inject(items)
+    return json.dumps(items)
+
+
+def measure(build, modules, changed, frames):
+    build(modules)
+    tp1 = time.perf_counter()
+    for _ in range(frames):
+        if changed:
+            modules[0].update()
+        build(modules)
+    elapsed = (time.perf_counter() - tp1) / frames
+
+    tracemalloc.start()
+    if changed:
+        modules[0].update()
+    before, _ = tracemalloc.get_traced_memory()
+    build(modules)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak - before
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print("{:>6} {:>8} {:>10} {:>14} {:>14}".format("blocks", "changed", "method", "time [µs]", "memory [B]"))
+    for size in SIZES:
+        modules = ModuleList(None, ClassFinder(Module))
+        for _ in range(size):
+            modules.append(Block)
+        for changed in (0, 1):
+            for name, build in (("inject", inject), ("fragments", lambda modules: modules.serialize([]))):
+                elapsed, memory = measure(build, modules, changed, frames)
+                print("{:>6} {:>8} {:>10} {:>14.1f} {:>14}".format(size, changed, name, elapsed * 1e6, memory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Time per sample of a graph module: appending a value to the history and
+drawing it, with a list and :py:func:`~i3pystatus.core.util.make_graph` as
+graph modules did before and with
+:py:class:`~i3pystatus.core.util.GraphSeries` and
+:py:class:`~i3pystatus.core.util.GraphRenderer`.
+
+Usage: python benchmarks/graph.py [samples]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from i3pystatus.core.util import GraphRenderer, GraphSeries, make_graph  # noqa: E402
+
+WIDTHS = (15, 100, 500)
+STYLES = ("blocks", "braille-fill", "braille-snake")
+
+
+def with_list(width, style, values):
+    history = [0] * width
+    for value in values:
+        history.insert(0, value)
+        history = history[:width]
+        make_graph(history, 0.0, 100.0, style)
+
+
+def with_series(width, style, values):
+    series = GraphSeries(width)
+    renderer = GraphRenderer(series, 0.0, 100.0, style)
+    for value in values:
+        series.append(value)
+        renderer.render()
+
+
+def measure(function, width, style, values):
+    tp1 = time.perf_counter()
+    function(width, style, values)
+    return (time.perf_counter() - tp1) / len(values) * 1e6
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    values = [random.uniform(0, 100) for _ in range(samples)]
+    print("{:14} {:>6} {:>12} {:>12} {:>8}".format("style", "width", "list [us]", "series [us]", "speedup"))
+    for style in STYLES:
+        for width in WIDTHS:
+            before = measure(with_list, width, style, values)
+            after = measure(with_series, width, style, values)
+            print("{:14} {:>6} {:>12.1f} {:>12.1f} {:>7.1f}x".format(style, width, before, after, before / after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Time to find the module a click event is addressed to, scanning the list of
+registered modules (the historic way) and with the instance index of
+:py:class:`~i3pystatus.core.util.ModuleList`.
+
+Every bar has a quarter of its blocks in groups of five nested modules.
+Clicks go to random modules, looked up by the instance string i3bar sends.
+
+Usage: python benchmarks/lookup.py [lookups]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from i3pystatus.core.imputil import ClassFinder  # noqa: E402
+from i3pystatus.core.modules import Module  # noqa: E402
+from i3pystatus.core.util import ModuleList  # noqa: E402
+
+SIZES = (10, 50, 500)
+GROUP = 5
+
+
+class Block(Module):
+    pass
+
+
+class Group(Module):
+    def init(self):
+        self.modules = ModuleList(self, ClassFinder(Module))
+        for _ in range(GROUP):
+            self.modules.append(Block)
+
+
+def scan(modules, find_id):
+    find_id = int(find_id)
+    for module in modules:
+        if id(module) == find_id:
+            return module
+        children = ModuleList.children(module)
+        if children is not None:
+            module = scan(children, find_id)
+            if module is not None:
+                return module
+
+
+def build(size):
+    modules = ModuleList(None, ClassFinder(Module))
+    groups = size // 4 // GROUP
+    for _ in range(size - groups * (GROUP + 1)):
+        modules.append(Block)
+    for _ in range(groups):
+        modules.append(Group)
+    return modules
+
+
+def measure(find, modules, instances):
+    tp1 = time.perf_counter()
+    for instance in instances:
+        find(modules, instance)
+    return (time.perf_counter() - tp1) / len(instances)
+
+
+def main():
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print("{:>6} {:>8} {:>14}".format("blocks", "method", "lookup [µs]"))
+    for size in SIZES:
+        modules = build(size)
+        instances = [str(key) for key in random.choices(list(modules.index), k=lookups)]
+        for name, find in (("scan", scan), ("index", ModuleList.get)):
+            elapsed = measure(find, modules, instances)
+            print("{:>6} {:>8} {:>14.2f}".format(len(modules.index), name, elapsed * 1e6))
+
+
+if __name__ == "__main__":
+    main()
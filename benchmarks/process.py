@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Run a CPU heavy module (parsing a large JSON document) with the thread and
+the process executor, and report how much it delays a 1ms timer loop in the
+main thread (standing in for click handling and rendering) together with the
+serialization cost of the process executor.
+
+Usage: python benchmarks/process.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from i3pystatus import IntervalModule  # noqa: E402
+from i3pystatus.core.process import ProcessPool  # noqa: E402
+from i3pystatus.core.stats import registry  # noqa: E402
+
+DOCUMENT = json.dumps([{"id": i, "description": "task %d" % i, "tags": ["a", "b"]} for i in range(100000)])
+
+
+class Heavy(IntervalModule):
+    def run(self):
+        tasks = json.loads(DOCUMENT)
+        self.data = {"count": len(tasks)}
+        self.output = {"full_text": "%d tasks" % len(tasks)}
+
+
+def measure(executor, runs=10):
+    module = Heavy(executor=executor)
+    if executor == "process":
+        ProcessPool.default().register(module)
+    registry.register(module)
+    done = threading.Event()
+
+    def work():
+        for _ in range(runs):
+            module()
+        done.set()
+
+    delays = []
+    threading.Thread(target=work).start()
+    while not done.is_set():
+        tp1 = time.perf_counter()
+        time.sleep(0.001)
+        delays.append(time.perf_counter() - tp1 - 0.001)
+    delays.sort()
+    stats = registry.get(module)
+    print("{:8} p50 {:6.2f}ms  p99 {:6.2f}ms  max {:6.2f}ms  serialization {:6.3f}ms/run  {:6d} bytes/run".format(
+        executor, delays[len(delays) // 2] * 1000, delays[int(len(delays) * 0.99)] * 1000, delays[-1] * 1000,
+        stats.serialization / runs * 1000, stats.transferred // runs))
+
+
+if __name__ == "__main__":
+    measure("thread")
+    measure("process")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Microseconds per graph drawn by :py:func:`~i3pystatus.core.util.make_graph`
+for every style and a range of widths, and per graph when drawing several
+graphs of the same width at once with
+:py:func:`~i3pystatus.core.util.make_graphs`, without and (if installed)
+with NumPy. Also bars drawn by make_bar(s) and make_vertical_bar(s).
+
+Usage: python benchmarks/render.py [repeat]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from i3pystatus.core import util  # noqa: E402
+
+WIDTHS = (4, 16, 64, 256, 1024)
+BATCHES = (4, 16, 64)
+
+
+def measure(function, repeat, per):
+    tp1 = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - tp1) / repeat / per * 1e6
+
+
+def graphs(repeat):
+    numpy = util.numpy_module() is not None
+    print("{:14} {:>6} {:>6} {:>12} {:>12} {:>12}".format(
+        "style", "width", "graphs", "single [us]", "batch [us]", "numpy [us]"))
+    for style in util.GRAPH_STYLES:
+        for width in WIDTHS:
+            # braille-snake fails if half of the width rounded up is odd
+            if style == "braille-snake" and (width + 1) // 2 % 2:
+                width += 2
+            for count in BATCHES:
+                series = [[random.uniform(0, 100) for _ in range(width)] for _ in range(count)]
+                single = measure(lambda: [util.make_graph(values, 0.0, 100.0, style) for values in series],
+                                 repeat, count)
+                threshold, util.NUMPY_GRAPH_VALUES = util.NUMPY_GRAPH_VALUES, float("inf")
+                batch = measure(lambda: util.make_graphs(series, 0.0, 100.0, style), repeat, count)
+                util.NUMPY_GRAPH_VALUES = 0
+                vectorized = measure(lambda: util.make_graphs(series, 0.0, 100.0, style), repeat, count)
+                util.NUMPY_GRAPH_VALUES = threshold
+                print("{:14} {:>6} {:>6} {:>12.2f} {:>12.2f} {:>12}".format(
+                    style, width, count, single, batch, "{:.2f}".format(vectorized) if numpy else "-"))
+
+
+def bars(repeat):
+    percentages = [random.uniform(0, 100) for _ in range(64)]
+    print()
+    print("{:20} {:>12}".format("bars", "per bar [us]"))
+    for name, function in (("make_bar", lambda: [util.make_bar(p) for p in percentages]),
+                           ("make_bars", lambda: util.make_bars(percentages)),
+                           ("make_vertical_bar", lambda: [util.make_vertical_bar(p) for p in percentages]),
+                           ("make_vertical_bars", lambda: util.make_vertical_bars(percentages))):
+        print("{:20} {:>12.3f}".format(name, measure(function, repeat * 10, len(percentages))))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    graphs(repeat)
+    bars(repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Compare thread count and wakeups per second of the deadline-heap
+:py:class:`~i3pystatus.core.threading.Scheduler` with the historic layout of
+one :py:class:`~i3pystatus.core.threading.Thread` per distinct interval.
+
+Every run happens in a fresh interpreter, so the numbers of one mode do not
+include threads left over from another. Wakeups are read from the context
+switch counters in /proc and therefore Linux only.
+
+Usage: python benchmarks/scheduler.py [duration]
+"""
+
+import glob
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INTERVALS = (1, 2, 3, 5, 10, 15, 30, 60, 120, 300, 600, 1800)
+SIZES = (10, 100, 1000)
+
+
+def context_switches():
+    total = 0
+    for path in glob.glob("/proc/self/task/*/status"):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith("voluntary_ctxt_switches"):
+                        total += int(line.split()[-1])
+        except OSError:
+            pass
+    return total
+
+
+def workload():
+    pass
+
+
+def start_scheduler(count):
+    from i3pystatus.core.threading import Scheduler
+    scheduler = Scheduler()
+    for i in range(count):
+        scheduler.add(workload, INTERVALS[i % len(INTERVALS)])
+    scheduler.start()
+
+
+def start_legacy(count):
+    from i3pystatus.core.threading import Thread, WorkloadWrapper, ExceptionWrapper
+    threads = {}
+    for i in range(count):
+        interval = INTERVALS[i % len(INTERVALS)]
+        thread = threads.setdefault(interval, Thread(interval, start_barrier=0))
+        thread.append(WorkloadWrapper(ExceptionWrapper(workload)))
+    for thread in threads.values():
+        thread.start()
+
+
+def measure(mode, count, duration):
+    {"scheduler": start_scheduler, "legacy": start_legacy}[mode](count)
+    # Let the initial burst of first runs settle before measuring
+    time.sleep(1)
+    before = context_switches()
+    time.sleep(duration)
+    wakeups = (context_switches() - before) / duration
+    print("{:10} {:6d} {:8d} {:12.1f}".format(mode, count, threading.active_count(), wakeups))
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    print("{:10} {:>6} {:>8} {:>12}".format("mode", "count", "threads", "wakeups/s"))
+    for count in SIZES:
+        for mode in ("legacy", "scheduler"):
+            subprocess.check_call([sys.executable, __file__, "--run", mode, str(count), str(duration)])
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        measure(sys.argv[2], int(sys.argv[3]), float(sys.argv[4]))
+    else:
+        main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Total CPU time of three bars showing the same modules, run as three separate
+i3pystatus processes and as a single process serving its modules on a UNIX
+socket (``Status(serve=...)``) to three ``i3pystatus-client`` processes.
+
+Every module polls a sensor once a second, costing 2ms of CPU time, roughly
+what reading a few files in /sys or parsing the output of a command costs.
+CPU time is read from /proc after all processes started up and therefore
+Linux only.
+
+Usage: python benchmarks/server.py [duration]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BARS = 3
+MODULES = 10
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bar(serve=None):
+    from i3pystatus import IntervalModule, Status
+
+    class Sensor(IntervalModule):
+        settings = ("index",)
+        interval = 1
+
+        def run(self):
+            end = time.process_time() + 0.002
+            while time.process_time() < end:
+                pass
+            self.output = {"full_text": "sensor {} {}".format(self.index, int(time.time()))}
+
+    status = Status(click_events=False, serve=serve)
+    for index in range(MODULES):
+        status.register(Sensor, index=index)
+    status.run()
+
+
+def cpu_time(pid):
+    with open("/proc/{}/stat".format(pid)) as f:
+        # utime and stime, after the command name which may contain spaces
+        fields = f.read().rpartition(")")[2].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def spawn(*args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.Popen([sys.executable] + list(args), env=env,
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+
+
+def measure(mode, duration, path):
+    if mode == "separate":
+        processes = [spawn(__file__, "--bar") for _ in range(BARS)]
+    else:
+        processes = [spawn(__file__, "--bar", path)]
+        processes += [spawn("-m", "i3pystatus.tools.client", path, "--no-click-events") for _ in range(BARS)]
+    try:
+        time.sleep(3)
+        before = sum(cpu_time(process.pid) for process in processes)
+        time.sleep(duration)
+        used = sum(cpu_time(process.pid) for process in processes) - before
+    finally:
+        # Clients first, they complain when the server goes away
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+    print("{:10} {:>10} {:>16.2f} {:>12.1f}".format(mode, len(processes), used / duration * 60, used / duration * 100))
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+    print("{:10} {:>10} {:>16} {:>12}".format("mode", "processes", "cpu/minute [s]", "cpu [%]"))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bar.sock")
+        for mode in ("separate", "shared"):
+            measure(mode, duration, path)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--bar"]:
+        bar(*sys.argv[2:3])
+    else:
+        main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Time from starting i3pystatus until the first status line showing all
+modules, without a snapshot of the previous output (cold) and with one
+(warm, ``Status(snapshot_file=...)``).
+
+Besides a few cheap modules, the bar has slow ones that take 1-3 seconds
+for their first run, like weather (network) or updates (checkupdates)
+do. Each start is a fresh interpreter, the time includes its startup.
+
+Usage: python benchmarks/snapshot.py [runs]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DURATIONS = (0, 0, 0, 0, 1, 2, 3)
+
+
+def bar(path):
+    from i3pystatus import IntervalModule, Status
+
+    class Probe(IntervalModule):
+        settings = ("duration",)
+        interval = 60
+
+        def run(self):
+            time.sleep(self.duration)
+            self.output = {"full_text": "probe {}".format(self.duration)}
+
+    status = Status(click_events=False, snapshot_file=path, snapshot_interval=0.5)
+    for duration in DURATIONS:
+        status.register(Probe, duration=duration)
+    status.run()
+
+
+def first_complete_frame(path):
+    tp1 = time.perf_counter()
+    process = subprocess.Popen([sys.executable, __file__, "--bar", path], stdout=subprocess.PIPE,
+                               env=dict(os.environ, PYTHONPATH=ROOT))
+    try:
+        for line in process.stdout:
+            line = line.lstrip(b",").strip()
+            if line.startswith(b"[{") and len(json.loads(line)) == len(DURATIONS):
+                elapsed = time.perf_counter() - tp1
+                # Give the snapshot a chance to be written
+                time.sleep(1)
+                return elapsed
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print("{:6} {:>22}".format("start", "complete frame [ms]"))
+    for mode in ("cold", "warm"):
+        total = 0
+        for _ in range(runs):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "snapshot")
+                if mode == "warm":
+                    first_complete_frame(path)
+                total += first_complete_frame(path)
+        print("{:6} {:>22.0f}".format(mode, total / runs * 1000))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--bar"]:
+        bar(sys.argv[2])
+    else:
+        main()
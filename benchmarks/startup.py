@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Measure the time until the first frame and the number of expensive module
+runs in the first second after startup, with and without the
+:py:class:`~i3pystatus.core.threading.StartupPlanner`.
+
+Cheap modules take 1ms, expensive ones (interval >= 30s) 50ms of busy CPU
+time, roughly what an HTTP request or a subprocess spawn costs.
+
+Usage: python benchmarks/startup.py [count]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INTERVALS = (1, 5, 10, 30, 60, 300, 1800)
+
+
+class Workload:
+    def __init__(self, interval, log):
+        self.interval = interval
+        self.duration = 0.05 if interval >= 30 else 0.001
+        self.log = log
+
+    def __call__(self):
+        end = time.perf_counter() + self.duration
+        while time.perf_counter() < end:
+            pass
+        if self.interval >= 30:
+            self.log.append(time.perf_counter())
+
+
+def measure(mode, count):
+    from i3pystatus.core.threading import Scheduler, StartupPlanner
+    startup = StartupPlanner() if mode == "planner" else None
+    scheduler = Scheduler(startup=startup)
+    log = []
+    tp1 = time.perf_counter()
+    for i in range(count):
+        interval = INTERVALS[i % len(INTERVALS)]
+        scheduler.add(Workload(interval, log), interval)
+    scheduler.start()
+    if startup:
+        startup.wait()
+    else:
+        # Historically the first line was sent one interval after startup
+        time.sleep(1)
+    first_frame = time.perf_counter() - tp1
+    time.sleep(max(0, 1 - first_frame))
+    runs = sum(1 for t in log if t - tp1 < 1)
+    print("{:10} {:6d} {:>16.1f} {:>18d}".format(mode, count, first_frame * 1000, runs))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 70
+    print("{:10} {:>6} {:>16} {:>18}".format("mode", "count", "first frame [ms]", "expensive in 1st s"))
+    for mode in ("immediate", "planner"):
+        subprocess.check_call([sys.executable, __file__, "--run", mode, str(count)])
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        measure(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+"""
+Measure the per-call overhead of the wrappers every interval module is run
+through, including recording of run time statistics.
+
+Usage: python benchmarks/stats.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from i3pystatus.core.threading import ExceptionWrapper, WorkloadWrapper  # noqa: E402
+
+
+def workload():
+    pass
+
+
+def main():
+    number = 200000
+    wrapped = WorkloadWrapper(ExceptionWrapper(workload))
+    for name, fn in (("bare call", workload), ("wrapped call", wrapped)):
+        best = min(timeit.repeat(fn, number=number, repeat=5))
+        print("{:15} {:8.3f} µs/call".format(name, best / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from pkgutil import extend_path
 
 from i3pystatus.core import Status
-from i3pystatus.core.modules import Module, IntervalModule
+from i3pystatus.core.modules import Module, IntervalModule, AsyncIntervalModule
 from i3pystatus.core.settings import SettingsBase
 from i3pystatus.core.util import formatp, get_module
 
@@ -15,7 +15,7 @@ __path__ = extend_path(__path__, __name__)
 
 __all__ = [
     "Status",
-    "Module", "IntervalModule",
+    "Module", "IntervalModule", "AsyncIntervalModule",
     "SettingsBase",
     "formatp",
     "get_module",
@@ -55,11 +55,12 @@ class Amdgpu(IntervalModule):
         for gatherer in self.info_gatherers:
             gatherer()
 
-        self.output = {
+        output = {
             'full_text': self.format.format(**self.data)
         }
         if self.color:
-            self.output['color'] = self.color
+            output['color'] = self.color
+        self.output = output
 
     @staticmethod
     def parse_clk_reading(reading):
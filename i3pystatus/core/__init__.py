@@ -1,29 +1,121 @@
+import collections
 import logging
 import os
+import queue
+import signal
 import sys
-from threading import Thread
+from threading import Lock, Thread
 
-from i3pystatus.core import io, util
+from i3pystatus.core import codec as codecs, io, server, snapshot, stats, util
 from i3pystatus.core.exceptions import ConfigError
 from i3pystatus.core.imputil import ClassFinder
 from i3pystatus.core.modules import Module
+from i3pystatus.core.process import ProcessPool
+from i3pystatus.core.threading import Scheduler, StartupPlanner, timer
 
 DEFAULT_LOG_FORMAT = '%(asctime)s [%(levelname)-8s][%(name)s %(lineno)d] %(message)s'
 log = logging.getLogger(__name__)
 
 
+class ClickDispatcher:
+    """
+    Handles click events on a pool of up to `max_workers` threads, so a
+    click on a slow module does not hold up clicks on other modules.
+
+    Clicks on the same module are handled one after another, in order. Once
+    all queued clicks of a module were handled, the module is refreshed
+    once, so e.g. a burst of scroll events changing the volume results in
+    a single refresh and status line. The time from receiving a click until
+    the status line showing its effect was written is recorded in the
+    ``click to frame`` histogram of the :py:data:`~i3pystatus.core.stats.registry`.
+
+    :param io: The :py:class:`~i3pystatus.core.io.StandaloneIO` to refresh
+    :param max_workers: Upper bound for the number of worker threads
+    """
+
+    def __init__(self, io, max_workers=4):
+        self.io = io
+        self.max_workers = max_workers
+        self.threads = []
+        self.latency = stats.registry.histogram("click to frame")
+        # Queued clicks per module, a module with an entry is being handled
+        self.clicks = {}
+        self.ready = queue.Queue()
+        self.idle = 0
+        self.lock = Lock()
+
+    def dispatch(self, module, button, **kwargs):
+        """Queue a click on `module`, see :py:meth:`~i3pystatus.core.modules.Module.on_click`."""
+        with self.lock:
+            if module in self.clicks:
+                self.clicks[module].append((timer(), button, kwargs))
+                return
+            self.clicks[module] = collections.deque([(timer(), button, kwargs)])
+            self.ready.put(module)
+            if not self.idle and len(self.threads) < self.max_workers:
+                thread = Thread(target=self._run, name="ClickDispatcher-{}".format(len(self.threads)))
+                thread.daemon = True
+                self.threads.append(thread)
+                thread.start()
+
+    def _run(self):
+        while True:
+            with self.lock:
+                self.idle += 1
+            module = self.ready.get()
+            with self.lock:
+                self.idle -= 1
+            self._handle(module)
+
+    def _handle(self, module):
+        received = []
+        while True:
+            with self.lock:
+                clicks = self.clicks[module]
+                if not clicks:
+                    del self.clicks[module]
+                    break
+                received_at, button, kwargs = clicks.popleft()
+            received.append(received_at)
+            try:
+                module.on_click(button, **kwargs)
+            except Exception:
+                module.logger.exception("Exception in on_click handler")
+
+        def written():
+            now = timer()
+            for received_at in received:
+                self.latency.add(now - received_at)
+
+        def refreshed():
+            self.io.on_next_frame(written)
+            self.io.async_refresh()
+
+        # Scheduled modules are retried right away by the scheduler,
+        # which also resets their backoff.
+        scheduler = Scheduler.instance
+        if not scheduler or not scheduler.retry(module, refreshed):
+            try:
+                module.refresh()
+            except Exception:
+                module.logger.exception("Exception in refresh after click")
+            refreshed()
+
+
 class CommandEndpoint:
     """
     Endpoint for i3bar click events: http://i3wm.org/docs/i3bar-protocol.html#_click_events
 
     :param modules: dict-like object with item access semantics via .get()
     :param io_handler_factory: function creating a file-like object returning a JSON generator on .read()
+    :param io: The :py:class:`~i3pystatus.core.io.StandaloneIO` to refresh after clicks
     """
 
     def __init__(self, modules, io_handler_factory, io):
         self.modules = modules
         self.io_handler_factory = io_handler_factory
         self.io = io
+        self.dispatcher = ClickDispatcher(io)
         self.thread = Thread(target=self._command_endpoint)
         self.thread.daemon = True
 
@@ -33,20 +125,22 @@ class CommandEndpoint:
 
     def _command_endpoint(self):
         for cmd in self.io_handler_factory().read():
-            target_module = self.modules.get(cmd["instance"])
+            self.click(cmd)
 
-            button = cmd["button"]
-            kwargs = {"button_id": button}
-            try:
-                kwargs.update({"pos_x": cmd["x"],
-                               "pos_y": cmd["y"]})
-            except Exception:
-                continue
+    def click(self, cmd):
+        """Dispatch the parsed click event `cmd` to the module it belongs to."""
+        target_module = self.modules.get(cmd["instance"])
+
+        button = cmd["button"]
+        kwargs = {"button_id": button}
+        try:
+            kwargs.update({"pos_x": cmd["x"],
+                           "pos_y": cmd["y"]})
+        except Exception:
+            return
 
-            if target_module:
-                target_module.on_click(button, **kwargs)
-                target_module.run()
-                self.io.async_refresh()
+        if target_module:
+            self.dispatcher.dispatch(target_module, button, **kwargs)
 
 
 class Status:
@@ -61,13 +155,50 @@ class Status:
     :param tuple internet_check: Address of server that will be used to check for internet connection by :py:class:`.internet`.
     :param keep_alive: If True, modules that define the keep_alive flag will not be put to sleep when the status bar is hidden.
     :param dictionary default_hints: Dictionary of default hints to apply to all modules. Can be overridden at a module level.
+    :param int stats_signal: Signal number (e.g. ``signal.SIGRTMIN``) that makes i3pystatus dump per-module run time
+        statistics to `stats_file`. Without `standalone`, they are written with the next line of i3status.
+    :param str stats_file: Path of the statistics dump, defaults to ``~/.i3pystatus-stats-<pid>``.
+    :param bool align: Run interval modules at multiples of their interval in wall-clock time, e.g. every full
+        second, and send one line once all modules due at that time finished. This keeps the process from waking
+        up many times a second when intervals drift apart.
+    :param float heartbeat: Status lines are only sent when the output of some module changed. With heartbeat set,
+        an unchanged line is repeated after this many seconds.
+    :param float min_frame_interval: Minimum number of seconds between two status lines. Refreshes requested in
+        quick succession, e.g. by scrolling to change the volume, are collapsed into a single line, while the first
+        refresh after a quiet period is sent right away.
+    :param float max_frame_latency: Upper bound for the delay of a requested refresh, defaults to
+        `min_frame_interval`.
+    :param str codec: JSON library used for the i3bar protocol: ``orjson``, ``ujson`` or ``json``. Defaults to the
+        fastest one installed.
+    :param bool nonblocking: If the output is a pipe, write to it from a separate thread that drops outdated status
+        lines while i3bar does not read them, instead of blocking the main loop.
+    :param float startup_budget: Seconds after which the first status line is sent at the latest. Modules with
+        intervals of 30 seconds or more run for the first time after that, spread over up to 10 seconds.
+    :param str serve: Path of a UNIX socket to serve the output of all modules on, if `standalone` is True. Other
+        bars connect to it with ``i3pystatus-client`` and show all or some of the modules without running them
+        again, see :py:class:`~i3pystatus.core.server.BarServer`.
+    :param str snapshot_file: Path of a file the output of all modules is saved to every `snapshot_interval`
+        seconds. At startup, the saved output is shown (marked as stale) until the modules ran for the first time,
+        see :py:class:`~i3pystatus.core.snapshot.Snapshot`.
+    :param float snapshot_interval: Seconds between two writes of `snapshot_file`.
+
+    The time from startup until the first line containing current output of every module (or modules that hide
+    themselves after they ran) is recorded in the ``first complete frame`` histogram of the statistics (see
+    `stats_signal`). Stale output restored from `snapshot_file` does not count.
     """
 
+    snapshot = None
+
     def __init__(self, standalone=True, click_events=True, interval=1,
                  input_stream=None, logfile=None, internet_check=None,
                  keep_alive=False, logformat=DEFAULT_LOG_FORMAT,
-                 default_hints=None):
+                 default_hints=None, stats_signal=None, stats_file=None,
+                 startup_budget=0.5, align=False, heartbeat=None,
+                 min_frame_interval=0.05, max_frame_latency=None, codec=None, nonblocking=True,
+                 serve=None, snapshot_file=None, snapshot_interval=60):
+        self.started = timer()
         self.standalone = standalone
+        self.heartbeat = heartbeat
         self.default_hints = default_hints
         self.click_events = standalone and click_events
         input_stream = input_stream or sys.stdin
@@ -84,17 +215,40 @@ class Status:
                 logger.handlers[index].setFormatter(logging.Formatter(logformat))
         if internet_check:
             util.internet.address = internet_check
+        StartupPlanner.default().budget = startup_budget
+        # Started by run, after the worker processes of the ProcessPool were forked
+        Scheduler.default().hold()
+        if codec:
+            codecs.Codec.instance = codecs.select(codec)
 
         self.modules = util.ModuleList(self, ClassFinder(Module))
+        if snapshot_file:
+            self.snapshot = snapshot.Snapshot(os.path.expandvars(os.path.expanduser(snapshot_file)),
+                                              snapshot_interval)
+        self.server = None
         if self.standalone:
-            self.io = io.StandaloneIO(self.click_events, self.modules, keep_alive, interval)
-            if self.click_events:
+            self.io = io.StandaloneIO(self.click_events, self.modules, keep_alive, interval, align,
+                                      min_frame_interval, max_frame_latency)
+            if self.click_events or serve:
                 self.command_endpoint = CommandEndpoint(
                     self.modules,
                     lambda: io.JSONIO(io=io.IOHandler(sys.stdin, open(os.devnull, "w")), skiplines=1),
                     self.io)
+            if serve:
+                self.server = server.BarServer(os.path.expandvars(os.path.expanduser(serve)), self.modules,
+                                               self.command_endpoint.click)
         else:
             self.io = io.IOHandler(input_stream)
+        self.stats_requested = False
+        if stats_signal:
+            self.stats_file = os.path.expandvars(os.path.expanduser(
+                stats_file or "~/.i3pystatus-stats-%s" % os.getpid()))
+            if self.standalone:
+                self.io.signal_callbacks[stats_signal] = self.dump_stats
+            signal.signal(stats_signal, self.stats_signal_handler)
+        # Only pipes, the writer reopens them with a non-blocking descriptor of its own
+        if nonblocking and io.is_pipe(self.io.out):
+            self.io.writer = io.FrameWriter(self.io.out)
 
     def register(self, module, *args, **kwargs):
         """
@@ -119,6 +273,10 @@ class Status:
             kwargs['hints'] = hints
 
         try:
+            if self.snapshot:
+                module = self.modules.finder.instanciate_class_from_module(module, *args, **kwargs)
+                args, kwargs = (), {}
+                self.snapshot.restore(module)
             return self.modules.append(module, *args, **kwargs)
         except Exception as e:
             log.exception(e)
@@ -131,12 +289,68 @@ class Status:
                 )
             ))
 
+    def stats_signal_handler(self, signo, frame):
+        """
+        Request a dump of the statistics. The main thread may hold the lock of
+        the registry, so they are written by the refresh thread of
+        :py:class:`~i3pystatus.core.io.StandaloneIO`, or with the next line of
+        i3status otherwise.
+        """
+        if not self.standalone:
+            self.stats_requested = True
+
+    def dump_stats(self):
+        """Dump the statistics of all modules, see :py:mod:`i3pystatus.core.stats`."""
+        self.stats_requested = False
+        try:
+            stats.registry.dump(self.stats_file)
+        except OSError:
+            log.exception("Could not write statistics")
+
     def run(self):
         """
         Run main loop.
         """
+        if ProcessPool.instance:
+            # Fork worker processes before the threads running modules and
+            # writing and reading the status line start
+            ProcessPool.instance.start()
+        Scheduler.default().release()
         if self.click_events:
             self.command_endpoint.start()
-        for j in io.JSONIO(self.io).read():
-            for module in self.modules:
-                module.inject(j)
+        if self.server:
+            self.server.start()
+        if self.snapshot:
+            self.snapshot.start()
+        jsonio = io.JSONIO(self.io, version=self.modules.output_version, heartbeat=self.heartbeat)
+        try:
+            jsonio.assemble(self.serialize)
+        finally:
+            if self.server:
+                self.server.close()
+
+    @staticmethod
+    def is_current(module):
+        """
+        Tell whether `module` shows output of its own, or hides itself after
+        it ran. Stale output restored from a snapshot does not count.
+        """
+        if module.stale:
+            return False
+        if snapshot.has_text(module.output):
+            return True
+        module_stats = stats.registry.get(module)
+        return bool(module_stats and module_stats.calls)
+
+    def serialize(self, items):
+        """Build the status line and pass changed output on to the clients of `serve`."""
+        line = self.modules.serialize(items)
+        if self.server:
+            self.server.publish()
+        if self.stats_requested:
+            self.dump_stats()
+        if self.started is not None and all(self.is_current(module) for module in self.modules):
+            elapsed, self.started = timer() - self.started, None
+            stats.registry.histogram("first complete frame").add(elapsed)
+            log.info("First complete status line after %.3fs", elapsed)
+        return line
@@ -0,0 +1,97 @@
+import json
+
+
+class Codec:
+    """
+    Encodes and decodes the JSON of the i3bar protocol using the standard
+    library.
+
+    :py:meth:`loads` accepts str and bytes, :py:meth:`dumps` returns UTF-8
+    encoded bytes without whitespace, so status lines can be assembled and
+    written without converting between str and bytes. Lone surrogates, which
+    can not be encoded, are replaced.
+
+    Use :py:meth:`default` to get the process-wide codec, the fastest
+    installed one unless chosen otherwise by
+    :py:class:`~i3pystatus.core.Status`.
+    """
+
+    name = "json"
+    instance = None
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8", "replace")
+
+    @classmethod
+    def default(cls):
+        """Returns the process-wide codec."""
+        if Codec.instance is None:
+            Codec.instance = select()
+        return Codec.instance
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, self.name)
+
+
+class OrjsonCodec(Codec):
+    """Requires the PyPI package `orjson`"""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+        self.loads = orjson.loads
+
+    def dumps(self, obj):
+        try:
+            return self.orjson.dumps(obj)
+        except TypeError:
+            # orjson rejects lone surrogates
+            return super().dumps(obj)
+
+
+class UjsonCodec(Codec):
+    """Requires the PyPI package `ujson`"""
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self.ujson = ujson
+
+    def loads(self, data):
+        return self.ujson.loads(data)
+
+    def dumps(self, obj):
+        try:
+            return self.ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8", "replace")
+        except UnicodeEncodeError:
+            # ujson rejects lone surrogates
+            return super().dumps(obj)
+
+
+BACKENDS = {codec.name: codec for codec in (OrjsonCodec, UjsonCodec, Codec)}
+
+
+def select(name=None):
+    """
+    Create a codec.
+
+    :param name: One of ``orjson``, ``ujson`` and ``json``, or None for the
+        first of them that is installed
+    :raises ImportError: if the requested backend is not installed
+    :raises ValueError: if there is no backend called `name`
+    """
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError("Unknown JSON codec {!r}, expected one of {}".format(name, ", ".join(BACKENDS)))
+        return BACKENDS[name]()
+    for backend in BACKENDS.values():
+        try:
+            return backend()
+        except ImportError:
+            pass
@@ -1,41 +1,143 @@
-from colour import Color
+import functools
+import re
+
+HEX_COLOR = re.compile(r'#(?:[0-9a-fA-F]{3}){1,2}')
+# Tolerance of the colour module, used the same way to get the same colors
+FLOAT_ERROR = 0.0000005
+
+
+@functools.lru_cache(maxsize=None)
+def hex_color_range(start_color, end_color, quantity):
+    """
+    Colors of :py:meth:`ColorRangeModule.get_hex_color_range`, computed once
+    per process for each range.
+
+    Ranges between Hex colors are interpolated here, exactly like the
+    `colour` module does it (in HSL space), other colors (e.g. plain English
+    names) are left to the `colour` module, which is only imported then.
+
+    :returns: A tuple of Hex color values
+    """
+    if not (isinstance(start_color, str) and HEX_COLOR.fullmatch(start_color) and
+            isinstance(end_color, str) and HEX_COLOR.fullmatch(end_color)):
+        from colour import Color
+        return tuple(long_hex(c.hex) for c in Color(start_color).range_to(Color(end_color), quantity))
+    return tuple(rgb_to_hex(hsl_to_rgb(hsl))
+                 for hsl in hsl_scale(rgb_to_hsl(hex_to_rgb(start_color)), rgb_to_hsl(hex_to_rgb(end_color)),
+                                      quantity - 1))
+
+
+def long_hex(color):
+    """
+    i3bar expects the full Hex value but for some colors the colour module
+    only returns partial values (e.g. #f00), expand them.
+    """
+    if len(color) == 4:
+        return "#" + "".join(c * 2 for c in color[1:])
+    return color
+
+
+def hex_to_rgb(color):
+    digits = color[1:]
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    return tuple(float(int(digits[i:i + 2], 16)) / 255 for i in (0, 2, 4))
+
+
+def rgb_to_hex(rgb):
+    return "#" + "".join("%02x" % int(c * 255 + 0.5 - FLOAT_ERROR) for c in rgb)
+
+
+def rgb_to_hsl(rgb):
+    r, g, b = rgb
+    vmin = min(r, g, b)
+    vmax = max(r, g, b)
+    diff = vmax - vmin
+    vsum = vmin + vmax
+    l = vsum / 2
+    if diff < FLOAT_ERROR:
+        # Gray
+        return (0.0, 0.0, l)
+
+    if l < 0.5:
+        s = diff / vsum
+    else:
+        s = diff / (2.0 - vsum)
+
+    dr = (((vmax - r) / 6) + (diff / 2)) / diff
+    dg = (((vmax - g) / 6) + (diff / 2)) / diff
+    db = (((vmax - b) / 6) + (diff / 2)) / diff
+    if r == vmax:
+        h = db - dg
+    elif g == vmax:
+        h = (1.0 / 3) + dr - db
+    else:
+        h = (2.0 / 3) + dg - dr
+    if h < 0:
+        h += 1
+    if h > 1:
+        h -= 1
+    return (h, s, l)
+
+
+def hue_to_rgb(v1, v2, h):
+    while h < 0:
+        h += 1
+    while h > 1:
+        h -= 1
+    if 6 * h < 1:
+        return v1 + (v2 - v1) * 6 * h
+    if 2 * h < 1:
+        return v2
+    if 3 * h < 2:
+        return v1 + (v2 - v1) * ((2.0 / 3) - h) * 6
+    return v1
+
+
+def hsl_to_rgb(hsl):
+    h, s, l = hsl
+    if s == 0:
+        return l, l, l
+    if l < 0.5:
+        v2 = l * (1.0 + s)
+    else:
+        v2 = (l + s) - (s * l)
+    v1 = 2.0 * l - v2
+    return (hue_to_rgb(v1, v2, h + (1.0 / 3)), hue_to_rgb(v1, v2, h), hue_to_rgb(v1, v2, h - (1.0 / 3)))
+
+
+def hsl_scale(start, end, steps):
+    """:returns: `steps` + 1 HSL colors from `start` to `end`"""
+    if steps < 0:
+        raise ValueError("Unsupported negative number of colors (nb=%r)." % steps)
+    step = tuple(float(end[i] - start[i]) / steps for i in range(3)) if steps > 0 else (0, 0, 0)
+    return [tuple(start[i] + step[i] * r for i in range(3)) for r in range(0, steps + 1)]
 
 
 class ColorRangeModule(object):
     """
     Class to dynamically generate and select colors.
 
-    Requires the PyPI package `colour`
+    Requires the PyPI package `colour` for colors given as plain English
+    names
     """
 
     start_color = "#00FF00"
-    end_color = 'red'
+    end_color = "#FF0000"
 
     @staticmethod
     def get_hex_color_range(start_color, end_color, quantity):
         """
         Generates a list of quantity Hex colors from start_color to end_color.
 
+        Ranges are computed once per process and shared by all modules.
+
         :param start_color: Hex or plain English color for start of range
         :param end_color: Hex or plain English color for end of range
         :param quantity: Number of colours to return
         :return: A list of Hex color values
         """
-        raw_colors = [c.hex for c in list(Color(start_color).range_to(Color(end_color), quantity))]
-        colors = []
-        for color in raw_colors:
-
-            # i3bar expects the full Hex value but for some colors the colour
-            # module only returns partial values. So we need to convert these colors to the full
-            # Hex value.
-            if len(color) == 4:
-                fixed_color = "#"
-                for c in color[1:]:
-                    fixed_color += c * 2
-                colors.append(fixed_color)
-            else:
-                colors.append(color)
-        return colors
+        return list(hex_color_range(start_color, end_color, quantity))
 
     def get_gradient(self, value, colors, upper_limit=100):
         """
@@ -16,6 +16,11 @@ class ConfigKeyError(ConfigError, KeyError):
         return "invalid option '{0}'".format(key)
 
 
+class ConfigValueError(ConfigError, ValueError):
+    def format(self, key, reason):
+        return "invalid value for option '{0}': {1}".format(key, reason)
+
+
 class ConfigMissingError(ConfigError):
     def format(self, missing):
         return "missing required options: {0}".format(missing)
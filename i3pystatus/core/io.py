@@ -1,21 +1,178 @@
+import collections
 import json
+import math
+import os
+import select
 import signal
+import stat
 import sys
+import time
 
 from contextlib import contextmanager
-from threading import Condition
+from threading import Condition, Lock
 from threading import Thread
-from i3pystatus.core.modules import IntervalModule
+from i3pystatus.core.codec import Codec
+from i3pystatus.core.stats import registry
+from i3pystatus.core.threading import EventLoop, Scheduler, StartupPlanner, timer
+
+
+def is_pipe(out):
+    """Tell whether the file object `out` is backed by a pipe."""
+    try:
+        return stat.S_ISFIFO(os.fstat(out.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+class FrameWriter:
+    """
+    Writes lines to the file descriptor of `out` from a thread of its own,
+    using non-blocking I/O.
+
+    While the reader (i3bar) does not keep up, only the most recent of the
+    lines written as `droppable` is kept, superseded ones are dropped and
+    counted as ``frames dropped``. Other lines (the protocol header and the
+    first status line) are always written. How long writes were stalled by
+    a full pipe is recorded in the ``stdout stalls`` histogram of the
+    :py:data:`~i3pystatus.core.stats.registry`.
+
+    Errors of the writer thread (e.g. a closed pipe) are raised by the next
+    call of :py:meth:`write`.
+
+    A pipe is written through a descriptor of its own, opened with
+    ``O_NONBLOCK`` from ``/proc/self/fd``, so the pipe stays blocking for
+    everyone else writing to it (e.g. stderr redirected to stdout). Where
+    that is not available, the pipe is written with blocking writes from
+    the writer thread, superseded lines are still dropped but stalls are
+    not recorded. Other descriptors (a socket of the
+    :py:class:`~i3pystatus.core.server.BarServer`) are made non-blocking.
+
+    :param out: File object to write to, e.g. stdout or a socket file
+    :param stalls: Name of the histogram recording stalls
+    """
+
+    def __init__(self, out, stalls="stdout stalls"):
+        out.flush()
+        # Keep a reference, the descriptor is closed along with `out`
+        self.out = out
+        self.fd = out.fileno()
+        self.own_fd = is_pipe(out)
+        if self.own_fd:
+            self.fd = self._reopen(self.fd)
+        else:
+            os.set_blocking(self.fd, False)
+        self.lines = collections.deque()
+        self.pending = None
+        self.error = None
+        self.closed = False
+        self.cond = Condition()
+        self.stalls = registry.histogram(stalls)
+        self.thread = Thread(target=self._run, name="FrameWriter")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def write(self, line, droppable=False):
+        """Queue the bytes `line` to be written, never blocks."""
+        if self.error:
+            raise self.error
+        with self.cond:
+            if self.pending is not None:
+                if droppable:
+                    registry.counters["frames dropped"] += 1
+                else:
+                    self.lines.append(self.pending)
+                self.pending = None
+            if droppable:
+                self.pending = line
+            else:
+                self.lines.append(line)
+            self.cond.notify()
+
+    def close(self):
+        """Stop the writer thread once all queued lines were written."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+    @staticmethod
+    def _reopen(fd):
+        try:
+            return os.open("/proc/self/fd/{}".format(fd), os.O_WRONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        except OSError:
+            # A duplicate shares the blocking flag, keep it blocking then
+            return os.dup(fd)
+
+    def _run(self):
+        try:
+            self._run_writes()
+        finally:
+            if self.own_fd:
+                os.close(self.fd)
+
+    def _run_writes(self):
+        while True:
+            with self.cond:
+                while not self.lines and self.pending is None:
+                    if self.closed:
+                        return
+                    self.cond.wait()
+                if self.lines:
+                    line = self.lines.popleft()
+                else:
+                    line, self.pending = self.pending, None
+            try:
+                self._write(line + b"\n")
+            except OSError as e:
+                self.error = e
+                return
+
+    def _write(self, data):
+        data = memoryview(data)
+        stalled = None
+        while data:
+            try:
+                data = data[os.write(self.fd, data):]
+            except BlockingIOError:
+                if stalled is None:
+                    stalled = timer()
+                select.select([], [self.fd], [])
+        if stalled is not None:
+            self.stalls.add(timer() - stalled)
 
 
 class IOHandler:
+    """
+    Reads lines from `inp` and writes lines to `out`. Binary streams
+    underlying text streams are used if available, so lines are read as
+    bytes and no encoding or decoding is necessary.
+
+    If a :py:class:`FrameWriter` is set as `writer`, lines are written
+    through it instead.
+    """
+
+    writer = None
+
     def __init__(self, inp=sys.stdin, out=sys.stdout):
         self.inp = inp
         self.out = out
 
-    def write_line(self, message):
-        """Unbuffered printing to stdout."""
+    def write_line(self, message, droppable=False):
+        """
+        Unbuffered printing to stdout, `message` may be str or bytes.
 
+        :param droppable: Whether `message` may be dropped in favour of the
+            next droppable message if it could not be written yet
+        """
+
+        if self.writer:
+            self.writer.write(message if isinstance(message, bytes) else message.encode(), droppable)
+            return
+        if isinstance(message, bytes):
+            if hasattr(self.out, "buffer"):
+                self.out.buffer.write(message + b"\n")
+                self.out.buffer.flush()
+                return
+            message = message.decode()
         self.out.write(message + "\n")
         self.out.flush()
 
@@ -36,7 +193,7 @@ class IOHandler:
         """
 
         try:
-            line = self.inp.readline().strip()
+            line = getattr(self.inp, "buffer", self.inp).readline().strip()
         except KeyboardInterrupt:
             raise EOFError()
 
@@ -62,16 +219,43 @@ class StandaloneIO(IOHandler):
         }, "[", "[]", ",[]",
     ]
 
-    def __init__(self, click_events, modules, keep_alive, interval=1):
+    def __init__(self, click_events, modules, keep_alive, interval=1, align=False,
+                 min_frame_interval=0.0, max_frame_latency=None):
         """
         StandaloneIO instance must be created in main thread to be able to set
         the SIGUSR1 signal handler.
+
+        With `align` set, interval modules are phase-locked to wall-clock
+        boundaries and a line is sent as soon as all modules due at a
+        boundary finished. The regular tick only serves as a fallback, half
+        an interval after the boundary.
+
+        Lines are sent at most every `min_frame_interval` seconds. A refresh
+        requested after a quiet period is sent right away, all further
+        requests within the interval are collapsed into a single line at its
+        end. `max_frame_latency` bounds the delay of a request and takes
+        precedence over `min_frame_interval`.
         """
 
         super().__init__()
         self.interval = interval
         self.modules = modules
-
+        self.align = align
+        self.min_frame_interval = min_frame_interval
+        self.max_frame_latency = min_frame_interval if max_frame_latency is None else max_frame_latency
+        # Time of the last line and of the first refresh request since then
+        self.last_frame = 0.0
+        self.requested = None
+        self.frame_callbacks = []
+        # Called by the refresh thread for other signals, see listen_refresh_signal
+        self.signal_callbacks = {}
+        if align:
+            scheduler = Scheduler.default()
+            scheduler.align = True
+            scheduler.on_tick = self.async_refresh
+
+        # Copy, the class attribute is shared by all instances
+        self.proto = [dict(self.proto[0])] + self.proto[1:]
         self.proto[0]['click_events'] = click_events
 
         if keep_alive:
@@ -82,78 +266,158 @@ class StandaloneIO(IOHandler):
         self.proto[0] = json.dumps(self.proto[0])
 
         self.refresh_cond = Condition()
-        self.treshold_interval = 20.0
 
         self.stopped = False
-        signal.signal(signal.SIGUSR1, self.refresh_signal_handler)
+        self.listen_refresh_signal()
 
     def read(self):
-        self.compute_treshold_interval()
+        if StartupPlanner.instance:
+            # The first frame goes out as soon as the cheap modules ran
+            # instead of a full interval after startup.
+            StartupPlanner.instance.wait()
+            self.last_frame = timer()
+            yield self.read_line()
         self.refresh_cond.acquire()
 
         while True:
             try:
-                self.refresh_cond.wait(timeout=self.interval)
+                # Don't tick while i3bar is hidden, only explicit refreshes
+                # (e.g. from keep_alive modules) produce a line.
+                if self.requested is None:
+                    self.refresh_cond.wait(timeout=None if self.stopped else self.next_timeout())
+                self.coalesce()
             except KeyboardInterrupt:
                 self.refresh_cond.release()
                 return
 
+            self.last_frame = timer()
+            self.requested = None
+            callbacks, self.frame_callbacks = self.frame_callbacks, []
             yield self.read_line()
+            for callback in callbacks:
+                callback()
+
+    def coalesce(self):
+        """Wait until a requested refresh may be sent, must be called with refresh_cond held."""
+        if self.requested is None or not self.min_frame_interval:
+            return
+        due = min(self.last_frame + self.min_frame_interval, self.requested + self.max_frame_latency)
+        remaining = due - timer()
+        while remaining > 0:
+            self.refresh_cond.wait(remaining)
+            remaining = due - timer()
+
+    def next_timeout(self):
+        """Seconds until the regular tick."""
+        if not self.align:
+            return self.interval
+        now = time.time()
+        return (math.floor(now / self.interval) + 1.5) * self.interval - now
 
     def read_line(self):
         self.n += 1
 
         return self.proto[min(self.n, len(self.proto) - 1)]
 
-    def compute_treshold_interval(self):
+    def on_next_frame(self, callback):
+        """Call `callback` without arguments once the next line was written."""
+        with self.refresh_cond:
+            self.frame_callbacks.append(callback)
+
+    def async_refresh(self):
         """
-        Current method is to compute average from all intervals.
+        Calling this method will send the status line to i3bar immediately
+        without waiting for timeout (1s by default). Requests following
+        each other quickly are collapsed, see `min_frame_interval`.
         """
 
-        intervals = [m.interval for m in self.modules if hasattr(m, "interval")]
-        if len(intervals) > 0:
-            self.treshold_interval = round(sum(intervals) / len(intervals))
+        with self.refresh_cond:
+            if self.requested is None:
+                self.requested = timer()
+                self.refresh_cond.notify()
+            else:
+                registry.counters["refreshes coalesced"] += 1
 
-    def async_refresh(self):
+    def listen_refresh_signal(self):
         """
-        Calling this method will send the status line to i3bar immediately
-        without waiting for timeout (1s by default).
+        Install the SIGUSR1 handler and start the thread refreshing the
+        modules when it arrives. The thread also suspends and resumes modules
+        on SIGUSR2, if its handler is installed (see `keep_alive`), and calls
+        the callbacks in `signal_callbacks` for the signals mapped to them.
+        Their handlers must do nothing.
+
+        Python runs signal handlers in the main thread between two bytecodes,
+        where taking a lock or running modules can stall or deadlock the
+        output loop. Instead, the signal numbers are written to a pipe using
+        :py:func:`signal.set_wakeup_fd` and read by the refresh thread.
         """
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(write_fd, False)
+        if sys.version_info >= (3, 7):
+            # A full pipe only loses signals that are already pending
+            signal.set_wakeup_fd(write_fd, warn_on_full_buffer=False)
+        else:
+            signal.set_wakeup_fd(write_fd)
+        signal.signal(signal.SIGUSR1, self.refresh_signal_handler)
+        thread = Thread(target=self._read_signals, args=(read_fd,), name="RefreshSignal")
+        thread.daemon = True
+        thread.start()
 
-        self.refresh_cond.acquire()
-        self.refresh_cond.notify()
-        self.refresh_cond.release()
+    def _read_signals(self, fd):
+        while True:
+            # All signals received since the last read arrive at once, so
+            # a burst of SIGUSR1 results in a single refresh.
+            signals = os.read(fd, 512)
+            for signo in signals:
+                if signo == signal.SIGUSR2:
+                    self.toggle_suspended()
+            if signal.SIGUSR1 in signals:
+                self.refresh_modules()
+            for signo, callback in list(self.signal_callbacks.items()):
+                if signo in signals:
+                    callback()
 
     def refresh_signal_handler(self, signo, frame):
         """
         This callback is called when SIGUSR1 signal is received.
 
-        It updates outputs of all modules by calling their `run` method.
-
-        Interval modules are updated in separate threads if their interval is
-        above a certain treshold value.
-        This treshold is computed by :func:`compute_treshold_interval` class
-        method.
-        The reasoning is that modules with larger intervals also usually take
-        longer to refresh their output and that their output is not required in
-        'real time'.
-        This also prevents possible lag when updating all modules in a row.
+        It does nothing by itself, the signal wakes up the refresh thread
+        started by :py:meth:`listen_refresh_signal`, which calls
+        :py:meth:`refresh_modules`.
         """
 
-        if signo != signal.SIGUSR1:
-            return
-
-        for module in self.modules:
-            if hasattr(module, "interval"):
-                if module.interval > self.treshold_interval:
-                    thread = Thread(target=module.run)
-                    thread.start()
-                else:
-                    module.run()
-            else:
-                module.run()
+    def refresh_modules(self):
+        """
+        Update outputs of all modules and send a status line once all of them
+        finished.
 
-        self.async_refresh()
+        Modules run by the :py:class:`~i3pystatus.core.threading.Scheduler`
+        are run right away on its worker pool. A module that is already
+        running or waiting to run is run only once more. All other modules
+        are refreshed by calling their `refresh` method in the calling thread.
+        """
+        scheduler = Scheduler.instance
+        modules = list(self.modules)
+        # One for every module and one for the loop below
+        pending = [len(modules) + 1]
+        lock = Lock()
+
+        def done():
+            with lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            self.async_refresh()
+
+        for module in modules:
+            if scheduler and scheduler.retry(module, done):
+                continue
+            try:
+                module.refresh()
+            except Exception:
+                module.logger.exception("Exception in refresh")
+            done()
+        done()
 
     def suspend_signal_handler(self, signo, frame):
         """
@@ -162,23 +426,67 @@ class StandaloneIO(IOHandler):
         For some modules, this is not desirable. Thankfully, the i3bar protocol supports setting the "stop_signal"
         and "cont_signal" key/value pairs in the header to allow sending a custom signal when these events occur.
 
-        Here we use SIGUSR2 for both "stop_signal" and "cont_signal" and maintain a toggle to determine whether
-        we have just been stopped or continued. When we have been stopped, notify the IntervalModule managers
-        that they should suspend any module that does not set the keep_alive flag to a truthy value, and when we
-        have been continued, notify the IntervalModule managers that they can resume execution of all modules.
+        Here we use SIGUSR2 for both "stop_signal" and "cont_signal". Like SIGUSR1, the signal only wakes up the
+        thread started by :py:meth:`listen_refresh_signal`, which calls :py:meth:`toggle_suspended`.
+        """
+
+    def toggle_suspended(self):
+        """
+        Maintain a toggle to determine whether we have just been stopped or continued by SIGUSR2. When we have
+        been stopped, notify the IntervalModule managers that they should suspend any module that does not set
+        the keep_alive flag to a truthy value, and when we have been continued, notify the IntervalModule managers
+        that they can resume execution of all modules.
+
+        While stopped, parked modules and the output loop do not wake up at all. On resume every parked module
+        runs once and a single status line is sent as soon as all of them finished.
         """
-        if signo != signal.SIGUSR2:
-            return
         self.stopped = not self.stopped
         if self.stopped:
-            [m.suspend() for m in IntervalModule.managers.values()]
+            if Scheduler.instance:
+                Scheduler.instance.suspend()
+            if EventLoop.instance:
+                EventLoop.instance.suspend()
         else:
-            [m.resume() for m in IntervalModule.managers.values()]
+            if EventLoop.instance:
+                EventLoop.instance.resume()
+            if Scheduler.instance:
+                Scheduler.instance.resume(self.async_refresh)
+            else:
+                self.async_refresh()
 
 
 class JSONIO:
-    def __init__(self, io, skiplines=2):
+    """
+    Reads lines of JSON from `io` and writes them back after the consumer
+    modified them.
+
+    If `version` is given, lines are only written if something changed:
+    input lines are skipped without even being parsed as long as neither
+    they nor `version()` changed, and lines serializing to the previous
+    output are not written again. The number of written and suppressed
+    lines are counted as ``frames emitted`` and ``frames suppressed`` in
+    the :py:data:`~i3pystatus.core.stats.registry`.
+
+    :param io: An :py:class:`IOHandler`
+    :param skiplines: Number of header lines passed through unmodified
+    :param version: Callable returning a value that changes whenever the
+        consumer would modify lines differently, see
+        :py:meth:`~i3pystatus.core.util.ModuleList.output_version`
+    :param heartbeat: Seconds after which an unchanged line is written anyway,
+        for consumers that expect regular updates
+    :param codec: A :py:class:`~i3pystatus.core.codec.Codec`, defaults to
+        the process-wide one
+    """
+
+    def __init__(self, io, skiplines=2, version=None, heartbeat=None, codec=None):
         self.io = io
+        self.codec = codec or Codec.default()
+        self.version = version
+        self.heartbeat = heartbeat
+        self.last_input = None
+        self.last_version = None
+        self.last_output = None
+        self.written = timer()
         for i in range(skiplines):
             self.io.write_line(self.io.read_line())
 
@@ -186,18 +494,63 @@ class JSONIO:
         """Iterate over all JSON input (Generator)"""
 
         for line in self.io.read():
+            if self.unchanged(line):
+                registry.counters["frames suppressed"] += 1
+                continue
             with self.parse_line(line) as j:
                 yield j
 
+    def assemble(self, serialize):
+        """
+        Like :py:meth:`read`, but instead of modifying the parsed input,
+        write the line returned by ``serialize(items)``, see
+        :py:meth:`~i3pystatus.core.util.ModuleList.serialize`.
+        """
+        for line in self.io.read():
+            if self.unchanged(line):
+                registry.counters["frames suppressed"] += 1
+                continue
+            comma, line = self.split_prefix(line)
+            self.emit(comma, serialize(self.codec.loads(line)))
+
+    def unchanged(self, line):
+        """Tell whether `line` would produce the same output as the previous line."""
+        if self.version is None or self.heartbeat_due():
+            return False
+        line, version = self.split_prefix(line)[1], self.version()
+        if line == self.last_input and version == self.last_version:
+            return True
+        self.last_input, self.last_version = line, version
+        return False
+
+    def heartbeat_due(self):
+        return self.heartbeat is not None and timer() - self.written >= self.heartbeat
+
     @contextmanager
     def parse_line(self, line):
         """Parse a single line of JSON and write modified JSON back."""
 
-        prefix = ""
-        # ignore comma at start of lines
-        if line.startswith(","):
-            line, prefix = line[1:], ","
-
-        j = json.loads(line)
+        comma, line = self.split_prefix(line)
+        j = self.codec.loads(line)
         yield j
-        self.io.write_line(prefix + json.dumps(j))
+        self.emit(comma, self.codec.dumps(j))
+
+    @staticmethod
+    def split_prefix(line):
+        """:returns: Whether `line` (str or bytes) starts with a comma, and the rest of it"""
+        # ignore comma at start of lines
+        if line[:1] in (",", b","):
+            return True, line[1:]
+        return False, line
+
+    def emit(self, comma, output):
+        """Write the bytes `output` unless they are the same as the previous output."""
+        if self.version is not None:
+            if output == self.last_output and not self.heartbeat_due():
+                registry.counters["frames suppressed"] += 1
+                return
+            self.last_output = output
+            self.written = timer()
+            registry.counters["frames emitted"] += 1
+        # Lines after the first one are superseded by the next line
+        self.io.write_line(b"," + output if comma else output, droppable=comma)
@@ -1,13 +1,24 @@
+import asyncio
 import html
 import inspect
+import itertools
 import traceback
 
+from i3pystatus.core.codec import Codec
+from i3pystatus.core.exceptions import ConfigValueError
+from i3pystatus.core.process import ProcessPool
 from i3pystatus.core.settings import SettingsBase
-from i3pystatus.core.threading import Manager
+from i3pystatus.core.stats import registry
+from i3pystatus.core.threading import (EventLoop, ExceptionWrapper, Manager, Scheduler, StartupPlanner, StepTimer,
+                                       align_deadline, backoff_delay, timer)
 from i3pystatus.core.util import (convert_position,
                                   MultiClickHandler)
 from i3pystatus.core.command import execute
 
+# Shared by all modules, so the highest version of a set of modules changes
+# whenever any of them sets new output.
+output_versions = itertools.count(1)
+
 
 def is_method_of(method, object):
     """Decide whether ``method`` is contained within the MRO of ``object``."""
@@ -41,6 +52,7 @@ class Module(SettingsBase):
         ('on_change', "Callback called when output is changed (see :ref:`callbacks`)"),
         ('multi_click_timeout', "Time (in seconds) before a single click is executed."),
         ('hints', "Additional output blocks for module output (see :ref:`hints`)"),
+        ('stale_marker', "Appended to the output while it is outdated, for example because the module hangs"),
     )
 
     on_leftclick = None
@@ -62,8 +74,17 @@ class Module(SettingsBase):
 
     hints = {"markup": "none"}
 
+    stale_marker = "*"
+
+    # Bumped by every assignment to output, see ModuleList.output_version.
+    # Modules changing the output dict in place must assign it again.
+    output_version = 0
+    __fragment = None
+    __fragment_version = None
+
     def __init__(self, *args, **kwargs):
         self._output = None
+        self.stale = False
         super(Module, self).__init__(*args, **kwargs)
         self.__multi_click = MultiClickHandler(self.__button_callback_handler,
                                                self.multi_click_timeout)
@@ -75,35 +96,75 @@ class Module(SettingsBase):
     @output.setter
     def output(self, value):
         self._output = value
+        self.output_version = next(output_versions)
+        self.stale = False
         if self.on_change:
             self.on_change()
 
+    def mark_stale(self):
+        """
+        Keep showing the current output, but mark it as outdated by appending
+        `stale_marker`. The mark is removed as soon as new output is set.
+        """
+        if self.stale or not self.output or "full_text" not in self.output:
+            return
+        self.output = dict(self.output, full_text=self.output["full_text"] + self.stale_marker)
+        self.stale = True
+
     def registered(self, status_handler):
         """Called when this module is registered with a status handler"""
         self.__status_handler = status_handler
 
+    def finalize(self):
+        """
+        Complete `output` to the block sent to i3bar: set name and instance,
+        drop white colors, apply hints and escape pango markup.
+
+        :returns: `output`
+        """
+        if "name" not in self.output:
+            self.output["name"] = self.__name__
+        self.output["instance"] = str(id(self))
+        if (self.output.get("color", "") or "").lower() in ("", "#ffffff"):
+            self.output.pop("color", None)
+        if self.hints:
+            for key, val in self.hints.items():
+                if key not in self.output:
+                    self.output.update({key: val})
+        if self.output.get("markup") == "pango":
+            self.text_to_pango()
+        return self.output
+
     def inject(self, json):
         if self.output:
-            if "name" not in self.output:
-                self.output["name"] = self.__name__
-            self.output["instance"] = str(id(self))
-            if (self.output.get("color", "") or "").lower() in ("", "#ffffff"):
-                self.output.pop("color", None)
-            if self.hints:
-                for key, val in self.hints.items():
-                    if key not in self.output:
-                        self.output.update({key: val})
-            if self.output.get("markup") == "pango":
-                self.text_to_pango()
-
-            json.insert(convert_position(self.position, json), self.output)
+            json.insert(convert_position(self.position, json), self.finalize())
+
+    def fragment(self):
+        """
+        :returns: The finalized output serialized as JSON (bytes), or None
+            without output. Cached until output is assigned again.
+        """
+        version = self.output_version
+        if version != self.__fragment_version:
+            self.__fragment = Codec.default().dumps(self.finalize()) if self.output else None
+            self.__fragment_version = version
+        return self.__fragment
 
     def run(self):
         pass
 
+    def refresh(self):
+        """
+        Update the output right away. Called after click events and when
+        SIGUSR1 is received. Calls :py:meth:`run` by default.
+        """
+        self.run()
+
     def send_output(self):
         """Send a status update with the current module output"""
-        self.__status_handler.io.async_refresh()
+        io = getattr(self.__status_handler, "io", None)
+        if hasattr(io, "async_refresh"):
+            io.async_refresh()
 
     def __log_button_event(self, button, cb, args, action, **kwargs):
         msg = "{}: button={}, cb='{}', args={}, kwargs={}, type='{}'".format(
@@ -283,12 +344,23 @@ class Module(SettingsBase):
 class IntervalModule(Module):
     settings = (
         ("interval", "interval in seconds between module updates"),
+        ("run_timeout", "seconds after which a hung run is moved out of the way of other modules, "
+                        "the last output is kept and marked as stale"),
+        ("executor", "``thread`` or ``process``; the latter runs the module in a worker process and only "
+                     "ships its output and data (as a plain dict) back, for CPU heavy or crash-prone modules"),
+        ("max_backoff", "seconds up to which the interval is doubled while run() keeps failing, "
+                        "clicking the module retries right away; 0 disables backoff"),
     )
     interval = 5  # seconds
+    run_timeout = None
+    executor = "thread"
+    max_backoff = 300
     managers = {}
 
     def registered(self, status_handler):
         super(IntervalModule, self).registered(status_handler)
+        if self.executor == "process":
+            ProcessPool.default().register(self)
         if self.interval in IntervalModule.managers:
             IntervalModule.managers[self.interval].append(self)
         else:
@@ -298,10 +370,136 @@ class IntervalModule(Module):
             am.start()
 
     def __call__(self):
-        self.run()
+        self.refresh()
+
+    def refresh(self):
+        if self.executor == "process":
+            ProcessPool.default().run(self)
+        else:
+            self.run()
 
     def run(self):
         """Called approximately every self.interval seconds
 
         Do not rely on this being called from the same thread at all times.
         If you need to always have the same thread context, subclass AsyncModule."""
+
+
+class AsyncIntervalModule(IntervalModule):
+    """
+    Interval module whose :py:meth:`run` method is a coroutine.
+
+    All instances share a single asyncio event loop (see
+    :py:class:`~i3pystatus.core.threading.EventLoop`) instead of occupying a
+    thread each while they wait for I/O. A run taking longer than
+    `run_timeout` seconds is cancelled, the last output is kept and marked as
+    stale. The status bar is updated as soon as a run finished.
+
+    The ``process`` executor is not supported, the coroutine always runs in
+    the event loop thread.
+
+    .. code:: python
+
+        class Ping(AsyncIntervalModule):
+            async def run(self):
+                proc = await asyncio.create_subprocess_exec("ping", "-c1", "example.com")
+                self.output = {"full_text": "up" if await proc.wait() == 0 else "down"}
+    """
+
+    settings = (
+        ("run_timeout", "seconds after which a run is cancelled and the last output marked as stale, "
+                        "defaults to interval"),
+    )
+
+    __current = None
+    __refresh = None
+    __failures = 0
+
+    def registered(self, status_handler):
+        if self.executor == "process":
+            raise ConfigValueError(self.__name__, "executor", "coroutine modules run in the event loop thread")
+        Module.registered(self, status_handler)
+        self.__exception_handler = ExceptionWrapper(self)
+        self.stats = registry.register(self)
+        self.__startup = StartupPlanner.default()
+        self.__delay = self.__startup.plan(self, self.interval)
+        self.event_loop = EventLoop.default()
+        self.event_loop.add(self)
+
+    def __call__(self):
+        self.refresh()
+
+    async def schedule(self):
+        """Scheduling loop, runs in the event loop thread until the program exits."""
+        self.__refresh = asyncio.Event()
+        if self.__delay:
+            # Staggered first run, see StartupPlanner
+            try:
+                await asyncio.wait_for(self.__refresh.wait(), self.__delay)
+            except asyncio.TimeoutError:
+                pass
+        deadline = timer()
+        while True:
+            if not getattr(self, "keep_alive", False):
+                await self.event_loop.wait_resumed()
+            self.__current = asyncio.ensure_future(self.run_once())
+            try:
+                await asyncio.wait([self.__current])
+            finally:
+                self.__current.cancel()
+            if self.__current.cancelled():
+                continue
+            if not self.__startup.ready.is_set():
+                self.__startup.ran(self)
+            self.__failures = 0 if self.__current.result() else self.__failures + 1
+            delay = backoff_delay(self.interval, self.__failures, self.max_backoff)
+            self.stats.failures = self.__failures
+            self.stats.backoff = delay if self.__failures else None
+            if Scheduler.instance and Scheduler.instance.align:
+                # Phase-lock to wall-clock boundaries like scheduled modules
+                deadline = align_deadline(max(deadline + delay, timer()), self.interval)
+                delay = deadline - timer()
+            self.__refresh.clear()
+            try:
+                await asyncio.wait_for(self.__refresh.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                deadline = timer()
+
+    async def run_once(self):
+        """:returns: False if the run failed"""
+        tp1 = timer()
+        failed = False
+        # Only the CPU time of this module, not of others awaited meanwhile
+        run = StepTimer(self.run())
+        try:
+            await asyncio.wait_for(run, self.run_timeout or self.interval)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.logger.warning("run() exceeded %s seconds, cancelled", self.run_timeout or self.interval)
+            self.mark_stale()
+            failed = True
+        except Exception:
+            self.__exception_handler.handle_exception()
+            failed = True
+        self.stats.record(timer() - tp1, run.cpu, failed)
+        self.send_output()
+        return not failed
+
+    def refresh(self):
+        """
+        Run the module as soon as possible, regardless of backoff. May be
+        called from any thread.
+        """
+        if self.__refresh is not None:
+            self.event_loop.call_soon(self.__refresh.set)
+
+    def cancel(self):
+        """Cancel the current run, must be called in the event loop thread."""
+        if self.__current is not None:
+            self.__current.cancel()
+
+    async def run(self):
+        """Called approximately every self.interval seconds in the event loop thread."""
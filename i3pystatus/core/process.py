@@ -0,0 +1,196 @@
+import collections.abc
+import multiprocessing
+import os
+import pickle
+import signal
+import struct
+import sys
+import threading
+
+from i3pystatus.core.stats import registry
+from i3pystatus.core.threading import timer
+
+# Types of settings that are copied to the worker process before every run,
+# so changes made by callbacks (e.g. cycling through formats) are seen there.
+PLAIN_TYPES = (str, int, float, bool, type(None))
+HEADER = struct.Struct("d")
+
+
+class WorkerDied(Exception):
+    """Raised in place of the result of a run whose worker process died."""
+
+
+class ProcessWorker:
+    """
+    A forked worker process and the parent end of the pipe connected to it.
+
+    The worker inherits the modules assigned to it at fork time and keeps
+    its copies of them between runs, so module state (counters, previous
+    readings, ...) is retained in the worker.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.modules = {}
+        self.lock = threading.Lock()
+        self.process = None
+        self.connection = None
+
+    def spawn(self):
+        self.stop()
+        parent, child = multiprocessing.Pipe()
+        context = multiprocessing.get_context("fork")
+        self.process = context.Process(target=serve, args=(child, self.modules), daemon=True)
+        self.process.start()
+        child.close()
+        self.connection = parent
+
+    def stop(self):
+        if self.process is not None:
+            self.connection.close()
+            self.process.terminate()
+            self.process.join(1)
+            self.process = None
+
+    def call(self, request):
+        if self.process is None:
+            self.spawn()
+        try:
+            self.connection.send(request)
+            if not self.connection.poll(self.pool.timeout):
+                self.stop()
+                raise WorkerDied("worker process did not reply within {}s".format(self.pool.timeout))
+            return self.connection.recv_bytes()
+        except (EOFError, OSError):
+            self.process.join(1)
+            exitcode = self.process.exitcode
+            self.stop()
+            raise WorkerDied("worker process died (exit code {})".format(exitcode))
+
+
+class ProcessPool:
+    """
+    Runs the run() method of modules in forked worker processes.
+
+    Every module is pinned to one of `size` workers. Only the module's
+    `output` and `data` attributes are sent back to the main process, which
+    keeps CPU heavy modules off the GIL of the main process and contains
+    crashes of C extensions. Plain (str, number, bool, None) settings are
+    copied to the worker before every run.
+
+    The time spent pickling and unpickling results and the number of bytes
+    transferred are recorded in the module's
+    :py:class:`~i3pystatus.core.stats.ModuleStats`.
+
+    Requires the fork start method, i.e. Linux or another POSIX system.
+    :py:meth:`start` forks the workers before any thread runs modules (see
+    :py:meth:`~i3pystatus.core.threading.Scheduler.hold`). A module
+    registered after that gets a worker of its own, forked by
+    :py:meth:`register`, as forking the worker it would have been assigned
+    to again loses the state of the modules in it. Only workers that died
+    are forked again on demand.
+
+    `data` that is a mapping but not a dict (e.g.
+    :py:class:`~i3pystatus.core.util.LazyData`) is converted to a dict in the
+    worker, which computes all of its values.
+
+    :param size: Number of worker processes
+    :param timeout: Seconds to wait for a run to finish, a worker that takes
+        longer is killed
+    """
+
+    instance = None
+
+    def __init__(self, size=2, timeout=60):
+        self.timeout = timeout
+        self.started = False
+        self.assignments = {}
+        self.workers = [ProcessWorker(self) for _ in range(size)]
+
+    @classmethod
+    def default(cls):
+        """Returns the process-wide pool used by interval modules."""
+        if cls.instance is None:
+            cls.instance = cls()
+        return cls.instance
+
+    def start(self):
+        """Fork the workers that have modules assigned and are not running yet."""
+        self.started = True
+        for worker in set(self.assignments.values()):
+            with worker.lock:
+                if worker.process is None:
+                    worker.spawn()
+
+    def register(self, module):
+        key = id(module)
+        if self.started:
+            worker = ProcessWorker(self)
+            worker.modules[key] = module
+            worker.spawn()
+            self.workers.append(worker)
+        else:
+            worker = self.workers[len(self.assignments) % len(self.workers)]
+            worker.modules[key] = module
+        self.assignments[key] = worker
+
+    def run(self, module):
+        """Run `module` in its worker process and apply the result to `module`."""
+        key = id(module)
+        worker = self.assignments[key]
+        settings = {name: getattr(module, name, None) for name in module.flatten_settings(module.settings)}
+        request = (key, {name: value for name, value in settings.items() if isinstance(value, PLAIN_TYPES)})
+        with worker.lock:
+            status, payload, dump_time, size, load_time = self.decode(worker.call(request))
+
+        stats = registry.get(module)
+        if stats:
+            stats.record_transfer(dump_time + load_time, size)
+        if status == "error":
+            raise payload
+        output, data = payload
+        if data is not None:
+            module.data = data
+        module.output = output
+
+    @staticmethod
+    def decode(reply):
+        tp1 = timer()
+        dump_time, = HEADER.unpack_from(reply)
+        status, payload = pickle.loads(reply[HEADER.size:])
+        return status, payload, dump_time, len(reply), timer() - tp1
+
+
+def serve(connection, modules):
+    """Main loop of a worker process."""
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+    signal.signal(signal.SIGUSR2, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.stdout = open(os.devnull, "w")
+    for module in modules.values():
+        # Output of the worker reaches i3bar through the main process only,
+        # and locks of its IO may have been held by other threads at fork time
+        module.send_output = lambda: None
+
+    while True:
+        try:
+            key, settings = connection.recv()
+        except (EOFError, OSError):
+            return
+        module = modules[key]
+        module.__dict__.update(settings)
+        try:
+            module.run()
+            data = getattr(module, "data", None)
+            if isinstance(data, collections.abc.Mapping) and not isinstance(data, dict):
+                # Lazy values can not be pickled
+                data = dict(data)
+            result = ("ok", (module.output, data))
+        except Exception as e:
+            result = ("error", e)
+        tp1 = timer()
+        try:
+            payload = pickle.dumps(result)
+        except Exception as e:
+            payload = pickle.dumps(("error", TypeError("could not pickle result: {}".format(e))))
+        connection.send_bytes(HEADER.pack(timer() - tp1) + payload)
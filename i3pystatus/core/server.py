@@ -0,0 +1,229 @@
+import errno
+import logging
+import os
+import select
+import socket
+from threading import Lock, Thread
+
+from i3pystatus.core.codec import Codec
+from i3pystatus.core.io import FrameWriter
+from i3pystatus.core.util import assemble
+
+log = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """
+    A bar connected to a :py:class:`BarServer`.
+
+    :param conn: The connected socket
+    :param request: The parsed first line sent by the client, see :py:class:`BarServer`
+    :raises ValueError: if the request is invalid
+    """
+
+    protocols = ("i3bar", "text")
+
+    def __init__(self, conn, request, codec):
+        if not isinstance(request, dict):
+            raise ValueError("Expected a JSON object, got {!r}".format(request))
+        self.selectors = request.get("modules")
+        self.protocol = request.get("protocol", "i3bar")
+        self.separator = request.get("separator", " | ")
+        if self.protocol not in self.protocols:
+            raise ValueError("Unknown protocol {!r}, expected one of {}".format(self.protocol, ", ".join(self.protocols)))
+        self.codec = codec
+        self.conn = conn
+        # Makes the socket non-blocking, see BarServer.read_lines
+        self.writer = FrameWriter(conn.makefile("wb"), "subscriber stalls")
+        self.last = None
+
+    def selects(self, module):
+        """Tell whether `module` is one of the modules requested by the client."""
+        if self.selectors is None:
+            return True
+        cls = type(module)
+        return any(name in self.selectors
+                   for name in (module.__name__, cls.__name__, cls.__module__.rpartition(".")[2]))
+
+    def frame(self, blocks):
+        """
+        :param blocks: Pairs of a module and its fragment, see :py:attr:`BarServer.blocks`
+        :returns: The line for the client (bytes)
+        """
+        line = assemble([], [(module, fragment) for module, fragment in blocks if self.selects(module)])
+        if self.protocol == "i3bar":
+            return line
+        texts = (block.get("full_text", "") for block in self.codec.loads(line))
+        return self.separator.join(text for text in texts if text).encode()
+
+    def publish(self, blocks):
+        """Send the current line to the client unless it did not change."""
+        line = self.frame(blocks)
+        if line != self.last:
+            self.last = line
+            self.writer.write(line, droppable=True)
+
+
+class BarServer:
+    """
+    Serves the blocks of a status bar to other bars over a UNIX socket, so
+    several bars (e.g. one per monitor, or i3bar next to lemonbar) share a
+    single process collecting the data.
+
+    A client connects to `path` and sends a line of JSON describing what it
+    wants to receive:
+
+    - ``modules``: List of module names. A module is included if its
+      ``name``, class name or module name (as passed to
+      :py:meth:`~i3pystatus.core.Status.register`) is in the list. All
+      modules are included if missing.
+    - ``protocol``: ``i3bar`` (the default) for lines of JSON arrays of
+      blocks as in the i3bar protocol, or ``text`` for the ``full_text`` of
+      the blocks joined by ``separator`` (defaults to `` | ``).
+
+    The server then sends a line whenever the output of the selected modules
+    changed. A line the client did not read yet is superseded by the next
+    one, so a stuck client does not hold up the others. Every line the
+    client sends afterwards is parsed as an i3bar click event and passed to
+    `click`.
+
+    Lines are built from the fragments of the modules (see
+    :py:meth:`~i3pystatus.core.modules.Module.fragment`) in
+    :py:meth:`publish`, which is called by the thread writing the status
+    line. The first line sent to a new client is built from the fragments of
+    the last :py:meth:`publish`, no line is sent before that.
+
+    The ``i3pystatus-client`` command (:py:mod:`i3pystatus.tools.client`)
+    is such a client.
+
+    :param path: Path of the socket
+    :param modules: The :py:class:`~i3pystatus.core.util.ModuleList` to serve
+    :param click: Called with every click event received from a client
+    :param codec: A :py:class:`~i3pystatus.core.codec.Codec`, defaults to
+        the process-wide one
+    """
+
+    def __init__(self, path, modules, click=None, codec=None):
+        self.path = path
+        self.modules = modules
+        self.click = click
+        self.codec = codec or Codec.default()
+        self.subscribers = []
+        # Modules and their fragments as of the last publish, see Subscriber.frame
+        self.blocks = None
+        self.lock = Lock()
+        self.sock = None
+
+    def start(self):
+        """Listen on the socket and accept clients in a background thread."""
+        self.remove_stale()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        self.sock.listen()
+        thread = Thread(target=self._accept, name="BarServer")
+        thread.daemon = True
+        thread.start()
+
+    def remove_stale(self):
+        """
+        Remove the socket left behind by a server that is gone.
+
+        :raises OSError: if another server is listening on `path`
+        """
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except ConnectionRefusedError:
+            os.unlink(self.path)
+            return
+        finally:
+            probe.close()
+        raise OSError(errno.EADDRINUSE, "Another server is listening on {}".format(self.path))
+
+    def close(self):
+        """Stop accepting clients, disconnect all clients and remove the socket."""
+        if self.sock is None:
+            return
+        sock, self.sock = self.sock, None
+        # Wakes up the thread blocked in accept()
+        sock.shutdown(socket.SHUT_RDWR)
+        sock.close()
+        os.unlink(self.path)
+        with self.lock:
+            for subscriber in self.subscribers:
+                try:
+                    subscriber.conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def publish(self):
+        """Send changed lines to all clients, called after every frame."""
+        with self.lock:
+            self.blocks = [(module, module.fragment()) for module in self.modules]
+            for subscriber in self.subscribers:
+                try:
+                    subscriber.publish(self.blocks)
+                except OSError:
+                    # Disconnected, removed by the thread serving it
+                    pass
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except (AttributeError, OSError):
+                # Closed
+                return
+            thread = Thread(target=self._serve, args=(conn,), name="BarServer-client")
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, conn):
+        lines = self.read_lines(conn)
+        subscriber = None
+        try:
+            subscriber = Subscriber(conn, self.codec.loads(next(lines, b"")), self.codec)
+            with self.lock:
+                self.subscribers.append(subscriber)
+                if self.blocks is not None:
+                    subscriber.publish(self.blocks)
+            for line in lines:
+                self.clicked(line)
+        except (OSError, ValueError):
+            log.exception("Client of {} failed".format(self.path))
+        finally:
+            if subscriber:
+                with self.lock:
+                    self.subscribers.remove(subscriber)
+                subscriber.writer.close()
+            conn.close()
+
+    @staticmethod
+    def read_lines(conn):
+        """
+        Iterate over the lines received on `conn` until the client
+        disconnects. Works with non-blocking sockets, unlike the file objects
+        returned by :py:meth:`socket.socket.makefile`.
+        """
+        buffer = b""
+        while True:
+            select.select([conn], [], [])
+            try:
+                data = conn.recv(1 << 16)
+            except BlockingIOError:
+                continue
+            if not data:
+                return
+            *lines, buffer = (buffer + data).split(b"\n")
+            yield from lines
+
+    def clicked(self, line):
+        """Pass the click event `line` received from a client on to `click`."""
+        if not self.click or not line.strip():
+            return
+        try:
+            self.click(self.codec.loads(line))
+        except Exception:
+            log.exception("Invalid click event {!r}".format(line))
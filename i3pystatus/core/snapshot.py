@@ -0,0 +1,138 @@
+import logging
+import os
+import tempfile
+import time
+from threading import Lock, Thread
+
+from i3pystatus.core.codec import Codec
+from i3pystatus.core.threading import timer
+
+log = logging.getLogger(__name__)
+
+
+def has_text(output):
+    """Tell whether `output` shows anything, many modules set an empty `full_text` until they ran."""
+    return isinstance(output, dict) and bool(output.get("full_text"))
+
+
+class Snapshot:
+    """
+    Keeps the last output (and `data`, for callbacks) of all modules in a
+    file, so the bar can show it right after startup instead of waiting for
+    slow modules to run for the first time.
+
+    Modules are identified by their name and the number of modules with the
+    same name registered before them, e.g. ``i3pystatus.weather.Weather#0``,
+    so the snapshot stays valid as long as the order of modules of the same
+    kind in the configuration does not change. Restored output is marked as
+    stale (see :py:meth:`~i3pystatus.core.modules.Module.mark_stale`) until
+    the module sets new output.
+
+    :param path: Path of the snapshot file
+    :param interval: Seconds between two writes of the snapshot, it is only
+        written if some output changed
+    :param codec: A :py:class:`~i3pystatus.core.codec.Codec`, defaults to
+        the process-wide one
+    """
+
+    def __init__(self, path, interval=60, codec=None):
+        self.path = path
+        self.interval = interval
+        self.codec = codec or Codec.default()
+        self.entries = self.load()
+        # Registered modules and their keys, in order of registration
+        self.modules = []
+        self.ordinals = {}
+        self.saved_version = None
+        self.lock = Lock()
+
+    def load(self):
+        """:returns: The entries of the snapshot file, empty if it does not exist or is invalid"""
+        try:
+            with open(self.path, "rb") as f:
+                entries = self.codec.loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            log.exception("Could not read snapshot {}".format(self.path))
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def key(self, module):
+        """:returns: The key of the next registered `module`"""
+        ordinal = self.ordinals.get(module.__name__, 0)
+        self.ordinals[module.__name__] = ordinal + 1
+        return "{}#{}".format(module.__name__, ordinal)
+
+    def restore(self, module):
+        """
+        Set output and data of `module`, which is about to be registered, to
+        the ones of the snapshot and mark them stale. Output set by the module
+        itself is kept unless its `full_text` is empty.
+        """
+        key = self.key(module)
+        with self.lock:
+            self.modules.append((key, module))
+        entry = self.entries.get(key)
+        if not isinstance(entry, dict) or not has_text(entry.get("output")) or has_text(module.output):
+            return
+        if entry.get("data") is not None and getattr(module, "data", None) is None:
+            module.data = entry["data"]
+        module.output = entry["output"]
+        module.mark_stale()
+
+    def save(self):
+        """Write the snapshot if some output changed since the last write."""
+        with self.lock:
+            modules = list(self.modules)
+        version = max((module.output_version for key, module in modules), default=0)
+        if version == self.saved_version:
+            return
+        entries = {}
+        for key, module in modules:
+            # Stale output carries the stale marker, keep the previous entry
+            if module.stale:
+                if key in self.entries:
+                    entries[key] = self.entries[key]
+            elif has_text(module.output):
+                entries[key] = self.entry(module)
+        self.entries = entries
+        data = self.codec.dumps(self.entries)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temporary, self.path)
+        except OSError:
+            os.unlink(temporary)
+            raise
+        self.saved_version = version
+
+    def entry(self, module):
+        entry = {"output": dict(module.output)}
+        data = getattr(module, "data", None)
+        if data is not None:
+            try:
+                self.codec.dumps(data)
+                entry["data"] = data
+            except (TypeError, ValueError, OverflowError):
+                # Not representable as JSON, only the output is restored
+                pass
+        return entry
+
+    def start(self):
+        """Write the snapshot every `interval` seconds in a background thread."""
+        thread = Thread(target=self._run, name="Snapshot")
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        deadline = timer()
+        while True:
+            deadline += self.interval
+            time.sleep(max(0, deadline - timer()))
+            try:
+                self.save()
+            except Exception:
+                log.exception("Could not write snapshot {}".format(self.path))
@@ -0,0 +1,179 @@
+import bisect
+import collections
+import threading
+import time
+
+
+class Histogram:
+    """
+    Latency histogram with logarithmic buckets.
+
+    Bucket boundaries grow by a factor of √2 from 10µs to roughly two
+    minutes, recording a value is a single binary search. Percentiles are
+    reported as the upper boundary of the bucket they fall into.
+    """
+
+    bounds = [1e-5 * 2 ** (i / 2) for i in range(48)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+
+    def __len__(self):
+        return sum(self.counts)
+
+    def percentile(self, percent):
+        """
+        :param percent: A value between 0 and 100
+        :returns: Approximation of the percentile in seconds, or None if empty
+        """
+        total = len(self)
+        if not total:
+            return None
+        rank = total * percent / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                break
+        if index == len(self.bounds):
+            return float("inf")
+        return self.bounds[index]
+
+
+class ModuleStats:
+    """
+    Counters of a single module.
+
+    :param name: Name of the module, usually its ``__name__``
+    :param instance: Instance identifier, the same as used in the i3bar protocol
+    """
+
+    def __init__(self, name, instance):
+        self.name = name
+        self.instance = instance
+        self.calls = 0
+        self.exceptions = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.serialization = 0.0
+        self.transferred = 0
+        # Consecutive failures and the resulting delay until the next run
+        self.failures = 0
+        self.backoff = None
+        self.histogram = Histogram()
+
+    def record(self, wall, cpu, failed=False):
+        self.calls += 1
+        self.wall += wall
+        self.cpu += cpu
+        self.histogram.add(wall)
+        if failed:
+            self.exceptions += 1
+
+    def record_transfer(self, seconds, size):
+        """Record the cost of shipping a result between processes."""
+        self.serialization += seconds
+        self.transferred += size
+
+    def snapshot(self):
+        """:returns: A dict containing all counters and the p50/p95/p99 latencies"""
+        return {
+            "name": self.name,
+            "instance": self.instance,
+            "calls": self.calls,
+            "exceptions": self.exceptions,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "serialization": self.serialization,
+            "transferred": self.transferred,
+            "failures": self.failures,
+            "backoff": self.backoff,
+            "p50": self.histogram.percentile(50),
+            "p95": self.histogram.percentile(95),
+            "p99": self.histogram.percentile(99),
+        }
+
+
+class Registry:
+    """
+    Process-wide collection of :py:class:`ModuleStats`, and of `counters`
+    and `histograms` not related to a single module, e.g. the number of
+    emitted frames.
+
+    Usually accessed through the module level :py:data:`registry`:
+
+    .. code:: python
+
+        from i3pystatus.core.stats import registry
+        for module in registry.snapshot():
+            print(module["name"], module["p95"])
+    """
+
+    def __init__(self):
+        self.modules = []
+        self.instances = {}
+        self.counters = collections.Counter()
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def register(self, module):
+        """:returns: A new :py:class:`ModuleStats` for `module`"""
+        stats = ModuleStats(getattr(module, "__name__", repr(module)), str(id(module)))
+        with self.lock:
+            self.modules.append(stats)
+            self.instances.setdefault(stats.instance, stats)
+        return stats
+
+    def histogram(self, name):
+        """:returns: The :py:class:`Histogram` called `name`, created on first use"""
+        with self.lock:
+            return self.histograms.setdefault(name, Histogram())
+
+    def get(self, module):
+        """:returns: The :py:class:`ModuleStats` of `module` or None"""
+        return self.instances.get(str(id(module)))
+
+    def snapshot(self):
+        """:returns: A list of snapshots of all modules, most expensive first"""
+        with self.lock:
+            modules = list(self.modules)
+        return sorted((stats.snapshot() for stats in modules), key=lambda s: s["cpu"], reverse=True)
+
+    def format(self):
+        """:returns: The snapshot as a human readable table"""
+        def ms(value):
+            return "-" if value is None else "{:.2f}".format(value * 1000)
+
+        def seconds(value):
+            return "-" if value is None else "{:.1f}".format(value)
+
+        lines = ["{:<45} {:>8} {:>6} {:>11} {:>10} {:>10} {:>10} {:>8} {:>8} {:>8}".format(
+            "module", "calls", "exc", "backoff [s]", "wall [s]", "cpu [s]", "ipc [s]",
+            "p50 [ms]", "p95 [ms]", "p99 [ms]")]
+        for s in self.snapshot():
+            lines.append("{:<45} {:>8} {:>6} {:>11} {:>10.3f} {:>10.3f} {:>10.3f} {:>8} {:>8} {:>8}".format(
+                s["name"][-45:], s["calls"], s["exceptions"], seconds(s["backoff"]), s["wall"], s["cpu"],
+                s["serialization"], ms(s["p50"]), ms(s["p95"]), ms(s["p99"])))
+        if self.counters:
+            lines.append("")
+            lines.extend("{:<45} {:>8}".format(name, count) for name, count in sorted(self.counters.items()))
+        if self.histograms:
+            lines.append("")
+            lines.append("{:<45} {:>8} {:>8} {:>8} {:>8}".format("", "count", "p50 [ms]", "p95 [ms]", "p99 [ms]"))
+            for name, histogram in sorted(self.histograms.items()):
+                lines.append("{:<45} {:>8} {:>8} {:>8} {:>8}".format(
+                    name, len(histogram), ms(histogram.percentile(50)), ms(histogram.percentile(95)),
+                    ms(histogram.percentile(99))))
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Write :py:meth:`format` to the file `path`, prefixed with a timestamp."""
+        text = "# {}\n{}\n".format(time.strftime("%c"), self.format())
+        with open(path, "w") as f:
+            f.write(text)
+
+
+registry = Registry()
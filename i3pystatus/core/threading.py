@@ -1,9 +1,18 @@
+import asyncio
+import collections
+import heapq
+import itertools
+import math
+import queue
+import random
 import threading
 import time
 import sys
-from i3pystatus.core.util import partition
+
+from i3pystatus.core.stats import registry
 
 timer = time.perf_counter if hasattr(time, "perf_counter") else time.clock
+cpu_timer = time.thread_time if hasattr(time, "thread_time") else time.process_time
 
 
 def unwrap_workload(workload):
@@ -19,7 +28,12 @@ class Thread(threading.Thread):
         self.workloads = workloads or []
         self.target_interval = target_interval
         self.start_barrier = start_barrier
+        self._populated = threading.Event()
+        if len(self) > start_barrier:
+            self._populated.set()
         self._suspended = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
         self.daemon = True
 
     def __iter__(self):
@@ -33,14 +47,20 @@ class Thread(threading.Thread):
 
     def append(self, workload):
         self.workloads.append(workload)
+        if len(self) > self.start_barrier:
+            self._populated.set()
 
     @property
     def time(self):
         return sum(map(lambda workload: workload.time, self))
 
-    def wait_for_start_barrier(self):
-        while len(self) <= self.start_barrier:
-            time.sleep(0.4)
+    def wait_for_start_barrier(self, timeout=None):
+        """
+        Block until more than `start_barrier` workloads were appended.
+
+        :returns: False if `timeout` seconds passed before that
+        """
+        return self._populated.wait(timeout)
 
     def execute_workloads(self):
         for workload in self:
@@ -60,6 +80,9 @@ class Thread(threading.Thread):
 
     def run(self):
         while self:
+            if self._suspended.is_set() and not any(map(self.should_execute, self)):
+                # Nothing to do until i3bar shows us again
+                self._resumed.wait()
             self.execute_workloads()
             filltime = self.target_interval - self.time
             if filltime > 0:
@@ -72,10 +95,12 @@ class Thread(threading.Thread):
         return []
 
     def suspend(self):
+        self._resumed.clear()
         self._suspended.set()
 
     def resume(self):
         self._suspended.clear()
+        self._resumed.set()
 
 
 class Wrapper:
@@ -88,20 +113,27 @@ class Wrapper:
 
 class ExceptionWrapper(Wrapper):
     def __call__(self):
+        """:returns: False if the workload raised an exception, True otherwise"""
         try:
             self.workload()
+            return True
         except:
-            message = "Exception in {thread} at {time}, module {name}".format(
-                thread=threading.current_thread().name,
-                time=time.strftime("%c"),
-                name=self.workload.__class__.__name__
-            )
-            if hasattr(self.workload, "logger"):
-                self.workload.logger.error(message, exc_info=True)
-            self.workload.output = {
-                "full_text": self.format_exception(),
-                "color": "#FF0000",
-            }
+            self.handle_exception()
+            return False
+
+    def handle_exception(self):
+        """Log the exception currently being handled and show it in the bar."""
+        message = "Exception in {thread} at {time}, module {name}".format(
+            thread=threading.current_thread().name,
+            time=time.strftime("%c"),
+            name=self.workload.__class__.__name__
+        )
+        if hasattr(self.workload, "logger"):
+            self.workload.logger.error(message, exc_info=True)
+        self.workload.output = {
+            "full_text": self.format_exception(),
+            "color": "#FF0000",
+        }
 
     def format_exception(self):
         type, value, _ = sys.exc_info()
@@ -120,58 +152,862 @@ class ExceptionWrapper(Wrapper):
 
 
 class WorkloadWrapper(Wrapper):
+    """
+    Measures the run time of the wrapped workload. Calling it returns False
+    if the workload failed.
+
+    `time` is the duration of the last call, `cost` and `variance` are
+    exponentially weighted moving estimates with smoothing factor `alpha`.
+    Every call is also recorded in the :py:class:`~i3pystatus.core.stats.ModuleStats`
+    of the module.
+    """
+
     time = 0.0
+    cost = 0.0
+    variance = 0.0
+    alpha = 0.25
+
+    def __init__(self, workload):
+        super().__init__(workload)
+        self.stats = registry.register(unwrap_workload(workload))
 
     def __call__(self):
+        cpu = cpu_timer()
         tp1 = timer()
-        self.workload()
+        failed = self.workload() is False
         self.time = timer() - tp1
+        self.stats.record(self.time, cpu_timer() - cpu, failed)
+        self.update_cost(self.time)
+        return not failed
+
+    def update_cost(self, sample):
+        if not self.cost:
+            self.cost = sample
+            return
+        diff = sample - self.cost
+        increment = self.alpha * diff
+        self.cost += increment
+        self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+
+
+def backoff_delay(interval, failures, max_backoff):
+    """
+    Delay until the next run of a module that failed `failures` times in a
+    row: `interval` doubled for every failure, capped at `max_backoff`
+    seconds, with random jitter so modules failing for the same reason (e.g.
+    the network being down) do not retry in lockstep.
+    Never less than `interval`. A falsy `max_backoff` disables backoff.
+    """
+    if not failures or not max_backoff:
+        return interval
+    delay = min(max(interval, max_backoff), interval * 2 ** min(failures, 32))
+    return max(interval, delay * random.uniform(0.5, 1.0))
+
+
+def align_deadline(deadline, interval):
+    """
+    Round `deadline` (a :py:func:`timer` value) up to the next multiple of
+    `interval` seconds of wall-clock time, e.g. the next full second or
+    minute.
+    """
+    offset = time.time() - timer()
+    # Tolerate rounding errors of deadlines that already are aligned
+    return math.ceil((deadline + offset) / interval - 1e-6) * interval - offset
+
+
+class StartupPlanner:
+    """
+    Decides when modules run for the first time, so they do not all do their
+    HTTP requests, subprocess spawns and sensor enumerations in the same
+    second after startup.
+
+    Modules with an interval below `threshold` seconds are considered cheap
+    and run right away. The first frame is emitted as soon as all of them ran
+    once, or after `budget` seconds at the latest (see :py:meth:`wait`).
+    Modules with longer intervals (typically network or package manager
+    modules) are staggered: their first run is delayed past the budget by a
+    random share of their interval, but no more than `spread` seconds.
+
+    Modules registered after the first frame run right away.
+
+    :param budget: Seconds until the first frame is emitted at the latest
+    :param threshold: Interval from which modules are considered expensive
+    :param spread: Upper bound for the random delay of expensive modules
+    """
+
+    instance = None
+
+    def __init__(self, budget=0.5, threshold=30, spread=10):
+        self.budget = budget
+        self.threshold = threshold
+        self.spread = spread
+        self.started = False
+        self.pending = set()
+        self.ready = threading.Event()
+        self.ready.set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls):
+        """Returns the process-wide planner."""
+        if cls.instance is None:
+            cls.instance = cls()
+        return cls.instance
+
+    def plan(self, workload, interval):
+        """:returns: Seconds to wait before the first run of `workload`"""
+        with self._lock:
+            if self.started:
+                return 0.0
+            if interval < self.threshold:
+                self.pending.add(id(workload))
+                self.ready.clear()
+                return 0.0
+        return self.budget + random.uniform(0, min(interval, self.spread))
+
+    def ran(self, workload):
+        """Called after every run of `workload`."""
+        with self._lock:
+            self.pending.discard(id(workload))
+            if not self.pending:
+                self.ready.set()
+
+    def wait(self):
+        """
+        Block until all cheap modules ran once, but no longer than `budget`
+        seconds. Ends the startup phase.
 
+        :returns: False if the budget was exceeded
+        """
+        ready = self.ready.wait(self.budget)
+        with self._lock:
+            self.started = True
+        return ready
 
-class Manager:
-    def __init__(self, target_interval):
-        self.target_interval = target_interval
-        self.upper_bound = target_interval * 1.1
-        self.lower_bound = target_interval * 0.7
 
-        initial_thread = Thread(target_interval, [self.wrap(self)])
-        self.threads = [initial_thread]
+class Job:
+    """
+    Bookkeeping for a single workload registered with a :py:class:`Scheduler`.
 
-    def __call__(self):
-        separate = []
-        for thread in self.threads:
-            separate.extend(thread.branch(thread.time, self.upper_bound))
-        self.create_threads(self.partition_workloads(separate))
+    :param workload: Wrapped workload (see :py:meth:`Scheduler.wrap`)
+    :param interval: Seconds between two consecutive runs
+    :param timeout: Seconds after which a run is considered hung, or None
+    :param max_backoff: Upper bound for the delay after repeated failures, see :py:func:`backoff_delay`
+    """
+
+    def __init__(self, workload, interval, timeout=None, max_backoff=None):
+        self.workload = workload
+        self.interval = interval
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.failures = 0
+        # Run again right after the current run, see Scheduler.retry
+        self.retry = False
+        # Called after the current run and after the run requested by retry
+        self.callbacks = []
+        self.retry_callbacks = []
+        self.deadline = 0.0
+        # Set while the job is handed to (or executed by) a worker. A job is
+        # never queued twice, which keeps runs of one module serialized.
+        self.active = False
+        # Start of the current run and the thread executing it
+        self.started = None
+        self.worker = None
+        # Number of unfinished jobs due together with this one, see Scheduler.on_tick
+        self.tick = None
+        self.quarantined = False
+        self.on_time = 0
 
     def __repr__(self):
-        return "Manager"
+        return "Job({!r}, interval={})".format(self.workload, self.interval)
+
+
+Decision = collections.namedtuple("Decision", ["time", "batches", "loads"])
+
+
+class Placement:
+    """
+    Cost model deciding which due jobs run together on one worker.
+
+    Every job is estimated at its EWMA run time plus `deviations` standard
+    deviations, so a single slow sample (a DNS hiccup, say) neither moves a
+    job away for good nor is ignored. Due jobs are spread over as few
+    workers as needed to keep each of them below `budget` seconds of work,
+    longest estimate first. Jobs that used to be split off are merged back as
+    soon as their estimates drop again. Jobs that have not run yet are
+    estimated at a whole `budget`, so they start out on workers of their own
+    instead of all piling up on one.
+
+    The last `history` decisions are kept in :py:attr:`decisions` for
+    inspection.
+
+    :param budget: Seconds of estimated work per worker
+    :param max_workers: Upper bound for the number of batches
+    :param deviations: Weight of the standard deviation in the estimate
+    :param history: Number of decisions to keep
+    """
+
+    def __init__(self, budget=0.1, max_workers=8, deviations=1.0, history=32):
+        self.budget = budget
+        self.max_workers = max_workers
+        self.deviations = deviations
+        self.decisions = collections.deque(maxlen=history)
+
+    def estimate(self, job):
+        workload = job.workload
+        if not workload.cost:
+            # Never ran, no sample yet
+            return self.budget
+        return workload.cost + self.deviations * math.sqrt(workload.variance)
+
+    def place(self, jobs):
+        """
+        Distribute `jobs` over batches.
+
+        :returns: list of batches, each a list of jobs ordered cheapest first
+        """
+        estimates = sorted(((self.estimate(job), i, job) for i, job in enumerate(jobs)), reverse=True)
+        total = sum(estimate for estimate, _, _ in estimates)
+        count = max(1, min(self.max_workers, len(jobs), math.ceil(total / self.budget)))
+        loads = [0.0] * count
+        batches = [[] for _ in range(count)]
+        for estimate, i, job in estimates:
+            target = loads.index(min(loads))
+            loads[target] += estimate
+            batches[target].append(job)
+        for batch in batches:
+            batch.reverse()
+        self.decisions.append(Decision(time.time(), batches, loads))
+        return batches
+
+
+class Worker(threading.Thread):
+    """
+    Worker thread of a :py:class:`Scheduler`.
+
+    `batch` holds the jobs the worker has yet to run, `job` the one it is
+    running. A worker whose job hung is `abandoned`: its remaining batch is
+    given to other workers and the thread exits once the hung run returns.
+    """
+
+    def __init__(self, scheduler, name):
+        super().__init__(name=name)
+        self.scheduler = scheduler
+        self.batch = collections.deque()
+        self.job = None
+        self.abandoned = False
+        self.daemon = True
+
+    def run(self):
+        self.scheduler._run_worker(self)
+
+
+class Quarantine:
+    """
+    Runs jobs that overran their timeout, each in a thread of its own, so a
+    module that hangs again can not block the shared worker pool.
+
+    A job is released back into the pool after it finished within its
+    timeout `release_after` times in a row.
+    """
+
+    release_after = 3
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.queues = {}
+
+    def submit(self, job):
+        """Run `job` in its quarantine thread, must be called with the scheduler lock held."""
+        if job not in self.queues:
+            self.queues[job] = queue.Queue()
+            thread = threading.Thread(target=self._run, args=(job, self.queues[job]),
+                                      name="Quarantine-{!r}".format(job.workload))
+            thread.daemon = True
+            thread.start()
+        self.queues[job].put(job)
+
+    def _run(self, job, jobs):
+        scheduler = self.scheduler
+        while True:
+            jobs.get()
+            with scheduler._lock:
+                scheduler._start(job, None)
+            ok = scheduler._execute(job)
+            with scheduler._lock:
+                scheduler._finish(job, ok)
+                released = not job.quarantined
+                if released:
+                    del self.queues[job]
+            scheduler._run_deferred()
+            if released:
+                return
+
+
+class Scheduler:
+    """
+    Runs interval workloads from a single priority queue of deadlines.
+
+    Workers share the queue in a leader/followers fashion: one worker (the
+    leader) sleeps until the earliest deadline, takes all due jobs, splits
+    them into batches using :py:class:`Placement` and runs the first batch
+    itself. Remaining batches are handed to idle followers, and so is the
+    lead, so the next deadline is watched while the batch runs. The
+    pool starts with a single worker and only grows (up to `max_workers`)
+    when there is more work than idle workers.
+
+    A finished job is rescheduled `interval` seconds after its previous
+    deadline, so slow modules do not make the others drift.
+
+    While suspended (see :py:meth:`suspend`) all jobs not setting the
+    keep_alive flag are parked outside the deadline queue, so they cause no
+    wakeups at all until :py:meth:`resume`.
+
+    Jobs failing repeatedly are retried with exponential backoff (see
+    :py:func:`backoff_delay`) until they succeed or :py:meth:`retry` is
+    called.
+
+    A run taking longer than `batch_time` does not hold up the jobs queued
+    behind it either: the leader hands the rest of its batch to other
+    workers.
+
+    The leader also watches jobs with a timeout. A run exceeding it gets the
+    job moved to the :py:class:`Quarantine`: the module keeps showing its
+    last output marked as stale, the rest of the stuck worker's batch is
+    handed to other workers and a replacement worker may be started.
+
+    The first run of every job is planned by `startup`, if given.
+
+    With `align` set, jobs are rescheduled to the next multiple of their
+    interval in wall-clock time instead, so jobs of different intervals (a
+    1s clock and a 5s network module, say) become due at the same moment
+    and are run after a single wakeup. `on_tick` is called (after the
+    scheduler lock was released) whenever all jobs that became due together
+    have finished, which lets the output loop emit one line per tick.
+
+    :param max_workers: Upper bound for the number of worker threads
+    :param batch_time: Seconds of estimated work handed to a worker at once
+    :param slack: Jobs due within this many seconds are run together
+    :param startup: A :py:class:`StartupPlanner`
+    :param align: Phase-lock deadlines to wall-clock boundaries
+    """
+
+    instance = None
+
+    def __init__(self, max_workers=8, batch_time=0.1, slack=0.01, startup=None, align=False):
+        self.max_workers = max_workers
+        self.slack = slack
+        self.startup = startup
+        self.align = align
+        self.on_tick = None
+        self.placement = Placement(batch_time, max_workers)
+        self.quarantine = Quarantine(self)
+        self.jobs = []
+        self.threads = []
+        self.wakeups = 0
+        self._heap = []
+        self._index = {}
+        # Expiry times of running jobs with a timeout
+        self._expiries = []
+        self._batches = collections.deque()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        # The leader waits on _deadline, followers on _work
+        self._deadline = threading.Condition(self._lock)
+        self._work = threading.Condition(self._lock)
+        self._leading = False
+        self._wake_at = None
+        self._idle = 0
+        self._started = False
+        # See hold
+        self._held = False
+        self._start_requested = False
+        self._suspended = False
+        self._parked = []
+        self._catching_up = set()
+        self._caught_up = None
+        # Callbacks collected while holding _lock, see _run_deferred
+        self._deferred = []
+
+    @classmethod
+    def default(cls):
+        """Returns the process-wide scheduler used by :py:class:`Manager`."""
+        if cls.instance is None:
+            cls.instance = cls(startup=StartupPlanner.default())
+        return cls.instance
 
     def wrap(self, workload):
         return WorkloadWrapper(ExceptionWrapper(workload))
 
-    def partition_workloads(self, workloads):
-        return partition(workloads, self.lower_bound, lambda workload: workload.time)
+    def add(self, workload, interval, timeout=None, max_backoff=None):
+        """
+        Register `workload` to be run every `interval` seconds, starting as
+        soon as possible or when planned by the :py:class:`StartupPlanner`.
+
+        :param timeout: Seconds after which a run is considered hung
+        :param max_backoff: Upper bound for the delay after repeated failures
+        :returns: the created :py:class:`Job`
+        """
+        job = Job(self.wrap(workload), interval, timeout, max_backoff)
+        delay = self.startup.plan(workload, interval) if self.startup else 0.0
+        with self._lock:
+            self.jobs.append(job)
+            self._index[id(workload)] = job
+            self._push(job, timer() + delay)
+            self._recruit()
+        return job
+
+    def retry(self, workload, callback=None):
+        """
+        Run `workload` as soon as possible, regardless of its backoff.
+
+        :param callback: Called without arguments after the next run that starts after this call
+        :returns: False if `workload` is not scheduled by this scheduler
+        """
+        with self._lock:
+            job = self._index.get(id(workload))
+            if job is None:
+                return False
+            job.failures = 0
+            if job.active:
+                # The current run may have started too early to see what
+                # made the caller retry, so the callback waits for the next.
+                job.retry = True
+                if callback:
+                    job.retry_callbacks.append(callback)
+                return True
+            if callback:
+                job.callbacks.append(callback)
+            if job not in self._parked:
+                self._push(job, timer())
+                self._recruit()
+            return True
 
-    def create_threads(self, threads):
-        for workloads in threads:
-            self.create_thread(workloads)
+    def start(self):
+        """
+        Start the worker pool. Calling this more than once is a no-op, while
+        held (see :py:meth:`hold`) the start is deferred.
+        """
+        with self._lock:
+            self._start_requested = True
+            if not self._started and not self._held:
+                self._started = True
+                self._recruit()
 
-    def create_thread(self, workloads):
-        thread = Thread(self.target_interval, workloads, start_barrier=0)
-        thread.start()
-        self.threads.append(thread)
+    def hold(self):
+        """
+        Defer :py:meth:`start` until :py:meth:`release` is called, so that
+        worker processes can be forked before any worker thread runs.
+        """
+        with self._lock:
+            self._held = True
+
+    def release(self):
+        """Start the worker pool if :py:meth:`start` was called while held."""
+        with self._lock:
+            self._held = False
+            requested = self._start_requested
+        if requested:
+            self.start()
+
+    def _push(self, job, deadline):
+        # Earlier heap entries of the job become stale and are skipped
+        job.deadline = deadline
+        heapq.heappush(self._heap, (deadline, next(self._sequence), job))
+        self._wake_leader(deadline)
+
+    def _wake_leader(self, at):
+        # Only wake the leader if it would otherwise oversleep
+        if self._leading and (self._wake_at is None or at < self._wake_at):
+            self._wake_at = at
+            self._deadline.notify()
+
+    def _recruit(self):
+        """Make sure some worker picks up queued batches and the deadline heap."""
+        if not self._started or self._leading and not self._batches:
+            return
+        if self._idle:
+            self._work.notify()
+        elif len(self.threads) < self.max_workers:
+            worker = Worker(self, "Worker-{}".format(next(self._sequence)))
+            self.threads.append(worker)
+            worker.start()
+
+    def _run_worker(self, worker):
+        while not worker.abandoned:
+            worker.batch.extend(self._next_batch())
+            self._run_deferred()
+            while True:
+                with self._lock:
+                    if worker.abandoned or not worker.batch:
+                        break
+                    job = worker.batch.popleft()
+                    self._start(job, worker)
+                ok = self._execute(job)
+                with self._lock:
+                    self._finish(job, ok)
+                self._run_deferred()
+
+    def _run_deferred(self):
+        """
+        Call the callbacks collected by :py:meth:`_finish` after releasing
+        the lock. They typically request a status line, which waits for the
+        output loop, and a signal handler of the output loop may be waiting
+        for the lock.
+        """
+        with self._lock:
+            calls, self._deferred = self._deferred, []
+        for call in calls:
+            call()
+
+    def _start(self, job, worker):
+        job.started = timer()
+        job.worker = worker
+        if worker is not None:
+            worker.job = job
+            if worker.batch and self.should_execute(job.workload):
+                # See _steal
+                self._wake_leader(job.started + self.placement.budget)
+        if job.timeout:
+            expiry = job.started + job.timeout
+            heapq.heappush(self._expiries, (expiry, next(self._sequence), job))
+            # Somebody has to watch the clock while we are busy
+            self._wake_leader(expiry)
+            self._recruit()
+
+    def _execute(self, job):
+        """:returns: False if the job failed"""
+        if self.should_execute(job.workload):
+            return job.workload()
+        return True
+
+    def _finish(self, job, ok=True):
+        if job in self._catching_up:
+            self._catching_up.discard(job)
+            if not self._catching_up and self._caught_up:
+                self._deferred.append(self._caught_up)
+        if job.quarantined and job.timeout and timer() - job.started < job.timeout:
+            job.on_time += 1
+            if job.on_time >= self.quarantine.release_after:
+                job.quarantined = False
+        if self.startup and not self.startup.ready.is_set():
+            self.startup.ran(unwrap_workload(job.workload))
+        job.failures = 0 if ok else job.failures + 1
+        delay = backoff_delay(job.interval, job.failures, job.max_backoff)
+        job.workload.stats.failures = job.failures
+        job.workload.stats.backoff = delay if job.failures else None
+        if job.worker is not None:
+            job.worker.job = None
+        job.started = None
+        job.worker = None
+        job.active = False
+        self._tick_done(job)
+        self._deferred.extend(job.callbacks)
+        job.callbacks.clear()
+        if self._suspended and not self.keep_alive(job):
+            self._parked.append(job)
+        elif job.retry:
+            job.retry = False
+            job.callbacks, job.retry_callbacks = job.retry_callbacks, job.callbacks
+            self._push(job, timer())
+        else:
+            deadline = max(job.deadline + delay, timer())
+            self._push(job, align_deadline(deadline, job.interval) if self.align else deadline)
+
+    def _tick_done(self, job):
+        tick, job.tick = job.tick, None
+        if tick is not None:
+            tick[0] -= 1
+            if not tick[0] and self.on_tick:
+                self._deferred.append(self.on_tick)
+
+    def _expire(self, now):
+        while self._expiries and self._expiries[0][0] <= now:
+            expiry, _, job = heapq.heappop(self._expiries)
+            # Skip entries of runs that already finished
+            if job.started is not None and job.started + job.timeout == expiry:
+                self._quarantine(job)
+
+    def _steal(self, now):
+        """Hand the rest of the batches of workers stuck in a run longer than `batch_time` to other workers."""
+        for worker in self.threads:
+            job = worker.job
+            if worker.batch and job is not None and now - job.started >= self.placement.budget:
+                self._batches.append(list(worker.batch))
+                worker.batch.clear()
+                self._recruit()
+
+    def _quarantine(self, job):
+        job.quarantined = True
+        job.on_time = 0
+        worker = job.worker
+        if worker in self.threads:
+            worker.abandoned = True
+            self.threads.remove(worker)
+            if worker.batch:
+                self._batches.append(list(worker.batch))
+                worker.batch.clear()
+            self._recruit()
+        # Do not hold back the output of the jobs due together with it
+        self._tick_done(job)
+        module = unwrap_workload(job.workload)
+        if hasattr(module, "mark_stale"):
+            started = job.started
+
+            def mark_stale():
+                # Not if the run returned and set new output meanwhile
+                if job.started == started:
+                    module.mark_stale()
+
+            # Assigns output, whose on_change may call back into the scheduler
+            self._deferred.append(mark_stale)
+        if hasattr(module, "logger"):
+            module.logger.warning("run() exceeded %s seconds, moved to quarantine", job.timeout)
+
+    def _next_batch(self):
+        with self._lock:
+            while True:
+                if self._batches:
+                    return self._batches.popleft()
+                if self._leading:
+                    self._idle += 1
+                    self._work.wait()
+                    self._idle -= 1
+                    continue
+                self._leading = True
+                self.wakeups += 1
+                now = timer()
+                self._expire(now)
+                self._steal(now)
+                due = []
+                while self._heap and self._heap[0][0] <= now + self.slack:
+                    deadline, _, job = heapq.heappop(self._heap)
+                    if job.active or deadline != job.deadline:
+                        continue
+                    job.active = True
+                    if job.quarantined:
+                        self.quarantine.submit(job)
+                    else:
+                        due.append(job)
+                if not due and self._deferred:
+                    # Hung jobs were quarantined, call their callbacks first
+                    self._leading = False
+                    return []
+                if not due:
+                    wake = [entries[0][0] for entries in (self._heap, self._expiries) if entries]
+                    wake.extend(worker.job.started + self.placement.budget for worker in self.threads
+                                if worker.batch and worker.job and self.should_execute(worker.job.workload))
+                    self._wake_at = min(wake) if wake else None
+                    self._deadline.wait(None if self._wake_at is None else self._wake_at - now)
+                    self._leading = False
+                    continue
+                self._leading = False
+                tick = [len(due)]
+                for job in due:
+                    job.tick = tick
+                batches = self.placement.place(due)
+                self._batches.extend(batches[1:])
+                for _ in batches[1:]:
+                    self._recruit()
+                # Hand over the lead before running our batch, estimates say
+                # nothing about a run that hangs without a timeout
+                self._recruit()
+                return batches[0]
+
+    def should_execute(self, workload):
+        """
+        While suspended by i3bar only workloads that set the keep_alive flag
+        are executed, see :py:meth:`Thread.should_execute`.
+        """
+        if not self._suspended:
+            return True
+        return getattr(unwrap_workload(workload), 'keep_alive', False)
+
+    @staticmethod
+    def keep_alive(job):
+        return getattr(unwrap_workload(job.workload), 'keep_alive', False)
+
+    def suspend(self):
+        """Park all jobs that do not set the keep_alive flag."""
+        with self._lock:
+            if self._suspended:
+                return
+            self._suspended = True
+            heap = []
+            for entry in self._heap:
+                if entry[0] != entry[2].deadline:
+                    continue
+                if self.keep_alive(entry[2]):
+                    heap.append(entry)
+                else:
+                    self._parked.append(entry[2])
+            heapq.heapify(heap)
+            self._heap = heap
+            if self._leading:
+                # The leader may be waiting for parked jobs
+                self._wake_at = None
+                self._deadline.notify()
+
+    def resume(self, caught_up=None):
+        """
+        Run all parked jobs right away.
+
+        :param caught_up: Called once all parked jobs have run
+        """
+        with self._lock:
+            if not self._suspended:
+                return
+            self._suspended = False
+            parked, self._parked = self._parked, []
+            self._catching_up = set(parked)
+            self._caught_up = caught_up
+            now = timer()
+            for job in parked:
+                self._push(job, now)
+            self._recruit()
+        if not parked and caught_up:
+            caught_up()
+
+
+class Manager:
+    """
+    Compatibility shim grouping workloads by interval.
+
+    Historically every Manager owned a set of :py:class:`Thread` objects. All
+    workloads are now handed to the shared :py:class:`Scheduler`, the methods
+    below only forward to it.
+    """
+
+    def __init__(self, target_interval, scheduler=None):
+        self.target_interval = target_interval
+        self.scheduler = scheduler or Scheduler.default()
+        self.jobs = []
+
+    def __repr__(self):
+        return "Manager"
+
+    @property
+    def threads(self):
+        return self.scheduler.threads
+
+    def wrap(self, workload):
+        return self.scheduler.wrap(workload)
 
     def append(self, workload):
-        self.threads[0].append(self.wrap(workload))
+        timeout = getattr(workload, "run_timeout", None)
+        max_backoff = getattr(workload, "max_backoff", None)
+        self.jobs.append(self.scheduler.add(workload, self.target_interval, timeout, max_backoff))
 
     def start(self):
-        for thread in self.threads:
-            thread.start()
+        self.scheduler.start()
+
+    def suspend(self):
+        self.scheduler.suspend()
+
+    def resume(self):
+        self.scheduler.resume()
+
+
+class StepTimer:
+    """
+    Awaitable running `coroutine` and adding up the CPU time of the thread
+    spent in its steps in `cpu`. Other coroutines running on the same event
+    loop while it waits are not counted.
+    """
+
+    def __init__(self, coroutine):
+        self.coroutine = coroutine
+        self.cpu = 0.0
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            cpu = cpu_timer()
+            try:
+                if error is None:
+                    future = self.coroutine.send(value)
+                else:
+                    future = self.coroutine.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.cpu += cpu_timer() - cpu
+            try:
+                value, error = (yield future), None
+            except BaseException as e:
+                # E.g. CancelledError, passed on to the coroutine
+                value, error = None, e
+
+
+class EventLoop:
+    """
+    A single asyncio event loop running in a daemon thread, shared by all
+    :py:class:`~i3pystatus.core.modules.AsyncIntervalModule` instances.
+
+    While suspended (see :py:meth:`suspend`) the runs of all coroutine
+    modules that do not set the keep_alive flag are cancelled, and their
+    scheduling loops wait for :py:meth:`resume`.
+    """
+
+    instance = None
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.modules = []
+        self.suspended = False
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="EventLoop")
+        self.thread.daemon = True
+        self.thread.start()
+        ready.wait()
+
+    @classmethod
+    def default(cls):
+        """Returns the process-wide event loop, starting it if necessary."""
+        if cls.instance is None:
+            cls.instance = cls()
+        return cls.instance
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        ready.set()
+        self.loop.run_forever()
+
+    def submit(self, coroutine):
+        """
+        Schedule `coroutine` on the loop from any thread.
+
+        :returns: a :py:class:`concurrent.futures.Future`
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Call `callback` in the loop thread, may be called from any thread."""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def add(self, module):
+        """Start the scheduling loop of `module`."""
+        self.modules.append(module)
+        return self.submit(module.schedule())
+
+    async def wait_resumed(self):
+        await self._resumed.wait()
 
     def suspend(self):
-        for thread in self.threads:
-            thread.suspend()
+        self.call_soon(self._suspend)
 
     def resume(self):
-        for thread in self.threads:
-            thread.resume()
+        self.call_soon(self._resume)
+
+    def _suspend(self):
+        self.suspended = True
+        self._resumed.clear()
+        for module in self.modules:
+            if not getattr(module, "keep_alive", False):
+                module.cancel()
+
+    def _resume(self):
+        self.suspended = False
+        self._resumed.set()
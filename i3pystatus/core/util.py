@@ -1,4 +1,5 @@
 import collections
+import collections.abc
 import functools
 import re
 import socket
@@ -6,6 +7,8 @@ import string
 import inspect
 from threading import Timer, RLock
 
+from i3pystatus.core.codec import Codec
+
 import time
 
 
@@ -65,9 +68,21 @@ def round_dict(dic, places):
 
 
 class ModuleList(collections.UserList):
+    """
+    List of the modules registered with a status handler.
+
+    `index` maps the ids of all modules, including those nested in modules
+    that have a ModuleList of their own (like :py:class:`~i3pystatus.group.Group`),
+    to the modules. It is kept up to date when modules are appended to or
+    removed from this list or any nested list.
+    """
+
     def __init__(self, status_handler, class_finder):
         self.status_handler = status_handler
         self.finder = class_finder
+        self.index = {}
+        # Lists containing a module that owns this list
+        self.parents = []
         super().__init__()
 
     def append(self, module, *args, **kwargs):
@@ -75,13 +90,77 @@ class ModuleList(collections.UserList):
             module, *args, **kwargs)
         module.registered(self.status_handler)
         super().append(module)
+        children = self.children(module)
+        if children is not None:
+            children.parents.append(self)
+        self.add_to_index(module)
         return module
 
     def get(self, find_id):
-        find_id = int(find_id)
+        """:returns: The module with the instance `find_id`, possibly nested, or None"""
+        return self.index.get(int(find_id))
+
+    def remove(self, module):
+        super().remove(module)
+        self.unlink([module])
+
+    def pop(self, i=-1):
+        module = super().pop(i)
+        self.unlink([module])
+        return module
+
+    def __delitem__(self, i):
+        modules = self.data[i] if isinstance(i, slice) else [self.data[i]]
+        super().__delitem__(i)
+        self.unlink(modules)
+
+    @staticmethod
+    def children(module):
+        children = getattr(module, "modules", None)
+        return children if isinstance(children, ModuleList) else None
+
+    def add_to_index(self, module):
+        self.index[id(module)] = module
+        children = self.children(module)
+        if children is not None:
+            self.index.update(children.index)
+        for parent in self.parents:
+            parent.add_to_index(module)
+
+    def unlink(self, modules):
+        for module in modules:
+            children = self.children(module)
+            if children is not None and self in children.parents:
+                children.parents.remove(self)
+        self.rebuild_index()
+
+    def rebuild_index(self):
+        self.index = {}
         for module in self:
-            if id(module) == find_id:
-                return module
+            self.index[id(module)] = module
+            children = self.children(module)
+            if children is not None:
+                self.index.update(children.index)
+        for parent in self.parents:
+            parent.rebuild_index()
+
+    def output_version(self):
+        """:returns: A number that changes whenever any module sets new output"""
+        return max((module.output_version for module in self), default=0)
+
+    def serialize(self, items, modules=None):
+        """
+        Build a status line from the cached fragments of all modules (see
+        :py:meth:`~i3pystatus.core.modules.Module.fragment`), the same as
+        :py:meth:`~i3pystatus.core.modules.Module.inject` into `items` and
+        serializing the result would.
+
+        :param items: Blocks read from i3status, empty in standalone mode
+        :param modules: Subset of the modules to include, defaults to all
+        :returns: The status line as JSON (bytes)
+        """
+        return assemble(map(Codec.default().dumps, items),
+                        ((module, module.fragment()) for module in (self if modules is None else modules)))
 
 
 class KeyConstraintDict(collections.UserDict):
@@ -136,6 +215,22 @@ def convert_position(pos, json):
     return pos
 
 
+def assemble(fragments, blocks):
+    """
+    Build a status line from serialized blocks.
+
+    :param fragments: Blocks read from i3status, serialized as JSON (bytes)
+    :param blocks: Pairs of a module and its fragment (see
+        :py:meth:`~i3pystatus.core.modules.Module.fragment`)
+    :returns: The status line as JSON (bytes)
+    """
+    fragments = list(fragments)
+    for module, fragment in blocks:
+        if fragment is not None:
+            fragments.insert(convert_position(module.position, fragments), fragment)
+    return b"[" + b",".join(fragments) + b"]"
+
+
 def bytes_info_dict(in_bytes):
     power = 2**10  # 2 ** 10 == 1024
     n = 0
@@ -187,109 +282,251 @@ def formatp(string, **kwargs):
 
     Escaped brackets, i.e. \\\\[ and \\\\] are copied verbatim to output.
 
+    Format strings are compiled once, see :py:func:`compile_formatp`.
+
     :param string: Format string
     :param kwargs: keyword arguments providing data for the format string
     :returns: Formatted string
     """
+    return compile_formatp(string).render(kwargs)
 
-    def build_stack(string):
-        """
-        Builds a stack with OpeningBracket, ClosingBracket and String tokens.
-        Tokens have a level property denoting their nesting level.
-        They also have a string property containing associated text (empty for
-        all tokens but String tokens).
-        """
 
-        class Token:
-            string = ""
+@functools.lru_cache(maxsize=512)
+def compile_formatp(string):
+    """
+    :returns: The :py:class:`FormatpTemplate` for the format string `string`,
+        compiled templates are cached
+    """
+    return FormatpTemplate(string)
 
-        class OpeningBracket(Token):
-            pass
 
-        class ClosingBracket(Token):
-            pass
+class FormatpTemplate:
+    """
+    A format string for :py:func:`formatp` split into its groups, ready to
+    be rendered any number of times.
 
-        class String(Token):
-            def __init__(self, str):
-                self.string = str
+    Text is split at unescaped brackets, every piece of text belongs to the
+    group given by the number of brackets opened before it. The fields
+    checked by a group and whether a piece of text needs formatting at all
+    are determined once, when compiling.
 
-        TOKENS = {
-            "[": OpeningBracket,
-            "]": ClosingBracket,
-        }
+    :param string: Format string
+    """
 
-        stack = []
+    # Field names checked by groups, the first word in every pair of braces
+    GROUP_FIELDS = re.compile(r"{(\w+)[^}]*}")
 
-        # Index of next unconsumed char
-        next = 0
-        # Last consumed char
-        prev = ""
-        # Current char
-        char = ""
-        # Current level
-        level = 0
-
-        while next < len(string):
-            prev = char
-            char = string[next]
-            next += 1
+    def __init__(self, string):
+        self.string = string
+        self.tree = self.build(self.tokenize(string), 0)
+        fields = set()
+        for text in self.texts(self.tree):
+            if text.fields is None:
+                fields = None
+                break
+            fields.update(text.fields)
+        #: Names of all fields used by the format string, None if unknown
+        #: because some text is not a valid format string.
+        self.fields = None if fields is None else frozenset(fields)
 
-            if prev != "\\" and char in TOKENS:
-                token = TOKENS[char]()
-                token.index = next
+    @staticmethod
+    def tokenize(string):
+        """
+        :returns: A list of (level, text) tuples, text is empty for brackets.
+            Levels are those of the brackets, negative for unbalanced
+            closing brackets.
+        """
+        tokens = []
+        level = 0
+        prev = ""
+        for char in string:
+            if prev != "\\" and char in "[]":
                 if char == "]":
                     level -= 1
-                token.level = level
+                tokens.append((level, ""))
                 if char == "[":
                     level += 1
-                stack.append(token)
+            elif tokens and tokens[-1][1]:
+                tokens[-1] = (tokens[-1][0], tokens[-1][1] + char)
             else:
-                if stack and isinstance(stack[-1], String):
-                    stack[-1].string += char
-                else:
-                    token = String(char)
-                    token.level = level
-                    stack.append(token)
-        return stack
-
-    def build_tree(items, level=0):
+                tokens.append((level, char))
+            prev = char
+        return tokens
+
+    def build(self, tokens, level):
+        """
+        Build the group of `level` from `tokens`, which contains it and all of
+        its nested groups. Everything at `level` or below it belongs to the
+        group itself.
+
+        :returns: A list of :py:class:`FormatpText` and nested lists of groups
+        """
+        children = []
+        i = 0
+        while i < len(tokens):
+            end = i
+            while end < len(tokens) and tokens[end][0] > level:
+                end += 1
+            if end == len(tokens):
+                # A group that is never closed is an error, raised when
+                # rendering gets here.
+                children.append(None)
+                break
+            if end > i:
+                children.append(self.build(tokens[i:end], level + 1))
+            text = tokens[end][1]
+            if text:
+                children.append(FormatpText(text, level > 0, self.GROUP_FIELDS))
+            i = end + 1
+        return children
+
+    def texts(self, group):
+        for child in group:
+            if isinstance(child, list):
+                yield from self.texts(child)
+            elif child is not None:
+                yield child
+
+    def render(self, kwargs):
         """
-        Builds a list-of-lists tree (in forward order) from a stack (reversed order),
-        and formats the elements on the fly, discarding everything not eligible for
-        inclusion.
+        :param kwargs: dict providing data for the format string
+        :returns: Formatted string
         """
-        subtree = []
-
-        while items:
-            nested = []
-            while items[0].level > level:
-                nested.append(items.pop(0))
-            if nested:
-                subtree.append(build_tree(nested, level + 1))
-
-            item = items.pop(0)
-            if item.string:
-                string = item.string
-                if level == 0:
-                    subtree.append(string.format(**kwargs))
-                else:
-                    fields = re.findall(r"({(\w+)[^}]*})", string)
-                    successful_fields = 0
-                    for fieldspec, fieldname in fields:
-                        if kwargs.get(fieldname, False):
-                            successful_fields += 1
-                    if successful_fields == len(fields):
-                        subtree.append(string.format(**kwargs))
-                    else:
-                        return []
-        return subtree
-
-    def merge_tree(items):
-        return "".join(flatten(items)).replace(r"\]", "]").replace(r"\[", "[")
-
-    stack = build_stack(string)
-    tree = build_tree(stack, 0)
-    return merge_tree(tree)
+        return "".join(self.render_group(self.tree, kwargs)).replace(r"\]", "]").replace(r"\[", "[")
+
+    def render_group(self, group, kwargs):
+        parts = []
+        for child in group:
+            if isinstance(child, list):
+                parts.extend(self.render_group(child, kwargs))
+            elif child is None:
+                raise IndexError("list index out of range")
+            elif child.checks(kwargs):
+                parts.append(child.format(kwargs))
+            else:
+                return []
+        return parts
+
+    def __repr__(self):
+        return "FormatpTemplate({!r})".format(self.string)
+
+
+class FormatpText:
+    """
+    A piece of text of a :py:class:`FormatpTemplate` without brackets.
+
+    :param text: The text, a format string for :py:meth:`str.format`
+    :param grouped: Whether the text is inside a group, which is left out
+        if any of the fields it checks is false
+    :param group_fields: Regular expression finding the checked fields
+    """
+
+    def __init__(self, text, grouped, group_fields):
+        self.text = text
+        self.checked = tuple(group_fields.findall(text)) if grouped else ()
+        self.fields = self.field_names(text)
+        # Text without fields formats to itself
+        self.literal = "{" not in text and "}" not in text
+        # format_map() differs from format(**kwargs) for positional fields
+        # and invalid format strings only.
+        self.mapped = self.fields is not None and not any(name.isdigit() or not name for name in self.fields)
+
+    @staticmethod
+    def field_names(text):
+        """:returns: The set of field names used by `text`, or None if it is not a valid format string"""
+        names = set()
+        try:
+            for literal, field, spec, conversion in string.Formatter().parse(text):
+                if field is None:
+                    continue
+                names.add(re.match(r"[^.[]*", field).group())
+                if spec and "{" in spec:
+                    nested = FormatpText.field_names(spec)
+                    if nested is None:
+                        return None
+                    names.update(nested)
+        except ValueError:
+            return None
+        return names
+
+    def checks(self, kwargs):
+        """Tell whether all checked fields in `kwargs` are true."""
+        successful = True
+        # Every field is evaluated, like the formatp engine always did
+        for name in self.checked:
+            if not kwargs.get(name, False):
+                successful = False
+        return successful
+
+    def format(self, kwargs):
+        if self.literal:
+            return self.text
+        if self.mapped:
+            return self.text.format_map(kwargs)
+        return self.text.format(**kwargs)
+
+
+class LazyData(collections.abc.MutableMapping):
+    """
+    Values for format strings, some of which are only computed when used.
+
+    Values registered with :py:meth:`lazy` are produced by calling a function
+    the first time they are looked up. Rendering a compiled format string
+    (see :py:func:`compile_formatp`) only looks up the fields it uses, so
+    expensive values (graphs, colors, unit conversions) are not computed
+    unless the format string of the user shows them:
+
+    .. code:: python
+
+        data = LazyData(interface=self.interface)
+        data.lazy("graph", lambda: make_graph(self.history, 0, 100))
+        self.data = data
+        self.output = {"full_text": compile_formatp(self.format).render(data)}
+
+    Everything else sees a regular mapping, e.g. callbacks using `data`
+    compute all values on first access.
+
+    :param values: Initial values, as for :py:class:`dict`
+    """
+
+    def __init__(self, values=(), **kwargs):
+        self.values = dict(values, **kwargs)
+        self.producers = {}
+
+    def lazy(self, key, producer):
+        """Produce the value for `key` by calling `producer` without arguments once it is needed."""
+        self.values.pop(key, None)
+        self.producers[key] = producer
+
+    def __getitem__(self, key):
+        try:
+            return self.values[key]
+        except KeyError:
+            pass
+        value = self.values[key] = self.producers[key]()
+        self.producers.pop(key, None)
+        return value
+
+    def __setitem__(self, key, value):
+        self.producers.pop(key, None)
+        self.values[key] = value
+
+    def __delitem__(self, key):
+        if self.producers.pop(key, None) is None:
+            del self.values[key]
+
+    def __contains__(self, key):
+        return key in self.values or key in self.producers
+
+    def __iter__(self):
+        # A copy, looking values up while iterating moves them around
+        return iter(list(self.values) + list(self.producers))
+
+    def __len__(self):
+        return len(self.values) + len(self.producers)
+
+    def __repr__(self):
+        return "LazyData({!r}, lazy={!r})".format(self.values, sorted(self.producers))
 
 
 class TimeWrapper:
@@ -437,6 +674,26 @@ class internet:
             return []
 
 
+# Characters of make_graph, by level
+GRAPH_BLOCKS = '_▁▂▃▄▅▆▇█'
+# Dots of a braille column (bits of the left one) by level (0-4)
+BRAILLE_LEVELS = {
+    'braille-fill': (0, 0x40, 0x44, 0x46, 0x47),
+    'braille-peak': (0, 0x40, 0x04, 0x02, 0x01),
+}
+# Dots of a 'braille-snake' column by the lowest level of the value and its
+# neighbours and the level of the value
+BRAILLE_SNAKE = tuple(tuple(functools.reduce(lambda c, bits: c | bits, BRAILLE_LEVELS['braille-peak'][low:level + 1], 0)
+                            for level in range(5)) for low in range(5))
+# Bits of a left column moved to the right one
+BRAILLE_RIGHT = tuple((bits - 0x30 if bits & 0x40 else bits) << 3 for bits in range(0x48))
+BRAILLE = ''.join(chr(0x2800 + bits) for bits in range(0x100))
+# Characters by the levels of the left and right column
+BRAILLE_PAIRS = {style: tuple(tuple(BRAILLE[left + BRAILLE_RIGHT[right]] for right in levels) for left in levels)
+                 for style, levels in BRAILLE_LEVELS.items()}
+GRAPH_STYLES = ('blocks', 'braille-fill', 'braille-peak', 'braille-snake')
+
+
 def make_graph(values, lower_limit=0.0, upper_limit=100.0, style="blocks"):
     """
     Draws a graph made of unicode characters.
@@ -455,7 +712,7 @@ def make_graph(values, lower_limit=0.0, upper_limit=100.0, style="blocks"):
     extent = mx - mn
 
     if style == 'blocks':
-        bar = '_▁▂▃▄▅▆▇█'
+        bar = GRAPH_BLOCKS
         bar_count = len(bar) - 1
         if extent == 0:
             graph = '_' * len(values)
@@ -469,37 +726,284 @@ def make_graph(values, lower_limit=0.0, upper_limit=100.0, style="blocks"):
         vscale = [round(4 * (vp - mn) / extent) for vp in vpad]
         l = len(vscale) // 2
 
-        # do the 2-character collapse separately for clarity
-        if 'fill' in style:
-            vbits = [[0, 0x40, 0x44, 0x46, 0x47][vs] for vs in vscale]
-        elif 'peak' in style:
-            vbits = [[0, 0x40, 0x04, 0x02, 0x01][vs] for vs in vscale]
-        else:
-            assert('snake' in style)
+        if style == 'braille-snake':
             # there are a few choices for what to put last in vb2.
             # arguable vscale[-1] from the _previous_ call is best.
             vb2 = [vscale[0]] + vscale + [0]
-            vbits = []
-            for i in range(1, l + 1):
-                c = 0
-                for j in range(min(vb2[i - 1], vb2[i], vb2[i + 1]), vb2[i] + 1):
-                    c |= [0, 0x40, 0x04, 0x02, 0x01][j]
-                vbits.append(c)
-
-        # 2-character collapse
-        graph = ''
-        for i in range(0, l, 2):
-            b1 = vbits[i]
-            b2 = vbits[i + 1]
-            if b2 & 0x40:
-                b2 = b2 - 0x30
-            b2 = b2 << 3
-            graph += chr(0x2800 + b1 + b2)
+            vbits = [BRAILLE_SNAKE[min(vb2[i - 1], vb2[i], vb2[i + 1])][vb2[i]] for i in range(1, l + 1)]
+            # 2-character collapse
+            graph = ''.join(BRAILLE[vbits[i] + BRAILLE_RIGHT[vbits[i + 1]]] for i in range(0, l, 2))
+        else:
+            pairs = BRAILLE_PAIRS[style]
+            graph = ''.join(pairs[vscale[i]][vscale[i + 1]] for i in range(0, l, 2))
     else:
         raise NotImplementedError("Graph drawing style '%s' unimplemented." % style)
     return graph
 
 
+def make_graphs(series, lower_limit=0.0, upper_limit=100.0, style="blocks"):
+    """
+    Draws several graphs at once, e.g. one per CPU core, exactly like
+    :py:func:`make_graph` draws each of them.
+
+    Uses NumPy if it is installed and there are enough values to make it
+    worthwhile; values that are not finite numbers are left to
+    :py:func:`make_graph`.
+
+    :param series: An iterable of arrays of values to graph.
+    :param lower_limit: Minimum value for the y axis (or None for dynamic).
+    :param upper_limit: Maximum value for the y axis (or None for dynamic).
+    :param style: Drawing style ('blocks', 'braille-fill', 'braille-peak', or 'braille-snake').
+    :returns: List of graphs as strings
+    """
+    series = [values if isinstance(values, list) else list(values) for values in series]
+    if style not in GRAPH_STYLES:
+        raise NotImplementedError("Graph drawing style '%s' unimplemented." % style)
+    numpy = numpy_module()
+    if (numpy is not None and len(series) > 1 and sum(map(len, series)) >= NUMPY_GRAPH_VALUES and
+            series[0] and all(len(values) == len(series[0]) for values in series)):
+        graphs = make_graphs_numpy(numpy, series, lower_limit, upper_limit, style)
+        if graphs is not None:
+            return graphs
+    return [make_graph(values, lower_limit, upper_limit, style) for values in series]
+
+
+# Fewer values are drawn faster without NumPy (see benchmarks/graph.py)
+NUMPY_GRAPH_VALUES = 256
+
+
+@functools.lru_cache(maxsize=None)
+def numpy_module():
+    """:returns: The numpy module if it is installed, else None. Only imported when needed, it takes a while."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@functools.lru_cache(maxsize=None)
+def numpy_graph_tables(numpy):
+    """The tables of :py:func:`make_graph` as NumPy arrays"""
+    return {
+        'blocks': numpy.array([ord(c) for c in GRAPH_BLOCKS], dtype=numpy.uint32),
+        'braille-snake': numpy.array(BRAILLE_SNAKE, dtype=numpy.uint32),
+        'right': numpy.array(BRAILLE_RIGHT, dtype=numpy.uint32),
+        'braille-fill': numpy.array(BRAILLE_LEVELS['braille-fill'], dtype=numpy.uint32),
+        'braille-peak': numpy.array(BRAILLE_LEVELS['braille-peak'], dtype=numpy.uint32),
+    }
+
+
+def make_graphs_numpy(numpy, series, lower_limit, upper_limit, style):
+    """
+    :py:func:`make_graphs` for graphs of the same width with NumPy.
+
+    :returns: List of graphs, or None if :py:func:`make_graph` has to draw them
+        (values that are no finite numbers, errors)
+    """
+    try:
+        values = numpy.array(series, dtype=float)
+    except (TypeError, ValueError):
+        return None
+    if not numpy.isfinite(values).all():
+        return None
+    tables = numpy_graph_tables(numpy)
+    mn, mx = values.min(axis=1), values.max(axis=1)
+    mn = mn if lower_limit is None else numpy.minimum(mn, float(lower_limit))
+    mx = mx if upper_limit is None else numpy.maximum(mx, float(upper_limit))
+    extent = (mx - mn)[:, None]
+    mn = mn[:, None]
+
+    if style == 'blocks':
+        flat = extent == 0
+        # Levels of graphs without extent are replaced by the lowest one
+        scaled = (values - mn) / numpy.where(flat, 1.0, extent) * (len(GRAPH_BLOCKS) - 1)
+        codepoints = tables['blocks'][numpy.where(flat, 0, scaled.astype(int))]
+    else:
+        if (extent == 0).any():
+            return None
+        if values.shape[1] % 2:
+            values = numpy.hstack([values, mn])
+        levels = numpy.rint(4 * (values - mn) / extent).astype(int)
+        l = levels.shape[1] // 2
+        if style == 'braille-snake':
+            if l % 2:
+                return None
+            current = levels[:, :l]
+            newer = numpy.hstack([levels[:, :1], levels[:, :l - 1]])
+            low = numpy.minimum(numpy.minimum(newer, current), levels[:, 1:l + 1])
+            vbits = tables['braille-snake'][low, current]
+            left, right = vbits[:, 0::2], vbits[:, 1::2]
+        else:
+            left = tables[style][levels[:, 0:l:2]]
+            right = tables[style][levels[:, 1:l + 1:2]]
+        codepoints = 0x2800 + left + tables['right'][right]
+    codepoints = codepoints.astype('<u4')
+    return [row.tobytes().decode('utf-32-le') for row in codepoints]
+
+
+class GraphSeries:
+    """
+    History of the last `capacity` values shown by a graph, newest first.
+
+    A ring buffer replacing lists that get a value inserted at the front and
+    the last one chopped off. Minimum and maximum are kept up to date with
+    monotonic queues, so appending and looking them up costs O(1) amortized
+    regardless of the capacity. Draw it with :py:class:`GraphRenderer`.
+
+    :param capacity: Number of values kept
+    :param fill: Initial value of the whole history
+    """
+
+    def __init__(self, capacity, fill=0.0):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.buffer = [float(fill)] * capacity
+        # Sequence number of the next value, the value with sequence number
+        # n is kept in buffer[n % capacity]
+        self.count = capacity
+        # (sequence number, value) of the candidates for minimum and maximum,
+        # the current one is the first
+        self.minima = collections.deque([(capacity - 1, float(fill))])
+        self.maxima = collections.deque([(capacity - 1, float(fill))])
+
+    def append(self, value):
+        """Add `value` as the newest value, dropping the oldest."""
+        value = float(value)
+        sequence = self.count
+        self.buffer[sequence % self.capacity] = value
+        self.count += 1
+        expired = sequence - self.capacity
+        while self.minima and self.minima[-1][1] >= value:
+            self.minima.pop()
+        self.minima.append((sequence, value))
+        if self.minima[0][0] <= expired:
+            self.minima.popleft()
+        while self.maxima and self.maxima[-1][1] <= value:
+            self.maxima.pop()
+        self.maxima.append((sequence, value))
+        if self.maxima[0][0] <= expired:
+            self.maxima.popleft()
+
+    @property
+    def min(self):
+        return self.minima[0][1]
+
+    @property
+    def max(self):
+        return self.maxima[0][1]
+
+    def __getitem__(self, index):
+        if not -self.capacity <= index < self.capacity:
+            raise IndexError("series index out of range")
+        return self.buffer[(self.count - 1 - index) % self.capacity]
+
+    def __len__(self):
+        return self.capacity
+
+    def __iter__(self):
+        newest = (self.count - 1) % self.capacity
+        return iter(self.buffer[newest::-1] + self.buffer[:newest:-1])
+
+    def __repr__(self):
+        return "GraphSeries({!r})".format(list(self))
+
+
+class GraphRenderer:
+    """
+    Draws a :py:class:`GraphSeries` exactly like :py:func:`make_graph` draws
+    its values, but incrementally.
+
+    The graph of the last call is kept and only the characters of values
+    appended since then are drawn, the others are reused, as long as the
+    scale of the y axis stays the same. It only changes with dynamic limits,
+    or values outside of the limits, entering or leaving the history; then
+    the whole graph is drawn again.
+
+    :param series: The :py:class:`GraphSeries` to draw
+    :param lower_limit: Minimum value for the y axis (or None for dynamic).
+    :param upper_limit: Maximum value for the y axis (or None for dynamic).
+    :param style: Drawing style ('blocks', 'braille-fill', 'braille-peak', or 'braille-snake').
+    """
+
+    styles = GRAPH_STYLES
+
+    def __init__(self, series, lower_limit=0.0, upper_limit=100.0, style="blocks"):
+        if style not in self.styles:
+            raise NotImplementedError("Graph drawing style '%s' unimplemented." % style)
+        self.series = series
+        self.lower_limit = None if lower_limit is None else float(lower_limit)
+        self.upper_limit = None if upper_limit is None else float(upper_limit)
+        self.style = style
+        if style == 'blocks':
+            # One character per value
+            self.step, self.width = 1, len(series)
+            self.glyph = self.block
+        else:
+            # One character per two values, make_graph only draws the
+            # newer half of them
+            self.step, self.width = 2, ((len(series) + 1) // 2 + 1) // 2
+            self.glyph = self.braille
+        self.scale = None
+        # Last graph by parity of the sequence number of its newest value
+        # (braille characters pair different values after every append), as
+        # (sequence number, graph)
+        self.graphs = {}
+
+    def render(self):
+        """:returns: The graph of the series as a string"""
+        series = self.series
+        mn, mx = series.min, series.max
+        mn = mn if self.lower_limit is None else min(mn, self.lower_limit)
+        mx = mx if self.upper_limit is None else max(mx, self.upper_limit)
+        if (mn, mx) != self.scale:
+            self.scale = (mn, mx)
+            self.extent = mx - mn
+            self.graphs = {}
+        if self.step == 2 and (self.extent == 0 or len(series) < 2 or
+                               self.style == 'braille-snake' and (len(series) + 1) // 2 % 2):
+            # Corner cases (including the errors) of make_graph
+            return make_graph(series, self.lower_limit, self.upper_limit, self.style)
+
+        self.newest = newest = series.count - 1
+        previous = self.graphs.get(newest % self.step)
+        if previous is None or newest - previous[0] > (self.width - 1) * self.step:
+            graph = ''.join(self.glyph(sequence)
+                            for sequence in range(newest, newest - self.width * self.step, -self.step))
+        else:
+            top, graph = previous
+            # The character of the previous newest value is drawn again,
+            # 'braille-snake' draws the newest value differently
+            fresh = ''.join(self.glyph(sequence) for sequence in range(newest, top - 1, -self.step))
+            graph = fresh + graph[1:self.width - len(fresh) + 1]
+        self.graphs[newest % self.step] = (newest, graph)
+        return graph
+
+    def value(self, sequence):
+        return self.series.buffer[sequence % self.series.capacity]
+
+    def block(self, sequence):
+        if self.extent == 0:
+            return '_'
+        bar_count = len(GRAPH_BLOCKS) - 1
+        return GRAPH_BLOCKS[int((self.value(sequence) - self.scale[0]) / self.extent * bar_count)]
+
+    def level(self, sequence):
+        return round(4 * (self.value(sequence) - self.scale[0]) / self.extent)
+
+    def bits(self, sequence):
+        level = self.level(sequence)
+        if self.style != 'braille-snake':
+            return BRAILLE_LEVELS[self.style][level]
+        # Connect to the neighbours, the newest value has only one
+        newer = self.level(sequence + 1) if sequence < self.newest else level
+        return BRAILLE_SNAKE[min(newer, level, self.level(sequence - 1))][level]
+
+    def braille(self, sequence):
+        return BRAILLE[self.bits(sequence) + BRAILLE_RIGHT[self.bits(sequence - 1)]]
+
+
 def make_vertical_bar(percentage, width=1, glyphs=None):
     """
     Draws a vertical bar made of unicode characters.
@@ -515,6 +1019,33 @@ def make_vertical_bar(percentage, width=1, glyphs=None):
     return bar * width
 
 
+def make_vertical_bars(percentages, width=1, glyphs=None):
+    """
+    Draws several vertical bars at once, see :py:func:`make_vertical_bar`.
+
+    :param percentages: An iterable of values between 0 and 100
+    :returns: List of bars as strings
+    """
+    glyphs = VERTICAL_BAR_GLYPHS if glyphs is None else glyphs
+    return [make_glyph(percentage, glyphs, 0, 100) * width for percentage in percentages]
+
+
+VERTICAL_BAR_GLYPHS = " _▁▂▃▄▅▆▇█"
+BAR_PARTS = (' ', '▏', '▎', '▍', '▌', '▋', '▋', '▊', '▊', '█')
+
+
+def draw_bar(tens, ones):
+    result = tens * '█'
+    if ones >= 1:
+        result = result + BAR_PARTS[ones]
+    result = result + (10 - len(result)) * ' '
+    return result
+
+
+# Bars of make_bar by tens and ones of the percentage
+BARS = tuple(tuple(draw_bar(tens, ones) for ones in range(10)) for tens in range(11))
+
+
 def make_bar(percentage):
     """
     Draws a bar made of unicode box characters.
@@ -523,17 +1054,24 @@ def make_bar(percentage):
     :returns: Bar as a string
     """
 
-    bars = [' ', '▏', '▎', '▍', '▌', '▋', '▋', '▊', '▊', '█']
     tens = int(percentage / 10)
     ones = int(percentage) - tens * 10
-    result = tens * '█'
-    if ones >= 1:
-        result = result + bars[ones]
-    result = result + (10 - len(result)) * ' '
-    return result
+    if 0 <= tens <= 10 and 0 <= ones <= 9:
+        return BARS[tens][ones]
+    return draw_bar(tens, ones)
+
+
+def make_bars(percentages):
+    """
+    Draws several bars at once, see :py:func:`make_bar`.
+
+    :param percentages: An iterable of values between 0 and 100
+    :returns: List of bars as strings
+    """
+    return [make_bar(percentage) for percentage in percentages]
 
 
-def make_glyph(number, glyphs=" _▁▂▃▄▅▆▇█", lower_bound=0, upper_bound=100, enable_boundary_glyphs=False):
+def make_glyph(number, glyphs=VERTICAL_BAR_GLYPHS, lower_bound=0, upper_bound=100, enable_boundary_glyphs=False):
     """
     Returns a single glyph from the list of glyphs provided relative to where
     the number is in the range (by default a percentage value is expected).
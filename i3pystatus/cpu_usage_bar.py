@@ -1,6 +1,6 @@
 from i3pystatus.core.color import ColorRangeModule
 from i3pystatus.cpu_usage import CpuUsage
-from i3pystatus.core.util import make_bar, make_vertical_bar
+from i3pystatus.core.util import make_bars, make_vertical_bars
 
 
 class CpuUsageBar(CpuUsage, ColorRangeModule):
@@ -40,18 +40,14 @@ class CpuUsageBar(CpuUsage, ColorRangeModule):
     def run(self):
         cpu_usage = self.get_usage()
 
-        cpu_usage_bar = {}
+        if self.bar_type == 'horizontal':
+            bars = make_bars(cpu_usage.values())
+        elif self.bar_type == 'vertical':
+            bars = make_vertical_bars(cpu_usage.values())
+        else:
+            raise Exception("bar_type must be 'horizontal' or 'vertical'!")
 
-        for core, usage in cpu_usage.items():
-            core = core.replace('usage', 'usage_bar')
-            if self.bar_type == 'horizontal':
-                cpu_usage_bar[core] = make_bar(usage)
-            elif self.bar_type == 'vertical':
-                cpu_usage_bar[core] = make_vertical_bar(usage)
-            else:
-                raise Exception("bar_type must be 'horizontal' or 'vertical'!")
-
-        cpu_usage.update(cpu_usage_bar)
+        cpu_usage.update({core.replace('usage', 'usage_bar'): bar for core, bar in zip(list(cpu_usage), bars)})
 
         # for backward compatibility
         cpu_usage['usage_bar'] = cpu_usage['usage_bar_cpu']
@@ -1,6 +1,6 @@
 from i3pystatus.core.color import ColorRangeModule
 from i3pystatus.cpu_usage import CpuUsage
-from i3pystatus.core.util import make_graph
+from i3pystatus.core.util import GraphRenderer, GraphSeries
 
 
 class CpuUsageGraph(CpuUsage, ColorRangeModule):
@@ -38,17 +38,16 @@ class CpuUsageGraph(CpuUsage, ColorRangeModule):
 
     def init(self):
         super().init()
-        self.cpu_readings = self.graph_width * [0]
+        self.cpu_readings = GraphSeries(self.graph_width)
+        self.cpu_graph = GraphRenderer(self.cpu_readings, 0.0, 100.0, self.graph_style)
         self.colors = self.get_hex_color_range(self.start_color, self.end_color, int(100))
 
     def run(self):
         format_options = self.get_usage()
         core_reading = format_options[self.cpu]
 
-        self.cpu_readings.insert(0, core_reading)
-        self.cpu_readings = self.cpu_readings[:self.graph_width]
-
-        graph = make_graph(self.cpu_readings, 0.0, 100.0, self.graph_style)
+        self.cpu_readings.append(core_reading)
+        graph = self.cpu_graph.render()
 
         if self.direction == "right-to-left":
             graph = graph[::-1]
@@ -78,11 +78,12 @@ class Deluge(IntervalModule):
 
         self.parse_values(self.data)
 
-        self.output = {
+        output = {
             'full_text': self.format.format(**self.data)
         }
         if self.color:
-            self.output['color'] = self.color
+            output['color'] = self.color
+        self.output = output
 
     def parse_values(self, values):
         for k, v in values.items():
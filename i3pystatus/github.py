@@ -267,7 +267,6 @@ class Github(IntervalModule):
             'unread': 0,
             'unread_count': '',
             'update_error': ''}
-    output = {'full_text': '', 'color': None}
 
     # Click events
     on_leftclick = ['perform_update']
@@ -286,6 +285,7 @@ class Github(IntervalModule):
         user_open(self.notifications_url)
 
     def init(self):
+        self.output = {'full_text': '', 'color': None}
         if self.colors != self._default_colors:
             new_colors = copy.copy(self._default_colors)
             new_colors.update(self.colors)
@@ -404,8 +404,8 @@ class Github(IntervalModule):
 
     @require(internet)
     def perform_update(self):
-        self.output['full_text'] = \
-            self.refresh_icon + self.output.get('full_text', '')
+        self.output = dict(self.output,
+                           full_text=self.refresh_icon + self.output.get('full_text', ''))
         self.failed_update = False
 
         self.update_status()
@@ -2,9 +2,9 @@ from fnmatch import fnmatch
 
 import netifaces
 
-from i3pystatus import IntervalModule, formatp
+from i3pystatus import IntervalModule
 from i3pystatus.core.color import ColorRangeModule
-from i3pystatus.core.util import make_graph, round_dict, make_bar, bytes_info_dict
+from i3pystatus.core.util import GraphRenderer, GraphSeries, round_dict, make_bar, bytes_info_dict, compile_formatp, LazyData
 
 
 def count_bits(integer):
@@ -379,13 +379,15 @@ class Network(IntervalModule, ColorRangeModule):
         if not self.dynamic_color:
             self.end_color = self.start_color = self.color_up
         self.colors = self.get_hex_color_range(self.start_color, self.end_color, 100)
-        self.kbs_recv_arr = [0.0] * self.graph_width
-        self.kbs_sent_arr = [0.0] * self.graph_width
+        self.kbs_recv_arr = GraphSeries(self.graph_width)
+        self.kbs_sent_arr = GraphSeries(self.graph_width)
         self.pango_enabled = self.hints.get("markup", False) and self.hints["markup"] == "pango"
 
         # convert settings from the nominated unit to bytes (backwards compatibility)
         self.sent_limit *= 1024
         self.recv_limit *= 1024
+        self.recv_graph = GraphRenderer(self.kbs_recv_arr, 0.0, self.recv_limit, self.graph_style)
+        self.sent_graph = GraphRenderer(self.kbs_sent_arr, 0.0, self.sent_limit, self.graph_style)
 
         self.graph_direction = self.graph_direction.lower()
         if self.graph_direction not in ('left-to-right', 'right-to-left'):
@@ -404,31 +406,30 @@ class Network(IntervalModule, ColorRangeModule):
             self.network_traffic.clear_counters()
             self.kbs_arr = [0.0] * self.graph_width
 
-    def get_network_graph_recv(self, kbs, limit):
-        # Cycle array by inserting at the start and chopping off the last element
-        self.kbs_recv_arr.insert(0, kbs)
-        self.kbs_recv_arr = self.kbs_recv_arr[:self.graph_width]
-        graph = make_graph(self.kbs_recv_arr, 0.0, limit, self.graph_style)
-        if self.graph_direction == 'right-to-left':
-            return graph[::-1]
-        else:
-            return graph
+    def record_traffic(self, network_usage):
+        """Add the current traffic to the history shown by the graphs."""
+        self.kbs_recv_arr.append(network_usage['bytes_recv'])
+        self.kbs_sent_arr.append(network_usage['bytes_sent'])
 
-    def get_network_graph_sent(self, kbs, limit):
-        # Cycle array by inserting at the start and chopping off the last element
-        self.kbs_sent_arr.insert(0, kbs)
-        self.kbs_sent_arr = self.kbs_sent_arr[:self.graph_width]
-        graph = make_graph(self.kbs_sent_arr, 0.0, limit, self.graph_style)
+    def get_network_graph(self, renderer):
+        graph = renderer.render()
         if self.graph_direction == 'right-to-left':
             return graph[::-1]
         else:
             return graph
 
+    def format_bytes(self, value):
+        if self.auto_units:
+            return '{value:.{round}f}{unit}'.format(round=self.round_size, **bytes_info_dict(value))
+        return '{:.{round}f}'.format(value / self.divisor, round=self.round_size)
+
     def run(self):
-        format_values = dict(network_graph_recv="", network_graph_sent="", bytes_sent="", bytes_recv="",
-                             packets_sent="", packets_recv="", rx_tot_Mbytes="", tx_tot_Mbytes="",
-                             interface="", v4="", v4mask="", v4cidr="", v6="", v6mask="", v6cidr="", mac="",
-                             essid="", freq="", quality="", quality_bar="", rx_tot='', tx_tot="")
+        # Everything not needed by the format string is only computed when
+        # a callback uses it, see LazyData.
+        format_values = LazyData(network_graph_recv="", network_graph_sent="", bytes_sent="", bytes_recv="",
+                                 packets_sent="", packets_recv="", rx_tot_Mbytes="", tx_tot_Mbytes="",
+                                 interface="", v4="", v4mask="", v4cidr="", v6="", v6mask="", v6cidr="", mac="",
+                                 essid="", freq="", quality="", quality_bar="", rx_tot='', tx_tot="")
 
         if self.detect_active:
             self.interface = detect_active_interface(self.ignore_interfaces, self.interface)
@@ -436,16 +437,25 @@ class Network(IntervalModule, ColorRangeModule):
         if self.network_traffic:
             network_usage = self.network_traffic.get_usage(self.interface)
             format_values.update(network_usage)
-            format_values['network_graph_recv'] = self.get_network_graph_recv(network_usage['bytes_recv'], self.recv_limit)
-            format_values['network_graph_sent'] = self.get_network_graph_sent(network_usage['bytes_sent'], self.sent_limit)
+            self.record_traffic(network_usage)
+            # Drawn right away, callbacks use `data` from other threads and the
+            # renderers keep state. Only the newest values are drawn anyway.
+            graphs = {
+                'recv': self.get_network_graph(self.recv_graph),
+                'sent': self.get_network_graph(self.sent_graph),
+            }
+            format_values['network_graph_recv'] = graphs['recv']
+            format_values['network_graph_sent'] = graphs['sent']
 
             format_values['tx_tot_Mbytes'] = network_usage['tx_total'] / (1024 * 1024)
             format_values['rx_tot_Mbytes'] = network_usage['rx_total'] / (1024 * 1024)
 
-            format_values['rx_tot'] = '{value:.{round}f}{unit}'.format(
-                round=self.round_size, **bytes_info_dict(network_usage['rx_total']))
-            format_values['tx_tot'] = '{value:.{round}f}{unit}'.format(
-                round=self.round_size, **bytes_info_dict(network_usage['tx_total']))
+            format_values.lazy('rx_tot', lambda: '{value:.{round}f}{unit}'.format(
+                round=self.round_size, **bytes_info_dict(network_usage['rx_total'])))
+            format_values.lazy('tx_tot', lambda: '{value:.{round}f}{unit}'.format(
+                round=self.round_size, **bytes_info_dict(network_usage['tx_total'])))
+            format_values.lazy('bytes_recv', lambda: self.format_bytes(network_usage['bytes_recv']))
+            format_values.lazy('bytes_sent', lambda: self.format_bytes(network_usage['bytes_sent']))
 
             if self.dynamic_color:
                 if self.separate_color and self.pango_enabled:
@@ -453,10 +463,17 @@ class Network(IntervalModule, ColorRangeModule):
                     color_template = "<span color=\"{}\">{}</span>"
                     per_recv = network_usage["bytes_recv"] / self.recv_limit
                     per_sent = network_usage["bytes_sent"] / self.sent_limit
-                    c_recv = self.get_gradient(int(per_recv * 100), self.colors, 100)
-                    c_sent = self.get_gradient(int(per_sent * 100), self.colors, 100)
-                    format_values['network_graph_recv'] = color_template.format(c_recv, format_values["network_graph_recv"])
-                    format_values['network_graph_sent'] = color_template.format(c_sent, format_values["network_graph_sent"])
+                    gradients = LazyData()
+                    gradients.lazy('recv', lambda: self.get_gradient(int(per_recv * 100), self.colors, 100))
+                    gradients.lazy('sent', lambda: self.get_gradient(int(per_sent * 100), self.colors, 100))
+                    format_values.lazy('network_graph_recv',
+                                       lambda: color_template.format(gradients['recv'], graphs['recv']))
+                    format_values.lazy('network_graph_sent',
+                                       lambda: color_template.format(gradients['sent'], graphs['sent']))
+                    format_values.lazy('bytes_recv', lambda: color_template.format(
+                        gradients['recv'], self.format_bytes(network_usage['bytes_recv'])))
+                    format_values.lazy('bytes_sent', lambda: color_template.format(
+                        gradients['sent'], self.format_bytes(network_usage['bytes_sent'])))
                 else:
                     if self.coloring_type == "recv":
                         color = self.get_gradient(network_usage['bytes_recv'], self.colors, self.recv_limit)
@@ -484,24 +501,16 @@ class Network(IntervalModule, ColorRangeModule):
             if self.next_if_down:
                 self.cycle_interface()
 
-        network_info = self.network_info.get_info(self.interface)
-        format_values.update(network_info)
-        format_values['interface'] = self.interface
-
-        if self.network_traffic:
-            for metric in ('bytes_recv', 'bytes_sent'):
-                if self.auto_units:
-                    format_values[metric] = '{value:.{round}f}{unit}'.format(
-                        round=self.round_size, **bytes_info_dict(format_values[metric]))
-                else:
-                    format_values[metric] = '{:.{round}f}'.format(format_values[metric] / self.divisor,
-                                                                  round=self.round_size)
-        if self.dynamic_color and self.separate_color and self.pango_enabled:
-            format_values["bytes_recv"] = color_template.format(c_recv, format_values["bytes_recv"])
-            format_values["bytes_sent"] = color_template.format(c_sent, format_values["bytes_sent"])
+        interface = self.interface
+        network_info = LazyData()
+        network_info.lazy('info', lambda: self.network_info.get_info(interface))
+        for key in ('v4', 'v4mask', 'v4cidr', 'v6', 'v6mask', 'v6cidr', 'mac', 'essid', 'freq', 'quality',
+                    'quality_bar'):
+            format_values.lazy(key, lambda key=key: network_info['info'].get(key, ""))
+        format_values['interface'] = interface
 
         self.data = format_values
         self.output = {
-            "full_text": formatp(format_str, **format_values).strip(),
+            "full_text": compile_formatp(format_str).render(format_values).strip(),
             'color': color,
         }
@@ -377,7 +377,6 @@ class Scores(Module):
     refresh_icon = '⟳'
     team_format = 'name'
 
-    output = {'full_text': ''}
     game_map = {}
     backend_id = 0
 
@@ -389,6 +388,7 @@ class Scores(Module):
     on_doublerightclick = ['reset_backend']
 
     def init(self):
+        self.output = {'full_text': ''}
         if not isinstance(self.backends, list):
             self.backends = [self.backends]
 
@@ -628,8 +628,8 @@ class Scores(Module):
         self.refresh_display()
 
     def show_refresh_icon(self):
-        self.output['full_text'] = \
-            self.refresh_icon + self.output.get('full_text', '')
+        self.output = dict(self.output,
+                           full_text=self.refresh_icon + self.output.get('full_text', ''))
 
     def refresh_display(self):
         if self.current_scroll_index is None:
@@ -58,17 +58,15 @@ class Solaar(IntervalModule):
         raise NoBatteryStatus('unknown/error')
 
     def run(self):
-        self.output = {}
-
         try:
             device_number = self.findDeviceNumber()
             output = self.findBatteryStatus(device_number)
-            self.output['color'] = self.color
+            color = self.color
         except DeviceNotFound:
             output = "device absent"
-            self.output['color'] = self.error_color
+            color = self.error_color
         except NoBatteryStatus as e:
             output = e.message
-            self.output['color'] = self.error_color
+            color = self.error_color
 
-        self.output['full_text'] = output
+        self.output = {'full_text': output, 'color': color}
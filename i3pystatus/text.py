@@ -15,8 +15,9 @@ class Text(Module):
     color = None
 
     def init(self):
-        self.output = {
+        output = {
             "full_text": self.text
         }
         if self.color:
-            self.output["color"] = self.color
+            output["color"] = self.color
+        self.output = output
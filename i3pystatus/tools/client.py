@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Shows the modules of an i3pystatus process started with
+``Status(serve="/path/to/socket")`` in another bar, e.g. the i3bar of a
+second monitor or lemonbar, without running the modules a second time:
+
+.. code:: bash
+
+    i3pystatus-client /path/to/socket --modules clock,battery
+    i3pystatus-client /path/to/socket --protocol text | lemonbar
+
+Click events read from stdin are passed on to the modules.
+"""
+
+import argparse
+import socket
+import sys
+import time
+from threading import Thread
+
+from i3pystatus.core.codec import Codec
+from i3pystatus.core.io import IOHandler, JSONIO
+
+
+def connect(path, wait):
+    """Connect to the socket at `path`, waiting up to `wait` seconds for the server to start."""
+    deadline = time.monotonic() + wait
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+            return sock
+        except (FileNotFoundError, ConnectionRefusedError):
+            sock.close()
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
+
+
+def forward_clicks(sock, inp):
+    for line in IOHandler(inp).read():
+        line = JSONIO.split_prefix(line)[1]
+        # The click event stream is a JSON array, one event per line
+        if line not in (b"[", "["):
+            sock.sendall(line if isinstance(line, bytes) else line.encode())
+            sock.sendall(b"\n")
+
+
+def run(sock, protocol, modules=None, separator=" | ", click_events=True, inp=sys.stdin, out=sys.stdout):
+    """
+    Stream the lines served on `sock` to `out` until the server goes away.
+
+    :param protocol: ``i3bar`` or ``text``
+    :param modules: Names of the modules to show, or None for all
+    :param separator: Separator of the blocks with the ``text`` protocol
+    :param click_events: Whether to read click events from `inp` and pass them on, ``i3bar`` only
+    """
+    codec = Codec.default()
+    sock.sendall(codec.dumps({"modules": modules, "protocol": protocol, "separator": separator}) + b"\n")
+    io = IOHandler(inp, out)
+    i3bar = protocol == "i3bar"
+    if i3bar:
+        io.write_line(codec.dumps({"version": 1, "click_events": click_events}))
+        io.write_line(b"[")
+        if click_events:
+            thread = Thread(target=forward_clicks, args=(sock, inp), name="forward_clicks")
+            thread.daemon = True
+            thread.start()
+    prefix = b""
+    for line in sock.makefile("rb"):
+        io.write_line(prefix + line.rstrip(b"\n"))
+        if i3bar:
+            prefix = b","
+
+
+def main():
+    parser = argparse.ArgumentParser(description="""
+        Show the modules of an i3pystatus process started with Status(serve=SOCKET)
+    """)
+    parser.add_argument("socket", help="path of the socket")
+    parser.add_argument("-m", "--modules", help="comma separated names of the modules to show, defaults to all")
+    parser.add_argument("-p", "--protocol", choices=("i3bar", "text"), default="i3bar",
+                        help="i3bar/swaybar protocol, or one line of plain text per update")
+    parser.add_argument("-s", "--separator", default=" | ", help="separator of the modules in plain text")
+    parser.add_argument("--no-click-events", dest="click_events", action="store_false",
+                        help="do not pass click events on")
+    parser.add_argument("-w", "--wait", type=float, default=10,
+                        help="seconds to wait for the server to start, defaults to 10")
+    args = parser.parse_args()
+
+    try:
+        sock = connect(args.socket, args.wait)
+    except OSError as e:
+        sys.exit("Could not connect to {}: {}".format(args.socket, e))
+    modules = args.modules.split(",") if args.modules else None
+    run(sock, args.protocol, modules, args.separator, args.click_events)
+    sys.exit("Server at {} went away".format(args.socket))
+
+
+if __name__ == "__main__":
+    main()
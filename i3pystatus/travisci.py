@@ -99,14 +99,15 @@ class TravisCI(IntervalModule):
             self.last_build_finished = self._format_time(repo.last_build_finished_at)
             self.last_build_duration = TimeWrapper(repo.last_build_duration, default_format=self.duration_format)
 
-        self.output = dict(
+        output = dict(
             full_text=formatp(self.format, **vars(self)),
             short_text=self.short_format.format(**vars(self)),
         )
         if self.status_color_map:
-            self.output['color'] = self.status_color_map.get(repo.last_build_state, self.color)
+            output['color'] = self.status_color_map.get(repo.last_build_state, self.color)
         else:
-            self.output['color'] = self.color
+            output['color'] = self.color
+        self.output = output
 
     def open_build_webpage(self):
         os.popen('xdg-open https://travis-ci.org/{owner}/{repository_name}/builds/{build_id} > /dev/null'
@@ -184,8 +184,6 @@ class Weather(IntervalModule):
     refresh_icon = '⟳'
     format = '{current_temp}{temp_unit}[ {update_error}]'
 
-    output = {'full_text': ''}
-
     on_doubleleftclick = ['launch_web']
     on_leftclick = ['check_weather']
 
@@ -195,6 +193,7 @@ class Weather(IntervalModule):
             user_open(self.backend.conditions_url)
 
     def init(self):
+        self.output = {'full_text': ''}
         if self.online_interval is None:
             self.online_interval = int(self.interval)
 
@@ -254,8 +253,8 @@ class Weather(IntervalModule):
         '''
         Check the weather using the configured backend
         '''
-        self.output['full_text'] = \
-            self.refresh_icon + self.output.get('full_text', '')
+        self.output = dict(self.output,
+                           full_text=self.refresh_icon + self.output.get('full_text', ''))
         self.backend.check_weather()
         self.refresh_display()
 
@@ -23,7 +23,8 @@ setup(name="i3pystatus",
       entry_points={
           "console_scripts": [
               "i3pystatus = i3pystatus:main",
-              "i3pystatus-setting-util = i3pystatus.tools.setting_util:main"
+              "i3pystatus-setting-util = i3pystatus.tools.setting_util:main",
+              "i3pystatus-client = i3pystatus.tools.client:main"
           ]
       },
       zip_safe=True,
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from i3pystatus.core import ClickDispatcher
+from i3pystatus.core.modules import Module
+from i3pystatus.core.stats import registry
+
+
+class IO:
+    def __init__(self):
+        self.refreshes = 0
+
+    def on_next_frame(self, callback):
+        callback()
+
+    def async_refresh(self):
+        self.refreshes += 1
+
+
+class Clickable(Module):
+    settings = ("duration",)
+    duration = 0.0
+
+    def init(self):
+        self.clicks = []
+        self.refreshes = 0
+        self.running = threading.Lock()
+        self.overlaps = 0
+
+    def on_click(self, button, **kwargs):
+        if not self.running.acquire(blocking=False):
+            self.overlaps += 1
+            return
+        time.sleep(self.duration)
+        self.clicks.append(button)
+        self.running.release()
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+def test_click_dispatcher():
+    io = IO()
+    dispatcher = ClickDispatcher(io)
+    clicks = len(registry.histogram("click to frame"))
+    slow, fast = Clickable(duration=0.3), Clickable(duration=0.01)
+
+    dispatcher.dispatch(slow, 1)
+    for _ in range(10):
+        dispatcher.dispatch(fast, 4)
+    time.sleep(0.2)
+    # Not held up by the slow module
+    assert fast.clicks == [4] * 10
+    # Queued scroll events are refreshed once
+    assert fast.refreshes == 1
+    assert fast.overlaps == 0
+    assert not slow.refreshes
+
+    time.sleep(0.2)
+    assert slow.refreshes == 1
+    assert io.refreshes == 2
+    assert len(registry.histogram("click to frame")) - clicks == 11
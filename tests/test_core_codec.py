@@ -0,0 +1,35 @@
+import pytest
+
+from i3pystatus.core import codec
+
+
+@pytest.mark.parametrize("name", list(codec.BACKENDS))
+def test_codec_roundtrip(name):
+    try:
+        backend = codec.select(name)
+    except ImportError:
+        pytest.skip("{} is not installed".format(name))
+    blocks = [{"full_text": "ä & <b>/</b>", "color": None, "separator": False, "min_width": 12}]
+    line = backend.dumps(blocks)
+    assert isinstance(line, bytes)
+    assert line == codec.Codec().dumps(blocks)
+    assert backend.loads(line) == blocks
+    assert backend.loads(line.decode()) == blocks
+
+
+@pytest.mark.parametrize("name", list(codec.BACKENDS))
+def test_codec_lone_surrogate(name):
+    try:
+        backend = codec.select(name)
+    except ImportError:
+        pytest.skip("{} is not installed".format(name))
+    line = backend.dumps([{"full_text": "a\ud800b"}])
+    line.decode()
+    assert backend.loads(line)[0]["full_text"].startswith("a")
+
+
+def test_codec_select():
+    assert codec.select() is not None
+    assert codec.select("json").name == "json"
+    with pytest.raises(ValueError):
+        codec.select("yaml")
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from i3pystatus.core import color
+from i3pystatus.core.color import ColorRangeModule
+
+
+def test_hex_color_range():
+    assert ColorRangeModule.get_hex_color_range("#00FF00", "#FF0000", 5) == [
+        "#00ff00", "#7fff00", "#ffff00", "#ff7f00", "#ff0000"]
+    assert ColorRangeModule.get_hex_color_range("#fff", "#123", 3) == ["#ffffff", "#83ac75", "#112233"]
+    assert ColorRangeModule.get_hex_color_range("#808080", "#0000ff", 1) == ["#808080"]
+    with pytest.raises(ValueError):
+        ColorRangeModule.get_hex_color_range("#808080", "#0000ff", 0)
+
+
+def test_hex_color_range_is_shared():
+    colors = ColorRangeModule.get_hex_color_range("#00FF00", "#0000FF", 100)
+    colors.append("#000000")
+    assert ColorRangeModule.get_hex_color_range("#00FF00", "#0000FF", 100) == colors[:-1]
+    assert color.hex_color_range("#00FF00", "#0000FF", 100) is color.hex_color_range("#00FF00", "#0000FF", 100)
+
+
+def test_hex_color_range_matches_colour():
+    colour = pytest.importorskip("colour")
+    rng = random.Random(25)
+    for _ in range(500):
+        start, end = ("#%06x" % rng.randrange(1 << 24) for _ in range(2))
+        quantity = rng.choice((2, 10, 100))
+        expected = [color.long_hex(c.hex)
+                    for c in colour.Color(start).range_to(colour.Color(end), quantity)]
+        assert color.hex_color_range(start, end, quantity) == tuple(expected)
+    # Named colors are left to colour
+    assert ColorRangeModule.get_hex_color_range("green", "red", 3) == ["#008000", "#bfbf00", "#ff0000"]
@@ -0,0 +1,142 @@
+"""
+Differential test of :py:func:`i3pystatus.core.util.formatp` against the
+engine it replaced, which is kept here verbatim. benchmarks/formatp.py
+uses it as well.
+"""
+
+import random
+import re
+
+from i3pystatus.core.util import TimeWrapper, compile_formatp, flatten, formatp
+
+
+def legacy_formatp(string, **kwargs):
+    """The formatp engine before templates were compiled, for comparison."""
+
+    def build_stack(string):
+        """
+        Builds a stack with OpeningBracket, ClosingBracket and String tokens.
+        Tokens have a level property denoting their nesting level.
+        They also have a string property containing associated text (empty for
+        all tokens but String tokens).
+        """
+
+        class Token:
+            string = ""
+
+        class OpeningBracket(Token):
+            pass
+
+        class ClosingBracket(Token):
+            pass
+
+        class String(Token):
+            def __init__(self, str):
+                self.string = str
+
+        TOKENS = {
+            "[": OpeningBracket,
+            "]": ClosingBracket,
+        }
+
+        stack = []
+
+        # Index of next unconsumed char
+        next = 0
+        # Last consumed char
+        prev = ""
+        # Current char
+        char = ""
+        # Current level
+        level = 0
+
+        while next < len(string):
+            prev = char
+            char = string[next]
+            next += 1
+
+            if prev != "\\" and char in TOKENS:
+                token = TOKENS[char]()
+                token.index = next
+                if char == "]":
+                    level -= 1
+                token.level = level
+                if char == "[":
+                    level += 1
+                stack.append(token)
+            else:
+                if stack and isinstance(stack[-1], String):
+                    stack[-1].string += char
+                else:
+                    token = String(char)
+                    token.level = level
+                    stack.append(token)
+        return stack
+
+    def build_tree(items, level=0):
+        """
+        Builds a list-of-lists tree (in forward order) from a stack (reversed order),
+        and formats the elements on the fly, discarding everything not eligible for
+        inclusion.
+        """
+        subtree = []
+
+        while items:
+            nested = []
+            while items[0].level > level:
+                nested.append(items.pop(0))
+            if nested:
+                subtree.append(build_tree(nested, level + 1))
+
+            item = items.pop(0)
+            if item.string:
+                string = item.string
+                if level == 0:
+                    subtree.append(string.format(**kwargs))
+                else:
+                    fields = re.findall(r"({(\w+)[^}]*})", string)
+                    successful_fields = 0
+                    for fieldspec, fieldname in fields:
+                        if kwargs.get(fieldname, False):
+                            successful_fields += 1
+                    if successful_fields == len(fields):
+                        subtree.append(string.format(**kwargs))
+                    else:
+                        return []
+        return subtree
+
+    def merge_tree(items):
+        return "".join(flatten(items)).replace(r"\]", "]").replace(r"\[", "[")
+
+    stack = build_stack(string)
+    tree = build_tree(stack, 0)
+    return merge_tree(tree)
+
+
+PIECES = ["[", "]", "[", "]", "\\[", "\\]", " ", "x", " - ", "{a}", "{b}", "{c}", "{a:>4}", "{b!r}", "{t}",
+          "{t:%h:%M}"]
+# Pieces making most templates fail in one way or another
+NOISE = ["\\", "{", "}", "{{", "}}", "{c.real}", "{a[0]}", "{0}", "{}", "{d:{a}}", "{missing}"]
+VALUES = [0, 1, 2.5, -1, "", "s", "ab", None, True, False, [], [1], "\\[v\\]"]
+
+
+def outcome(function, *args, **kwargs):
+    try:
+        return function(*args, **kwargs)
+    except Exception as e:
+        return type(e), str(e)
+
+
+def test_formatp_matches_legacy_engine():
+    rng = random.Random(4711)
+    for _ in range(10000):
+        template = "".join(rng.choice(NOISE if rng.random() < 0.05 else PIECES) for _ in range(rng.randint(0, 12)))
+        kwargs = {name: rng.choice(VALUES) for name in "abcd" if rng.random() < 0.9}
+        kwargs["t"] = TimeWrapper(rng.choice([0, 59, 3600]))
+        assert outcome(formatp, template, **kwargs) == outcome(legacy_formatp, template, **kwargs), template
+
+
+def test_formatp_template_fields():
+    assert compile_formatp("[{a} [{b.c:>{w}}]]{d!r}").fields == {"a", "b", "w", "d"}
+    assert compile_formatp("{a").fields is None
+    assert compile_formatp("[{a}]") is compile_formatp("[{a}]")
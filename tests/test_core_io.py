@@ -0,0 +1,199 @@
+import io
+import time
+
+from i3pystatus.core.io import IOHandler, JSONIO
+from i3pystatus.core.stats import registry
+
+
+class Versions:
+    def __init__(self):
+        self.version = 0
+
+    def __call__(self):
+        return self.version
+
+
+def test_jsonio_skips_unchanged_lines():
+    lines = ["{}", "[", "[]"] + [",[]"] * 5 + [',[{"full_text": "i3status"}]']
+    out = io.StringIO()
+    version = Versions()
+    emitted = registry.counters["frames emitted"]
+    suppressed = registry.counters["frames suppressed"]
+
+    jsonio = JSONIO(IOHandler(io.StringIO("\n".join(lines) + "\n"), out), version=version)
+    for i, j in enumerate(jsonio.read()):
+        j.append({"full_text": "same" if i < 2 else "changed"})
+        # Pretend a module set (possibly the same) output
+        version.version += 1
+
+    written = out.getvalue().splitlines()
+    assert written == [
+        "{}", "[",
+        '[{"full_text":"same"}]',
+        ',[{"full_text":"changed"}]',
+        ',[{"full_text":"i3status"},{"full_text":"changed"}]',
+    ]
+    assert registry.counters["frames emitted"] - emitted == 3
+    assert registry.counters["frames suppressed"] - suppressed == 4
+
+
+def test_jsonio_heartbeat():
+    class Lines(IOHandler):
+        def read(self):
+            for _ in range(3):
+                time.sleep(0.06)
+                yield ",[]"
+
+    out = io.StringIO()
+    jsonio = JSONIO(Lines(None, out), skiplines=0, version=Versions(), heartbeat=0.1)
+    for _ in jsonio.read():
+        pass
+    assert out.getvalue().splitlines() == [",[]", ",[]"]
+
+
+def test_standalone_io_coalesces_refreshes(monkeypatch):
+    import threading
+    from i3pystatus.core.io import StandaloneIO
+    from i3pystatus.core.threading import StartupPlanner, timer
+
+    monkeypatch.setattr(StartupPlanner, "instance", None)
+    standalone = StandaloneIO(False, [], False, interval=10, min_frame_interval=0.2)
+    frames = []
+
+    def consume():
+        for _ in standalone.read():
+            frames.append(timer())
+
+    thread = threading.Thread(target=consume)
+    thread.daemon = True
+    thread.start()
+    time.sleep(0.3)
+
+    requested = timer()
+    standalone.async_refresh()
+    for _ in range(10):
+        time.sleep(0.01)
+        standalone.async_refresh()
+    time.sleep(0.3)
+    assert len(frames) == 2
+    # The first request after a quiet period is not delayed
+    assert frames[0] - requested < 0.05
+    assert frames[1] - frames[0] >= 0.19
+
+
+def test_frame_writer_drops_superseded_frames():
+    import os
+    from i3pystatus.core.io import FrameWriter, is_pipe
+
+    read, write = os.pipe()
+    out = os.fdopen(write, "wb")
+    assert is_pipe(out)
+    dropped = registry.counters["frames dropped"]
+    stalls = len(registry.histogram("stdout stalls"))
+
+    writer = FrameWriter(out)
+    # Others writing to the pipe (e.g. stderr) must not see BlockingIOError
+    assert os.get_blocking(write)
+    writer.write(b"header")
+    writer.write(b"[")
+    writer.write(b"[" + b"0" * 1000 + b"]")
+    # Fill the pipe while nobody reads from it
+    for i in range(1, 100):
+        writer.write(b",[" + str(i).encode() * 50000 + b"]", droppable=True)
+    time.sleep(0.1)
+    assert registry.counters["frames dropped"] > dropped
+
+    data = b""
+    with os.fdopen(read, "rb") as f:
+        while not data.endswith(b"99" * 50000 + b"]\n"):
+            data += f.read1(1 << 16)
+    lines = data.splitlines()
+    assert lines[:3] == [b"header", b"[", b"[" + b"0" * 1000 + b"]"]
+    assert 3 < len(lines) < 100
+    time.sleep(0.05)
+    assert len(registry.histogram("stdout stalls")) > stalls
+
+
+def test_standalone_io_refresh_signal(monkeypatch):
+    import os
+    import signal
+    import threading
+    from i3pystatus.core.io import StandaloneIO
+    from i3pystatus.core.threading import Scheduler
+
+    class Slow:
+        runs = 0
+
+        def __call__(self):
+            self.runs += 1
+            # Longer than the burst of signals below
+            time.sleep(0.2)
+
+    class Plain:
+        refreshes = 0
+
+        def refresh(self):
+            self.refreshes += 1
+
+    scheduler = Scheduler()
+    monkeypatch.setattr(Scheduler, "instance", scheduler)
+    slow, plain = Slow(), Plain()
+    scheduler.add(slow, 60)
+    scheduler.start()
+    time.sleep(0.25)
+    assert slow.runs == 1
+
+    standalone = StandaloneIO(False, [slow, plain], False)
+    frames = []
+    standalone.async_refresh = lambda: frames.append(slow.runs)
+    threads = threading.active_count()
+    try:
+        for _ in range(20):
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(0.005)
+        time.sleep(0.5)
+    finally:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+    # Overlapping refreshes of the slow module were merged
+    assert 1 < slow.runs <= 3
+    assert 0 < plain.refreshes <= 20
+    assert frames and frames[-1] == slow.runs
+    assert threading.active_count() - threads <= 1
+
+
+def test_standalone_io_suspend_signal(monkeypatch):
+    import os
+    import signal
+    from i3pystatus.core.io import StandaloneIO
+    from i3pystatus.core.threading import Scheduler
+
+    class Counter:
+        runs = 0
+
+        def __call__(self):
+            self.runs += 1
+
+    scheduler = Scheduler()
+    monkeypatch.setattr(Scheduler, "instance", scheduler)
+    counter = Counter()
+    scheduler.add(counter, 60)
+    scheduler.start()
+    time.sleep(0.05)
+
+    standalone = StandaloneIO(False, [counter], True)
+    frames = []
+    standalone.async_refresh = lambda: frames.append(counter.runs)
+    try:
+        os.kill(os.getpid(), signal.SIGUSR2)
+        time.sleep(0.1)
+        assert standalone.stopped and scheduler._suspended
+        os.kill(os.getpid(), signal.SIGUSR2)
+        time.sleep(0.1)
+    finally:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+        signal.signal(signal.SIGUSR2, signal.SIG_DFL)
+    # Parked module ran once on resume, then a frame was requested
+    assert not standalone.stopped and not scheduler._suspended
+    assert counter.runs == 2 and frames == [2]
@@ -226,3 +226,131 @@ def test_required_subclass_overide():
         some_setting = 'foo'
 
     TestSubClass()
+
+
+def test_async_interval_module():
+    import asyncio
+    from i3pystatus import AsyncIntervalModule
+    from i3pystatus.core.threading import StartupPlanner
+
+    class Counter(AsyncIntervalModule):
+        interval = 0.05
+        calls = 0
+
+        async def run(self):
+            await asyncio.sleep(0.01)
+            self.calls += 1
+            self.output = {"full_text": str(self.calls)}
+
+    class Hang(AsyncIntervalModule):
+        interval = 10
+        run_timeout = 0.05
+
+        async def run(self):
+            self.output = {"full_text": "hanging"}
+            await asyncio.sleep(10)
+
+    status = Status(standalone=False)
+    counters = [status.register(Counter) for _ in range(20)]
+    hang = status.register(Hang)
+    time.sleep(0.3)
+    assert all(counter.calls >= 3 for counter in counters)
+    assert hang.output["full_text"] == "hanging*"
+    assert hang.stats.exceptions == 1
+
+    # Modules registered after the first frame are not staggered
+    StartupPlanner.default().wait()
+    slow = status.register(Counter, interval=60)
+    time.sleep(0.1)
+    assert slow.calls == 1
+    slow.refresh()
+    time.sleep(0.1)
+    assert slow.calls == 2
+
+    counters[0].event_loop.suspend()
+    time.sleep(0.1)
+    calls = counters[0].calls
+    time.sleep(0.2)
+    assert counters[0].calls == calls
+    counters[0].event_loop.resume()
+    time.sleep(0.2)
+    assert counters[0].calls > calls
+
+
+def test_async_interval_module_cpu_time():
+    import asyncio
+    from i3pystatus import AsyncIntervalModule
+
+    class Busy(AsyncIntervalModule):
+        interval = 0.05
+
+        async def run(self):
+            end = time.thread_time() + 0.02
+            while time.thread_time() < end:
+                pass
+            await asyncio.sleep(0)
+            self.output = {"full_text": "busy"}
+
+    class Idle(AsyncIntervalModule):
+        interval = 0.05
+
+        async def run(self):
+            await asyncio.sleep(0.03)
+            self.output = {"full_text": "idle"}
+
+    status = Status(standalone=False)
+    busy, idle = status.register(Busy), status.register(Idle)
+    time.sleep(0.3)
+    assert busy.stats.cpu >= 0.02 * busy.stats.calls > 0
+    # Busy ran while Idle was waiting, that is not Idle's CPU time
+    assert idle.stats.cpu < 0.005 * idle.stats.calls
+    assert idle.stats.wall > idle.stats.cpu
+
+    module = status.register(Busy, executor="process")
+    assert not isinstance(module, Busy)
+    assert "executor" in module.output["full_text"]
+
+
+def test_serialize_matches_inject():
+    from i3pystatus.core.codec import Codec
+    from i3pystatus.core.util import ModuleList
+    from i3pystatus.core.imputil import ClassFinder
+
+    class Block(Module):
+        def init(self):
+            self.output = {"full_text": "a & b", "color": "#FFFFFF"}
+
+    modules = ModuleList(None, ClassFinder(Module))
+    for position in (0, 0, -1, 1, 0):
+        modules.append(Block).position = position
+    modules.append(Block, hints={"markup": "pango", "separator": False})
+    modules.append(Module)
+
+    items = [{"full_text": "i3status"}, {"full_text": "disk"}]
+    serialized = modules.serialize(items)
+    for module in modules:
+        module.inject(items)
+    assert serialized == Codec.default().dumps(items)
+
+    fragment = modules[0].fragment()
+    assert modules[0].fragment() is fragment
+    modules[0].output = {"full_text": "changed"}
+    assert modules[0].fragment() is not fragment
+    assert b'"changed"' in modules.serialize([])
+
+
+def test_output_is_assigned_once():
+    from i3pystatus.solaar import Solaar
+
+    class Mouse(Solaar):
+        def findDeviceNumber(self):
+            # A status line built while the module runs
+            self.fragment()
+            return 1
+
+        def findBatteryStatus(self, number):
+            return "50%"
+
+    mouse = Mouse(nameOfDevice="mouse")
+    mouse.run()
+    assert b'"full_text":"50%"' in mouse.fragment()
@@ -0,0 +1,116 @@
+import os
+import time
+
+import pytest
+
+from i3pystatus import IntervalModule
+from i3pystatus.core.process import ProcessPool, WorkerDied
+from i3pystatus.core.stats import registry
+from i3pystatus.core.util import LazyData
+
+
+class Pid(IntervalModule):
+    settings = ("format",)
+    executor = "process"
+    format = "{pid}"
+    runs = 0
+
+    def run(self):
+        self.runs += 1
+        self.data = {"pid": os.getpid(), "runs": self.runs}
+        self.output = {"full_text": self.format.format(**self.data)}
+
+
+class Crash(IntervalModule):
+    executor = "process"
+
+    def run(self):
+        os._exit(1)
+
+
+class Broken(IntervalModule):
+    executor = "process"
+
+    def run(self):
+        raise ValueError("broken")
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ProcessPool(size=1)
+    monkeypatch.setattr(ProcessPool, "instance", pool)
+    yield pool
+    for worker in pool.workers:
+        worker.stop()
+
+
+def test_process_executor(pool):
+    module = Pid()
+    pool.register(module)
+    registry.register(module)
+    pool.start()
+    module()
+    module()
+    assert module.data["pid"] != os.getpid()
+    # State is kept in the worker, the module in this process never ran
+    assert module.data["runs"] == 2
+    assert module.runs == 0
+    assert registry.get(module).transferred > 0
+
+    # Settings changed in this process are visible to the worker
+    module.format = "runs: {runs}"
+    module()
+    assert module.output["full_text"] == "runs: 3"
+
+    # Modules registered after the fork get a worker of their own,
+    # the state of the others is kept
+    late = Pid()
+    pool.register(late)
+    late()
+    assert late.data["runs"] == 1
+    assert late.data["pid"] != module.data["pid"]
+    module()
+    assert module.data["runs"] == 4
+
+
+def test_process_executor_errors(pool):
+    broken, crash, module = Broken(), Crash(), Pid()
+    for m in (broken, crash, module):
+        pool.register(m)
+    with pytest.raises(ValueError):
+        broken()
+    with pytest.raises(WorkerDied):
+        crash()
+    module()
+    assert module.output
+
+
+class Hang(IntervalModule):
+    executor = "process"
+
+    def run(self):
+        self.send_output()
+        time.sleep(10)
+
+
+class Lazy(IntervalModule):
+    executor = "process"
+
+    def run(self):
+        self.data = LazyData(pid=os.getpid())
+        self.data.lazy("parent", os.getppid)
+        self.output = {"full_text": "lazy"}
+
+
+def test_process_executor_timeout_and_lazy_data(pool, monkeypatch):
+    monkeypatch.setattr(pool, "timeout", 0.5)
+    hang, lazy = Hang(), Lazy()
+    pool.register(hang)
+    pool.register(lazy)
+    pool.start()
+    assert pool.workers[0].process is not None
+    with pytest.raises(WorkerDied):
+        hang()
+    lazy()
+    assert lazy.data == {"pid": lazy.data["pid"], "parent": os.getpid()}
+    assert type(lazy.data) is dict
@@ -0,0 +1,144 @@
+import io
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from i3pystatus.core.imputil import ClassFinder
+from i3pystatus.core.modules import Module
+from i3pystatus.core.server import BarServer
+from i3pystatus.core.util import ModuleList
+from i3pystatus.tools import client
+
+
+class Block(Module):
+    settings = ("text",)
+
+    def init(self):
+        self.output = {"full_text": self.text}
+
+
+class Clock(Block):
+    pass
+
+
+@pytest.fixture
+def server(tmp_path):
+    modules = ModuleList(None, ClassFinder(Module))
+    modules.append(Block, text="a")
+    modules.append(Clock, text="12:00")
+    modules.append(Block, text="b")
+    clicks = []
+    server = BarServer(str(tmp_path / "bar.sock"), modules, clicks.append)
+    server.clicks = clicks
+    server.start()
+    # The first line, written by the main loop
+    server.publish()
+    yield server
+    server.close()
+
+
+def subscribe(server, **request):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(server.path)
+    sock.sendall(json.dumps(request).encode() + b"\n")
+    sock.settimeout(0.3)
+    return sock, sock.makefile("rb")
+
+
+def test_server_subsets_and_protocols(server):
+    everything, everything_lines = subscribe(server)
+    clock, clock_lines = subscribe(server, modules=["Clock"], protocol="text")
+    blocks, blocks_lines = subscribe(server, modules=["test_core_server.Block"], protocol="text", separator=" ")
+
+    assert [block["full_text"] for block in json.loads(everything_lines.readline())] == ["b", "12:00", "a"]
+    assert clock_lines.readline() == b"12:00\n"
+    assert blocks_lines.readline() == b"b a\n"
+
+    server.modules[1].output = {"full_text": "12:01"}
+    server.publish()
+    assert [block["full_text"] for block in json.loads(everything_lines.readline())] == ["b", "12:01", "a"]
+    assert clock_lines.readline() == b"12:01\n"
+    # Unchanged for this subscriber, nothing sent
+    with pytest.raises(socket.timeout):
+        blocks_lines.readline()
+
+    for sock, lines in ((everything, everything_lines), (clock, clock_lines), (blocks, blocks_lines)):
+        lines.close()
+        sock.close()
+    time.sleep(0.05)
+    assert not server.subscribers
+
+
+def test_server_builds_lines_on_publishing_thread(tmp_path):
+    class Recorder(Block):
+        threads = set()
+
+        def fragment(self):
+            self.threads.add(threading.current_thread())
+            return super().fragment()
+
+    modules = ModuleList(None, ClassFinder(Module))
+    modules.append(Recorder, text="a")
+    server = BarServer(str(tmp_path / "bar.sock"), modules)
+    server.start()
+    try:
+        # Nothing to send before the first line
+        early, early_lines = subscribe(server)
+        with pytest.raises(socket.timeout):
+            early.recv(1)
+        server.publish()
+        assert json.loads(early_lines.readline())[0]["full_text"] == "a"
+
+        # Later clients get the line of the last publish
+        modules[0].output = {"full_text": "b"}
+        sock, lines = subscribe(server)
+        assert json.loads(lines.readline())[0]["full_text"] == "a"
+        assert Recorder.threads == {threading.current_thread()}
+        for s, f in ((early, early_lines), (sock, lines)):
+            f.close()
+            s.close()
+    finally:
+        server.close()
+
+
+def test_server_forwards_clicks(server):
+    sock, lines = subscribe(server)
+    lines.readline()
+    sock.sendall(b'{"instance": "1", "button": 1, "x": 2, "y": 3}\nnot json\n{"button": 4}\n')
+    time.sleep(0.05)
+    assert server.clicks == [{"instance": "1", "button": 1, "x": 2, "y": 3}, {"button": 4}]
+    sock.close()
+
+
+def test_server_refuses_invalid_request(server):
+    sock, lines = subscribe(server, protocol="lemonbar")
+    assert lines.readline() == b""
+    sock.close()
+
+
+def test_client(server):
+    read, write = socket.socketpair()
+    inp = io.TextIOWrapper(read.makefile("rb"))
+    out = io.TextIOWrapper(io.BytesIO())
+    sock = client.connect(server.path, 1)
+    thread = threading.Thread(target=client.run, args=(sock, "i3bar", ["Clock"]), kwargs=dict(inp=inp, out=out))
+    thread.daemon = True
+    thread.start()
+
+    write.sendall(b'[\n{"instance": "1", "button": 1, "x": 2, "y": 3}\n,{"instance": "2", "button": 3, "x": 2, "y": 3}\n')
+    time.sleep(0.05)
+    server.modules[1].output = {"full_text": "12:01"}
+    server.publish()
+    time.sleep(0.05)
+    server.close()
+    thread.join(1)
+
+    lines = out.buffer.getvalue().splitlines()
+    assert json.loads(lines[0]) == {"version": 1, "click_events": True}
+    assert lines[1] == b"["
+    assert json.loads(lines[2])[0]["full_text"] == "12:00"
+    assert json.loads(lines[3][1:])[0]["full_text"] == "12:01"
+    assert [click["instance"] for click in server.clicks] == ["1", "2"]
@@ -0,0 +1,133 @@
+import io
+import json
+import threading
+
+import i3pystatus.weather
+from i3pystatus.core import Status
+from i3pystatus.core.modules import Module
+from i3pystatus.core.snapshot import Snapshot
+from i3pystatus.core.stats import registry
+
+
+class Weather(Module):
+    settings = ("text",)
+    text = None
+
+    def init(self):
+        if self.text:
+            self.data = {"text": self.text}
+            self.output = {"full_text": self.text}
+
+
+def test_snapshot_restores_stale_output(tmp_path):
+    path = str(tmp_path / "snapshot")
+    snapshot = Snapshot(path)
+    modules = [Weather(text="sunny"), Weather(text="rainy"), Weather()]
+    for module in modules:
+        snapshot.restore(module)
+    snapshot.save()
+    assert set(json.loads(open(path).read())) == {
+        "test_core_snapshot.Weather#0", "test_core_snapshot.Weather#1"}
+
+    snapshot = Snapshot(path)
+    restored = [Weather(), Weather(), Weather()]
+    for module in restored:
+        snapshot.restore(module)
+    assert [module.output and module.output["full_text"] for module in restored] == ["sunny*", "rainy*", None]
+    assert restored[0].stale and restored[0].data == {"text": "sunny"}
+
+    # Stale output is not saved, the previous entry is kept
+    restored[1].output = {"full_text": "snowy"}
+    snapshot.save()
+    entries = json.loads(open(path).read())
+    assert entries["test_core_snapshot.Weather#0"]["output"]["full_text"] == "sunny"
+    assert entries["test_core_snapshot.Weather#1"]["output"]["full_text"] == "snowy"
+
+
+def test_snapshot_ignores_invalid_file(tmp_path):
+    path = tmp_path / "snapshot"
+    path.write_text("{not json")
+    snapshot = Snapshot(str(path))
+    module = Weather()
+    snapshot.restore(module)
+    assert module.output is None
+
+
+def test_status_restores_snapshot(tmp_path):
+    path = str(tmp_path / "snapshot")
+    status = Status(standalone=False, input_stream=io.StringIO(), snapshot_file=path)
+    status.register(Weather, text="sunny")
+    status.snapshot.save()
+
+    status = Status(standalone=False, input_stream=io.StringIO(), snapshot_file=path)
+    module = status.register(Weather)
+    assert module.output["full_text"] == "sunny*"
+    assert json.loads(status.serialize([]))[0]["full_text"] == "sunny*"
+
+
+class StaticBackend(i3pystatus.weather.WeatherBackend):
+    settings = ("condition",)
+    condition = ""
+    checks = 0
+
+    def check_weather(self):
+        self.checks += 1
+        if self.checks > 1:
+            # Ends the update thread of the module
+            raise RuntimeError("Checked once")
+        self.data["condition"] = self.condition
+
+
+def weather(backend):
+    return i3pystatus.weather.Weather(backend=backend, format="{condition}", refresh_icon="", online_interval=0.01)
+
+
+def test_snapshot_restores_weather(tmp_path, monkeypatch):
+    # Hold the update thread of the real module until the snapshot was restored
+    online = threading.Event()
+    monkeypatch.setattr(i3pystatus.weather, "internet", lambda: online.wait() and True)
+    path = str(tmp_path / "snapshot")
+    try:
+        module = weather(StaticBackend(condition="sunny"))
+        module.check_weather()
+        snapshot = Snapshot(path)
+        snapshot.restore(module)
+        snapshot.save()
+
+        # Its empty full_text does not hide the snapshot
+        module = weather(StaticBackend(condition="rainy"))
+        assert module.output == {"full_text": ""}
+        Snapshot(path).restore(module)
+        assert module.output["full_text"] == "sunny*" and module.stale
+    finally:
+        online.set()
+    module.thread.join()
+    assert module.output["full_text"] == "rainy" and not module.stale
+
+
+class Hidden(Module):
+    def init(self):
+        self.output = {"full_text": ""}
+
+
+def test_status_first_complete_frame(tmp_path):
+    path = str(tmp_path / "snapshot")
+    status = Status(standalone=False, input_stream=io.StringIO(), snapshot_file=path)
+    status.register(Weather, text="sunny")
+    status.snapshot.save()
+
+    histogram = registry.histogram("first complete frame")
+    frames = len(histogram)
+    status = Status(standalone=False, input_stream=io.StringIO(), snapshot_file=path)
+    weather = status.register(Weather)
+    hidden = status.register(Hidden)
+    # Restored output is stale, the hidden module did not run yet
+    status.serialize([])
+    assert status.started is not None
+    weather.output = {"full_text": "rainy"}
+    status.serialize([])
+    assert status.started is not None
+    # Hides itself after it ran
+    registry.register(hidden).record(0.0, 0.0)
+    status.serialize([])
+    assert status.started is None and len(histogram) == frames + 1
@@ -0,0 +1,98 @@
+import time
+
+from i3pystatus.core.stats import Histogram, Registry
+from i3pystatus.core.threading import ExceptionWrapper, WorkloadWrapper
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    assert histogram.percentile(50) is None
+    for _ in range(98):
+        histogram.add(0.001)
+    histogram.add(0.1)
+    histogram.add(1)
+    assert 0.001 <= histogram.percentile(50) < 0.0015
+    assert histogram.percentile(50) == histogram.percentile(95)
+    assert 0.1 <= histogram.percentile(99) < 0.15
+    assert len(histogram) == 100
+
+
+def test_registry_snapshot(tmpdir):
+    registry = Registry()
+
+    class Module:
+        __name__ = "test.Module"
+
+    modules = Module(), Module()
+    first, second = map(registry.register, modules)
+    first.record(0.5, 0.4)
+    second.record(0.5, 0.1, failed=True)
+    snapshot = registry.snapshot()
+    assert [s["cpu"] for s in snapshot] == [0.4, 0.1]
+    assert snapshot[1]["exceptions"] == 1
+    assert snapshot[0]["instance"] != snapshot[1]["instance"]
+
+    registry.counters["frames emitted"] += 1
+    registry.histogram("stdout stalls").add(0.01)
+    path = tmpdir.join("stats")
+    registry.dump(str(path))
+    assert "test.Module" in path.read()
+    assert "frames emitted" in path.read()
+    assert "stdout stalls" in path.read()
+
+
+def test_workload_wrapper_records():
+    class Module:
+        def __call__(self):
+            time.sleep(0.01)
+
+    class Broken:
+        def __call__(self):
+            raise ValueError
+
+    wrapper = WorkloadWrapper(ExceptionWrapper(Module()))
+    broken = WorkloadWrapper(ExceptionWrapper(Broken()))
+    wrapper()
+    broken()
+    broken()
+    assert wrapper.stats.calls == 1
+    assert wrapper.stats.wall >= 0.01
+    assert wrapper.stats.cpu < wrapper.stats.wall
+    assert wrapper.stats.exceptions == 0
+    assert broken.stats.exceptions == 2
+
+
+def test_stats_signal_waits_for_registry_lock(tmpdir):
+    import io
+    import os
+    import signal
+    from i3pystatus.core import Status
+    from i3pystatus.core.stats import registry
+
+    path = tmpdir.join("stats")
+    status = Status(click_events=False, input_stream=io.StringIO(), stats_signal=signal.SIGRTMIN,
+                    stats_file=str(path))
+    try:
+        # The main thread holds the lock when the signal arrives
+        with registry.lock:
+            os.kill(os.getpid(), signal.SIGRTMIN)
+            time.sleep(0.1)
+            assert not path.check()
+        time.sleep(0.1)
+        assert path.check()
+    finally:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGRTMIN, signal.SIG_DFL)
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+
+    path = tmpdir.join("stats-i3status")
+    status = Status(standalone=False, input_stream=io.StringIO(), stats_signal=signal.SIGRTMIN,
+                    stats_file=str(path))
+    try:
+        os.kill(os.getpid(), signal.SIGRTMIN)
+        assert not path.check()
+        # Written with the next line of i3status
+        status.serialize([])
+        assert path.check()
+    finally:
+        signal.signal(signal.SIGRTMIN, signal.SIG_DFL)
@@ -0,0 +1,341 @@
+import threading
+import time
+
+from i3pystatus.core.threading import Manager, Scheduler
+
+
+class Counter:
+    def __init__(self, duration=0.0):
+        self.calls = 0
+        self.duration = duration
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.duration)
+
+
+def test_scheduler_runs_workloads():
+    scheduler = Scheduler()
+    fast, slow = Counter(), Counter()
+    scheduler.add(fast, 0.05)
+    scheduler.add(slow, 10)
+    scheduler.start()
+    time.sleep(0.3)
+    assert fast.calls >= 3
+    assert slow.calls == 1
+
+
+def test_scheduler_bounds_worker_pool():
+    scheduler = Scheduler(max_workers=3)
+    workloads = [Counter(0.05) for _ in range(20)]
+    for workload in workloads:
+        scheduler.add(workload, 0.1)
+    scheduler.start()
+    time.sleep(1.5)
+    assert len(scheduler.threads) <= 3
+    assert all(workload.calls >= 1 for workload in workloads)
+
+
+def test_scheduler_serializes_job():
+    running = []
+    overlaps = []
+
+    def workload():
+        if running:
+            overlaps.append(True)
+        running.append(True)
+        time.sleep(0.05)
+        running.pop()
+
+    scheduler = Scheduler()
+    scheduler.add(workload, 0.01)
+    scheduler.start()
+    time.sleep(0.3)
+    assert not overlaps
+
+
+def test_scheduler_suspend():
+    class KeepAlive(Counter):
+        keep_alive = True
+
+    scheduler = Scheduler()
+    regular, keep_alive = Counter(), KeepAlive()
+    scheduler.add(regular, 0.02)
+    scheduler.add(keep_alive, 0.02)
+    scheduler.suspend()
+    scheduler.start()
+    time.sleep(0.2)
+    assert regular.calls == 0
+    assert keep_alive.calls > 0
+
+
+def test_scheduler_hold():
+    scheduler = Scheduler()
+    counter = Counter()
+    scheduler.hold()
+    scheduler.add(counter, 0.02)
+    scheduler.start()
+    time.sleep(0.1)
+    assert counter.calls == 0
+    assert not scheduler.threads
+    scheduler.release()
+    time.sleep(0.1)
+    assert counter.calls > 0
+
+
+def test_manager_shim():
+    threads = threading.active_count()
+    scheduler = Scheduler()
+    manager = Manager(0.05, scheduler)
+    workload = Counter()
+    manager.append(workload)
+    manager.start()
+    time.sleep(0.2)
+    assert workload.calls >= 2
+    assert manager.threads == scheduler.threads
+    # A leader and a worker running its batch, not a thread per workload
+    assert threading.active_count() - threads <= 2
+
+
+def test_workload_cost_is_smoothed():
+    from i3pystatus.core.threading import WorkloadWrapper
+    wrapper = WorkloadWrapper(Counter())
+    for sample in [0.01] * 10 + [1.0] + [0.01] * 3:
+        wrapper.update_cost(sample)
+    assert wrapper.cost < 0.2
+    assert wrapper.variance > 0
+
+
+def test_placement_merges_and_splits():
+    from i3pystatus.core.threading import Job, Placement
+    placement = Placement(budget=0.1, max_workers=4)
+    jobs = [Job(Scheduler().wrap(Counter()), 1) for _ in range(6)]
+    for job in jobs:
+        job.workload.cost = 0.01
+    assert len(placement.place(jobs)) == 1
+
+    for job in jobs:
+        job.workload.cost = 0.06
+    batches = placement.place(jobs)
+    assert len(batches) == 4
+    assert sorted(map(len, batches)) == [1, 1, 2, 2]
+    assert placement.decisions[-1].batches == batches
+    assert len(placement.decisions) == 2
+
+
+def test_scheduler_calls_callbacks_without_lock():
+    scheduler = Scheduler()
+    counter = Counter()
+    called = threading.Event()
+
+    def on_tick():
+        # Taking the scheduler lock here deadlocked while it was held
+        scheduler.retry(Counter())
+        called.set()
+
+    scheduler.on_tick = on_tick
+    scheduler.add(counter, 60)
+    scheduler.start()
+    assert called.wait(1)
+
+
+def test_placement_spreads_jobs_without_samples():
+    from i3pystatus.core.threading import Job, Placement
+    placement = Placement(budget=0.1, max_workers=4)
+    jobs = [Job(Scheduler().wrap(Counter()), 1) for _ in range(10)]
+    batches = placement.place(jobs)
+    assert sorted(map(len, batches)) == [2, 2, 3, 3]
+
+
+def test_scheduler_quarantines_hung_job():
+    from i3pystatus.core.modules import Module
+
+    class Hang(Module):
+        hang = threading.Event()
+
+        def __call__(self):
+            self.output = {"full_text": "last"}
+            self.hang.wait()
+
+    scheduler = Scheduler(max_workers=2)
+    hang = Hang()
+    scheduler.add(hang, 0.05, timeout=0.1)
+    # Thread-mates placed in the same batch as the hung module
+    mates = [Counter() for _ in range(5)]
+    for mate in mates:
+        scheduler.add(mate, 0.05)
+    scheduler.start()
+    time.sleep(0.5)
+    assert all(mate.calls > 3 for mate in mates)
+    assert hang.output["full_text"] == "last*"
+    assert scheduler.jobs[0].quarantined
+
+    hang.hang.set()
+    time.sleep(0.5)
+    assert hang.output["full_text"] == "last"
+    assert len(scheduler.quarantine.queues) == 0
+    assert not scheduler.jobs[0].quarantined
+
+
+def test_scheduler_marks_stale_without_lock():
+    from i3pystatus.core.modules import Module
+
+    class Hang(Module):
+        hang = threading.Event()
+
+        def __call__(self):
+            self.output = {"full_text": "last"}
+            self.hang.wait()
+
+    scheduler = Scheduler(max_workers=2)
+    hang, other = Hang(), Counter()
+    scheduler.add(hang, 0.05, timeout=0.1)
+    scheduler.add(other, 60)
+    scheduler.start()
+    time.sleep(0.05)
+    calls = other.calls
+    # E.g. a Group refreshing itself when its output changes
+    hang.on_change = lambda: scheduler.retry(other)
+    time.sleep(0.2)
+    assert hang.output["full_text"] == "last*"
+    assert other.calls > calls
+    hang.hang.set()
+
+
+def test_scheduler_keeps_deadlines_while_job_hangs():
+    class Clock:
+        def __init__(self):
+            self.runs = []
+
+        def __call__(self):
+            self.runs.append(time.perf_counter())
+
+    class HangsOnce(Counter):
+        def __call__(self):
+            super().__call__()
+            if self.calls == 3:
+                # A normally cheap module hangs once, without a timeout
+                time.sleep(0.6)
+
+    scheduler = Scheduler()
+    clock, hangs = Clock(), HangsOnce()
+    scheduler.add(clock, 0.05)
+    scheduler.add(hangs, 0.1)
+    scheduler.start()
+    time.sleep(1.0)
+    assert hangs.calls >= 3
+    gaps = [b - a for a, b in zip(clock.runs, clock.runs[1:])]
+    assert len(clock.runs) > 15 and max(gaps) < 0.25
+
+
+def test_scheduler_parks_while_suspended():
+    scheduler = Scheduler()
+    workloads = [Counter() for _ in range(5)]
+    for workload in workloads:
+        scheduler.add(workload, 0.02)
+    scheduler.start()
+    time.sleep(0.1)
+    scheduler.suspend()
+    time.sleep(0.05)
+    wakeups = scheduler.wakeups
+    calls = [workload.calls for workload in workloads]
+    time.sleep(0.2)
+    assert scheduler.wakeups == wakeups
+    assert [workload.calls for workload in workloads] == calls
+
+    caught_up = threading.Event()
+    scheduler.resume(caught_up.set)
+    assert caught_up.wait(1)
+    assert all(workload.calls > before for workload, before in zip(workloads, calls))
+
+
+def test_backoff_delay():
+    from i3pystatus.core.threading import backoff_delay
+    assert backoff_delay(5, 0, 300) == 5
+    assert backoff_delay(5, 10, 0) == 5
+    assert 10 <= backoff_delay(5, 2, 300) <= 20
+    assert 150 <= backoff_delay(5, 100, 300) <= 300
+    assert backoff_delay(600, 3, 300) == 600
+
+
+def test_scheduler_backs_off_failing_job():
+    class Failing(Counter):
+        def __call__(self):
+            super().__call__()
+            raise RuntimeError("network down")
+
+    scheduler = Scheduler()
+    failing, healthy = Failing(), Counter()
+    job = scheduler.add(failing, 0.02, max_backoff=10)
+    scheduler.add(healthy, 0.02)
+    scheduler.start()
+    time.sleep(0.4)
+    assert failing.calls < 8
+    assert healthy.calls > 10
+    assert job.failures == failing.calls
+    assert job.workload.stats.backoff > 0.02
+
+    retried = threading.Event()
+    assert scheduler.retry(failing, retried.set)
+    assert retried.wait(1)
+    assert job.failures == 1
+    assert not scheduler.retry(Counter())
+
+
+def test_startup_planner_staggers_expensive_modules():
+    from i3pystatus.core.threading import StartupPlanner
+    startup = StartupPlanner(budget=0.2, threshold=1, spread=0.2)
+    scheduler = Scheduler(startup=startup)
+    cheap, expensive = [Counter(0.01) for _ in range(3)], [Counter() for _ in range(5)]
+    for workload in cheap:
+        scheduler.add(workload, 0.5)
+    for workload in expensive:
+        scheduler.add(workload, 60)
+    scheduler.start()
+    tp1 = time.perf_counter()
+    assert startup.wait()
+    assert time.perf_counter() - tp1 < 0.2
+    assert all(workload.calls == 1 for workload in cheap)
+    assert not any(workload.calls for workload in expensive)
+    time.sleep(0.5)
+    assert all(workload.calls == 1 for workload in expensive)
+
+    late = Counter()
+    scheduler.add(late, 60)
+    time.sleep(0.05)
+    assert late.calls == 1
+
+
+def test_startup_planner_budget():
+    from i3pystatus.core.threading import StartupPlanner
+    startup = StartupPlanner(budget=0.1)
+    scheduler = Scheduler(startup=startup)
+    scheduler.add(Counter(1), 1)
+    scheduler.start()
+    tp1 = time.perf_counter()
+    assert not startup.wait()
+    assert time.perf_counter() - tp1 < 0.5
+
+
+def test_scheduler_aligns_to_wall_clock():
+    calls = {0.1: [], 0.2: []}
+    ticks = []
+
+    def workload(interval):
+        return lambda: calls[interval].append(time.time())
+
+    scheduler = Scheduler(align=True)
+    scheduler.on_tick = lambda: ticks.append(time.time())
+    for interval in calls:
+        scheduler.add(workload(interval), interval)
+    time.sleep(0.03)
+    scheduler.start()
+    time.sleep(0.65)
+    for interval, times in calls.items():
+        assert len(times) >= 3
+        # The first run happens right away, all later ones on boundaries
+        for t in times[1:]:
+            phase = t / interval % 1
+            assert min(phase, 1 - phase) * interval < 0.02
+    # Both jobs due at the same boundary produce a single tick
+    assert len(ticks) <= len(calls[0.1]) + 1
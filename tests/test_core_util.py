@@ -86,6 +86,36 @@ class ModuleListTests(unittest.TestCase):
             "__init__": MagicMock(return_value=None),
         })
 
+    def test_get(self):
+        group = self.ModuleBase()
+        group.registered = MagicMock()
+        group.modules = util.ModuleList(group, ClassFinder(self.ModuleBase))
+        children = [self.ModuleBase() for _ in range(3)]
+        for child in children:
+            child.registered = MagicMock()
+        group.modules.append(children[0])
+        self.ml.append(group)
+        # Appended to the nested list after the group was registered
+        group.modules.append(children[1])
+        nested = self.ModuleBase()
+        nested.registered = MagicMock()
+        nested.modules = util.ModuleList(nested, ClassFinder(self.ModuleBase))
+        group.modules.append(nested)
+        nested.modules.append(children[2])
+
+        for module in [group, nested] + children:
+            assert self.ml.get(str(id(module))) is module
+        assert self.ml.get("1") is None
+
+        group.modules.remove(nested)
+        assert self.ml.get(str(id(children[2]))) is None
+        orphan = self.ModuleBase()
+        orphan.registered = MagicMock()
+        nested.modules.append(orphan)
+        assert len(self.ml.index) == 3
+        del self.ml[0]
+        assert not self.ml.index
+
     def test_append_class_instanciation(self):
         module_class = self._create_module_class("module_class")
 
@@ -232,3 +262,91 @@ class FormatPTests(unittest.TestCase):
         s = "[{a:.3f} m]{obj.attr}"
         assert util.formatp(s, a=3.14123456789, obj=obj) == "3.141 mbar"
         assert util.formatp(s, a=0.0, obj=obj) == "bar"
+
+
+class LazyDataTests(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.data = util.LazyData(interface="eth0")
+        self.data.lazy("graph", lambda: self.produce("graph", "▁▃█"))
+        self.data.lazy("rate", lambda: self.produce("rate", 42))
+
+    def produce(self, key, value):
+        self.calls.append(key)
+        return value
+
+    def test_only_used_values_are_produced(self):
+        template = util.compile_formatp("{interface}[ {graph}]")
+        assert template.render(self.data) == "eth0 ▁▃█"
+        assert template.render(self.data) == "eth0 ▁▃█"
+        assert self.calls == ["graph"]
+
+    def test_mapping(self):
+        assert "rate" in self.data and "speed" not in self.data
+        assert len(self.data) == 3
+        assert self.calls == []
+        assert dict(self.data) == {"interface": "eth0", "graph": "▁▃█", "rate": 42}
+        assert sorted(self.calls) == ["graph", "rate"]
+
+        self.data["rate"] = 0
+        del self.data["graph"]
+        assert dict(self.data) == {"interface": "eth0", "rate": 0}
+        with pytest.raises(KeyError):
+            self.data["graph"]
+
+
+class GraphSeriesTests(unittest.TestCase):
+    def test_series(self):
+        series = util.GraphSeries(3)
+        assert list(series) == [0.0, 0.0, 0.0]
+        for value in (5, 1, 3, 4):
+            series.append(value)
+        assert list(series) == [4.0, 3.0, 1.0]
+        assert series[0] == 4.0 and series[-1] == 1.0
+        assert (series.min, series.max) == (1.0, 4.0)
+        series.append(2)
+        assert (series.min, series.max) == (2.0, 4.0)
+        with pytest.raises(IndexError):
+            series[3]
+
+    def test_renderer_matches_make_graph(self):
+        rng = random.Random(23)
+        for width in (1, 2, 3, 6, 15, 40):
+            for style in util.GraphRenderer.styles:
+                for lower_limit, upper_limit in ((0.0, 100.0), (None, None), (0, 50)):
+                    series = util.GraphSeries(width)
+                    renderer = util.GraphRenderer(series, lower_limit, upper_limit, style)
+                    values = [0.0] * width
+                    for _ in range(2 * width + 10):
+                        # Sometimes several values between two renders
+                        for _ in range(rng.choice((0, 1, 1, 1, 2, width))):
+                            value = rng.choice((rng.uniform(0, 100), rng.randint(0, 3), 150))
+                            series.append(value)
+                            values = ([value] + values)[:width]
+                        try:
+                            expected = util.make_graph(values, lower_limit, upper_limit, style)
+                        except (ZeroDivisionError, IndexError) as exc:
+                            with pytest.raises(type(exc)):
+                                renderer.render()
+                        else:
+                            assert renderer.render() == expected
+
+
+@pytest.mark.parametrize("style", util.GRAPH_STYLES)
+def test_make_graphs(style, monkeypatch):
+    rng = random.Random(24)
+    series = [[rng.uniform(0, 120) for _ in range(16)] for _ in range(5)] + [[0] * 16, [100] * 16]
+    expected = [util.make_graph(values, 0.0, 100.0, style) for values in series]
+    assert util.make_graphs(series, 0.0, 100.0, style) == expected
+    # Drawn by NumPy, if installed
+    monkeypatch.setattr(util, "NUMPY_GRAPH_VALUES", 0)
+    assert util.make_graphs(series, 0.0, 100.0, style) == expected
+    assert util.make_graphs(series, None, None, "blocks") == [
+        util.make_graph(values, None, None, "blocks") for values in series]
+
+
+def test_make_bars():
+    percentages = [0, 5, 9.99, 10, 42.5, 99.9, 100, 105]
+    assert util.make_bars(percentages) == [util.make_bar(p) for p in percentages]
+    assert util.make_bar(42.5) == "████▎     "
+    assert util.make_vertical_bars(percentages, 2) == [util.make_vertical_bar(p, 2) for p in percentages]